@@ -1,22 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import and_, func, desc
+from sqlalchemy import and_, case, func, desc, update
 from typing import List, Optional
 from app.core.database import get_db
 from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.budget import Budget, BudgetCategory
 from app.models.category_template import CategoryTemplate
+from app.services.dashboard_state import refresh_dashboard_sections
+from app.services.budget_rollover import next_period, clone_to_next_period
 from app.schemas.budget import (
     BudgetCreate, BudgetUpdate, Budget as BudgetSchema,
-    BudgetSummary, BudgetCategoryUpdate, BudgetCategoryBulkUpdate
+    BudgetSummary, BudgetCategoryUpdate, BudgetCategoryBulkUpdate, BudgetCategoryMerge,
+    BudgetPeriodSummary, BudgetCategoryPage
 )
 
 router = APIRouter(prefix="/api/budgets", tags=["budgets"])
 
 def calculate_budget_summary(budget: Budget) -> dict:
     """Calculate budget allocation summary"""
-    total_allocated = sum(cat.allocated_cents for cat in budget.categories)
+    total_allocated = sum(cat.allocated_cents for cat in budget.categories if cat.is_active)
     remaining = budget.income_cents - total_allocated
     is_balanced = remaining == 0
     
@@ -65,6 +68,7 @@ def create_budget(
         )
         db.add(category)
     
+    refresh_dashboard_sections(db, current_user.id, "budget")
     db.commit()
     db.refresh(budget)
     
@@ -76,12 +80,91 @@ def list_budgets(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    budgets = db.query(Budget).filter(
+    budgets = db.query(Budget).options(
+        selectinload(Budget.categories)
+    ).filter(
         Budget.user_id == current_user.id
     ).order_by(Budget.year.desc(), Budget.month.desc()).all()
     
     return budgets
 
+def _parse_period(value: str, name: str) -> int:
+    """YYYY-MM as a sortable year * 100 + month"""
+    try:
+        year, month = (int(part) for part in value.split("-"))
+    except ValueError:
+        year, month = 0, 0
+    if not (2000 <= year <= 2100 and 1 <= month <= 12):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} must be a month in YYYY-MM format"
+        )
+    return year * 100 + month
+
+@router.get("/range", response_model=List[BudgetPeriodSummary])
+def get_budget_range(
+    period_from: str = Query(..., alias="from", description="First month, YYYY-MM"),
+    period_to: str = Query(..., alias="to", description="Last month, YYYY-MM"),
+    include_categories: bool = Query(True, description="Include categories with their spent totals"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Budgets for a range of months with totals, in at most three queries"""
+    start = _parse_period(period_from, "from")
+    end = _parse_period(period_to, "to")
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="from must not be after to"
+        )
+    
+    period = Budget.year * 100 + Budget.month
+    query = db.query(Budget).filter(
+        Budget.user_id == current_user.id,
+        period.between(start, end)
+    ).order_by(Budget.year, Budget.month)
+    
+    if include_categories:
+        query = query.options(selectinload(Budget.categories))
+    
+    budgets = query.all()
+    if not budgets:
+        return []
+    
+    # Totals from the maintained per-category columns, one grouped query for the range
+    totals = {
+        row.budget_id: row for row in db.query(
+            BudgetCategory.budget_id,
+            func.coalesce(func.sum(case((BudgetCategory.is_active == True, BudgetCategory.allocated_cents), else_=0)), 0).label('allocated'),
+            func.coalesce(func.sum(BudgetCategory.spent_cents), 0).label('spent')
+        ).filter(
+            BudgetCategory.budget_id.in_([budget.id for budget in budgets])
+        ).group_by(BudgetCategory.budget_id)
+    }
+    
+    result = []
+    for budget in budgets:
+        row = totals.get(budget.id)
+        allocated = row.allocated if row else 0
+        item = {
+            "id": budget.id,
+            "user_id": budget.user_id,
+            "month": budget.month,
+            "year": budget.year,
+            "income_cents": budget.income_cents,
+            "total_allocated_cents": allocated,
+            "spent_cents": row.spent if row else 0,
+            "remaining_cents": budget.income_cents - allocated
+        }
+        if include_categories:
+            item["categories"] = sorted(
+                (category for category in budget.categories if category.is_active),
+                key=lambda category: (category.order, category.name)
+            )
+        result.append(item)
+    
+    return result
+
 @router.get("/{budget_id}", response_model=BudgetSummary)
 def get_budget(
     budget_id: int,
@@ -153,6 +236,48 @@ def get_budget_by_period(
     summary = calculate_budget_summary(budget)
     return {"budget": budget, **summary}
 
+def _merge_categories(db: Session, budget: Budget, categories: List[BudgetCategoryMerge]):
+    """Make the budget's active categories match `categories` without rewriting unchanged rows.
+    
+    Rows are matched by id, then by name. Matched rows are updated only where
+    a value differs, unmatched entries are inserted and existing categories
+    left over are soft-deleted, so ids referenced by transactions, paycheck
+    allocations and category patterns stay valid.
+    """
+    existing = {category.id: category for category in budget.categories}
+    by_name = {}
+    # Prefer an active row when a removed category shares its name
+    for category in sorted(existing.values(), key=lambda c: (not c.is_active, c.id)):
+        by_name.setdefault(category.name, []).append(category)
+    
+    matched = set()
+    for cat_data in categories:
+        if cat_data.id is not None:
+            category = existing.get(cat_data.id)
+            if category is None or category.id in matched:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Category {cat_data.id} not found in this budget"
+                )
+        else:
+            candidates = [c for c in by_name.get(cat_data.name, ()) if c.id not in matched]
+            category = candidates[0] if candidates else None
+        
+        values = cat_data.model_dump(exclude={"id"}, exclude_unset=True)
+        if category is None:
+            db.add(BudgetCategory(budget_id=budget.id, **values))
+            continue
+        
+        matched.add(category.id)
+        values["is_active"] = True
+        for field, value in values.items():
+            if getattr(category, field) != value:
+                setattr(category, field, value)
+    
+    for category in existing.values():
+        if category.id not in matched and category.is_active:
+            category.is_active = False
+
 @router.put("/{budget_id}", response_model=BudgetSummary)
 def update_budget(
     budget_id: int,
@@ -175,23 +300,11 @@ def update_budget(
     if budget_data.income_cents is not None:
         budget.income_cents = budget_data.income_cents
     
-    # Update categories if provided
+    # Merge categories if provided
     if budget_data.categories is not None:
-        # Delete existing categories
-        db.query(BudgetCategory).filter(
-            BudgetCategory.budget_id == budget_id
-        ).delete()
-        
-        # Create new categories
-        for cat_data in budget_data.categories:
-            category = BudgetCategory(
-                budget_id=budget.id,
-                name=cat_data.name,
-                allocated_cents=cat_data.allocated_cents,
-                order=cat_data.order
-            )
-            db.add(category)
+        _merge_categories(db, budget, budget_data.categories)
     
+    refresh_dashboard_sections(db, current_user.id, "budget")
     db.commit()
     db.refresh(budget)
     
@@ -255,12 +368,53 @@ def create_budget_from_templates(
         )
         db.add(category)
     
+    refresh_dashboard_sections(db, current_user.id, "budget")
     db.commit()
     db.refresh(budget)
     
     summary = calculate_budget_summary(budget)
     return {"budget": budget, **summary}
 
+@router.post("/{budget_id}/rollover", response_model=BudgetSummary, status_code=status.HTTP_201_CREATED)
+def rollover_budget(
+    budget_id: int,
+    carry_over: bool = Query(False, description="Add each category's unspent balance to its new allocation"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create next month's budget as a copy of this one"""
+    budget = db.query(Budget).filter(
+        Budget.id == budget_id,
+        Budget.user_id == current_user.id
+    ).first()
+    
+    if not budget:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Budget not found"
+        )
+    
+    month, year = next_period(budget.month, budget.year)
+    existing = db.query(Budget.id).filter(
+        Budget.user_id == current_user.id,
+        Budget.month == month,
+        Budget.year == year
+    ).first()
+    
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Budget for {month}/{year} already exists"
+        )
+    
+    new_budget = clone_to_next_period(db, budget, carry_over=carry_over)
+    refresh_dashboard_sections(db, current_user.id, "budget")
+    db.commit()
+    db.refresh(new_budget)
+    
+    summary = calculate_budget_summary(new_budget)
+    return {"budget": new_budget, **summary}
+
 @router.delete("/{budget_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_budget(
     budget_id: int,
@@ -279,16 +433,23 @@ def delete_budget(
         )
     
     db.delete(budget)
+    refresh_dashboard_sections(db, current_user.id, "budget", "transactions")
     db.commit()
     
     return None
 
-@router.get("/{budget_id}/categories", response_model=List[dict])
+FUZZY_SEARCH_THRESHOLD = 0.3  # pg_trgm's default similarity_threshold
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+@router.get("/{budget_id}/categories", response_model=BudgetCategoryPage)
 def get_budget_categories(
     budget_id: int,
     limit: int = Query(50, le=500, description="Number of categories to return"),
     offset: int = Query(0, ge=0, description="Number of categories to skip"),
     search: Optional[str] = Query(None, description="Search categories by name"),
+    match: str = Query("contains", pattern="^(contains|prefix|fuzzy)$", description="How search matches: contains, prefix or fuzzy (typo-tolerant)"),
     group: Optional[str] = Query(None, description="Filter by category group"),
     sort_by: str = Query("order", description="Sort by: order, name, allocated_cents"),
     sort_desc: bool = Query(False, description="Sort in descending order"),
@@ -308,40 +469,68 @@ def get_budget_categories(
             detail="Budget not found"
         )
     
-    # Build query
-    query = db.query(BudgetCategory).filter(
+    # The total rides along on every row, so a page is a single query
+    query = db.query(BudgetCategory, func.count().over().label("total")).filter(
         BudgetCategory.budget_id == budget_id,
         BudgetCategory.is_active == True
     )
     
     # Apply filters
-    if search:
-        query = query.filter(BudgetCategory.name.ilike(f"%{search}%"))
+    relevance = None
+    search = search.strip() if search else None
+    if search and match == "fuzzy":
+        relevance = func.similarity(BudgetCategory.name, search)
+        if db.get_bind().dialect.name == 'postgresql':
+            # The % operator can use the trigram index; it applies pg_trgm.similarity_threshold
+            query = query.filter(BudgetCategory.name.op('%')(search))
+        else:
+            query = query.filter(relevance >= FUZZY_SEARCH_THRESHOLD)
+    elif search and match == "prefix":
+        query = query.filter(func.lower(BudgetCategory.name).like(f"{_escape_like(search.lower())}%", escape="\\"))
+    elif search:
+        query = query.filter(BudgetCategory.name.ilike(f"%{_escape_like(search)}%", escape="\\"))
     
     if group:
         query = query.filter(BudgetCategory.category_group == group)
     
-    # Apply sorting
+    # Apply sorting; fuzzy matches come best first
     sort_column = getattr(BudgetCategory, sort_by, BudgetCategory.order)
+    if relevance is not None:
+        query = query.order_by(relevance.desc())
     if sort_desc:
-        query = query.order_by(desc(sort_column))
+        query = query.order_by(desc(sort_column), BudgetCategory.id)
     else:
-        query = query.order_by(sort_column)
+        query = query.order_by(sort_column, BudgetCategory.id)
     
-    # Get total count for pagination
-    total_count = query.count()
+    rows = query.offset(offset).limit(limit).all()
     
-    # Apply pagination
-    categories = query.offset(offset).limit(limit).all()
+    if rows:
+        total_count = rows[0].total
+    elif offset:
+        # Past the last page there is no row to carry the total
+        total_count = query.with_entities(func.count(BudgetCategory.id)).order_by(None).scalar()
+    else:
+        total_count = 0
     
     return {
-        "categories": categories,
+        "categories": [row.BudgetCategory for row in rows],
         "total": total_count,
         "limit": limit,
         "offset": offset,
         "has_more": offset + limit < total_count
     }
 
+def _budget_category_ids(db: Session, budget_id: int, category_ids: List[int]) -> set:
+    """Which of `category_ids` belong to the budget, in a single IN query"""
+    if not category_ids:
+        return set()
+    return {
+        category_id for (category_id,) in db.query(BudgetCategory.id).filter(
+            BudgetCategory.budget_id == budget_id,
+            BudgetCategory.id.in_(set(category_ids))
+        )
+    }
+
 @router.post("/{budget_id}/categories/bulk", response_model=dict)
 def bulk_update_categories(
     budget_id: int,
@@ -362,38 +551,27 @@ def bulk_update_categories(
             detail="Budget not found"
         )
     
+    category_ids = _budget_category_ids(db, budget_id, [item.category_id for item in updates.updates])
     updated_count = 0
     errors = []
+    rows = {}
+    
+    # Merge the updates per category so each row is written once
+    for item in updates.updates:
+        if item.category_id not in category_ids:
+            errors.append(f"Category {item.category_id} not found")
+            continue
+        
+        changes = item.model_dump(exclude={"category_id"}, exclude_none=True)
+        rows.setdefault(item.category_id, {"id": item.category_id}).update(changes)
+        updated_count += 1
     
-    # Process updates
-    for update in updates.updates:
-        try:
-            category = db.query(BudgetCategory).filter(
-                BudgetCategory.id == update.category_id,
-                BudgetCategory.budget_id == budget_id
-            ).first()
-            
-            if not category:
-                errors.append(f"Category {update.category_id} not found")
-                continue
-            
-            # Apply updates
-            if update.allocated_cents is not None:
-                category.allocated_cents = update.allocated_cents
-            if update.name is not None:
-                category.name = update.name
-            if update.order is not None:
-                category.order = update.order
-            if update.category_group is not None:
-                category.category_group = update.category_group
-            if update.description is not None:
-                category.description = update.description
-            
-            updated_count += 1
-            
-        except Exception as e:
-            errors.append(f"Error updating category {update.category_id}: {str(e)}")
+    # Bulk UPDATE by primary key: one executemany per distinct set of changed fields
+    rows = [row for row in rows.values() if len(row) > 1]
+    if rows:
+        db.execute(update(BudgetCategory), rows)
     
+    refresh_dashboard_sections(db, current_user.id, "budget")
     db.commit()
     
     return {
@@ -422,18 +600,14 @@ def reorder_categories(
             detail="Budget not found"
         )
     
-    updated_count = 0
-    
-    for item in category_orders:
-        category = db.query(BudgetCategory).filter(
-            BudgetCategory.id == item["id"],
-            BudgetCategory.budget_id == budget_id
-        ).first()
-        
-        if category:
-            category.order = item["order"]
-            updated_count += 1
+    category_ids = _budget_category_ids(db, budget_id, [item["id"] for item in category_orders])
+    orders = {item["id"]: item["order"] for item in category_orders if item["id"] in category_ids}
+    updated_count = sum(1 for item in category_orders if item["id"] in category_ids)
     
+    if orders:
+        db.execute(update(BudgetCategory), [
+            {"id": category_id, "order": order} for category_id, order in orders.items()
+        ])
     db.commit()
     
     return {
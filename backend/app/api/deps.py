@@ -1,4 +1,5 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.core.database import get_db
@@ -6,15 +7,12 @@ from app.core.security import decode_token
 from app.models.user import User
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    token = credentials.credentials
+def _user_from_token(token: str, db: Session, token_type: str = "access") -> User:
     payload = decode_token(token)
     
-    if not payload or payload.get("type") != "access":
+    if not payload or payload.get("type") != token_type:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials"
@@ -35,3 +33,27 @@ def get_current_user(
         )
     
     return user
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    return _user_from_token(credentials.credentials, db)
+
+def get_current_user_for_stream(
+    ticket: Optional[str] = Query(None, description="Stream ticket, for clients such as EventSource that cannot send headers"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+) -> User:
+    """Like get_current_user, but also accepts a short-lived stream ticket as a query parameter.
+    
+    Access tokens are never taken from the URL, where they would be logged.
+    """
+    if credentials:
+        return _user_from_token(credentials.credentials, db)
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated"
+        )
+    return _user_from_token(ticket, db, token_type="stream")
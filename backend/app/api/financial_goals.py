@@ -8,6 +8,7 @@ from ..core.database import get_db
 from ..api.deps import get_current_user
 from ..models.user import User
 from ..models.financial_goal import FinancialGoal, GoalContribution, GoalMilestone, GoalStatus
+from ..services.dashboard_state import apply_effect_change, goal_effect
 from ..schemas.financial_goal import (
     FinancialGoalCreate,
     FinancialGoalUpdate,
@@ -85,6 +86,8 @@ def create_goal(
         **goal_data
     )
     db.add(db_goal)
+    db.flush()
+    apply_effect_change(db, current_user.id, None, goal_effect(db_goal))
     db.commit()
     db.refresh(db_goal)
     
@@ -258,6 +261,8 @@ def update_goal(
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     
+    before = goal_effect(goal)
+    
     # Convert dollar amounts to cents
     update_data = goal_update.to_db_dict()
     for field, value in update_data.items():
@@ -269,6 +274,7 @@ def update_goal(
     if goal.current_amount_cents >= goal.target_amount_cents and goal.status == 'active':
         goal.status = 'completed'
     
+    apply_effect_change(db, current_user.id, before, goal_effect(goal))
     db.commit()
     db.refresh(goal)
     
@@ -309,6 +315,7 @@ def delete_goal(
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     
+    apply_effect_change(db, current_user.id, goal_effect(goal), None)
     db.delete(goal)
     db.commit()
     return {"message": "Goal deleted successfully"}
@@ -331,6 +338,7 @@ def add_contribution(
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     
+    before = goal_effect(goal)
     db_contribution = GoalContribution(
         goal_id=goal_id,
         **contribution.model_dump()
@@ -345,6 +353,7 @@ def add_contribution(
         goal.status = 'completed'
     
     db.add(db_contribution)
+    apply_effect_change(db, current_user.id, before, goal_effect(goal))
     db.commit()
     db.refresh(db_contribution)
     return db_contribution
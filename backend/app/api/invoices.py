@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, RedirectResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date, datetime
+from app.core.config import settings
 from app.core.database import get_db
 from app.api.deps import get_current_user
 from app.models.invoice import Invoice as InvoiceModel, InvoiceItem as InvoiceItemModel, InvoiceStatus
@@ -10,6 +11,8 @@ from app.models.user import User
 from app.models.settings import Settings as SettingsModel
 from app.schemas.invoice import Invoice, InvoiceCreate, InvoiceUpdate
 from app.services.pdf import generate_invoice_pdf
+from app.services.pdf_export import stream_invoice_pdfs_zip
+from app.services.storage import get_pdf_storage
 
 router = APIRouter(prefix="/api/invoices", tags=["invoices"])
 
@@ -114,6 +117,43 @@ def create_invoice(
     db.refresh(invoice)
     return invoice
 
+@router.get("/export/pdfs")
+def export_invoice_pdfs(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    customer_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Download the PDFs of all matching invoices as a ZIP, streamed as each render finishes"""
+    query = db.query(InvoiceModel.id, InvoiceModel.invoice_number)
+    
+    if start_date:
+        query = query.filter(InvoiceModel.issue_date >= start_date)
+    if end_date:
+        query = query.filter(InvoiceModel.issue_date <= end_date)
+    if status:
+        query = query.filter(InvoiceModel.status == status)
+    if customer_id:
+        query = query.filter(InvoiceModel.customer_id == customer_id)
+    
+    invoices = [(row.id, row.invoice_number) for row in query.order_by(InvoiceModel.issue_date, InvoiceModel.id).all()]
+    
+    if not invoices:
+        raise HTTPException(status_code=404, detail="No invoices match the filter")
+    
+    filename = "invoices"
+    if start_date and end_date:
+        filename += f"_{start_date}_{end_date}"
+    filename += ".zip"
+    
+    return StreamingResponse(
+        stream_invoice_pdfs_zip(invoices),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/{invoice_id}", response_model=Invoice)
 def get_invoice(
     invoice_id: int,
@@ -195,15 +235,30 @@ def download_pdf(
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
     
-    if not invoice.pdf_path:
-        generate_invoice_pdf(invoice_id, db)
-        db.refresh(invoice)
-    
-    if not invoice.pdf_path:
+    # Cached by content hash, so this only renders when the invoice changed
+    pdf_key = generate_invoice_pdf(invoice_id, db)
+
+    if not pdf_key:
         raise HTTPException(status_code=404, detail="PDF not generated")
-    
-    return FileResponse(
-        invoice.pdf_path,
+
+    storage = get_pdf_storage()
+    filename = f"{invoice.invoice_number}.pdf"
+
+    if settings.PDF_PRESIGNED_REDIRECTS:
+        url = storage.presigned_url(pdf_key, filename)
+        if url:
+            return RedirectResponse(url, status_code=307)
+
+    local_path = storage.local_path(pdf_key)
+    if local_path:
+        return FileResponse(
+            local_path,
+            media_type="application/pdf",
+            filename=filename
+        )
+
+    return StreamingResponse(
+        storage.iter_chunks(pdf_key),
         media_type="application/pdf",
-        filename=f"{invoice.invoice_number}.pdf"
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
@@ -11,6 +11,7 @@ from ..models.user import User
 from ..models.net_worth import Asset, Liability, AssetSnapshot, LiabilitySnapshot, NetWorthSnapshot
 from ..models.transaction import Transaction
 from ..models.financial_goal import FinancialGoal, GoalStatus
+from ..services.dashboard_state import apply_effect_change, asset_effect, liability_effect
 from ..schemas.net_worth import (
     AssetCreate, AssetUpdate, Asset as AssetSchema,
     LiabilityCreate, LiabilityUpdate, Liability as LiabilitySchema,
@@ -130,6 +131,8 @@ def create_asset(
         **asset.model_dump()
     )
     db.add(db_asset)
+    db.flush()
+    apply_effect_change(db, current_user.id, None, asset_effect(db_asset))
     db.commit()
     db.refresh(db_asset)
     
@@ -194,6 +197,7 @@ def update_asset(
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
     
+    before = asset_effect(asset)
     update_data = asset_update.model_dump(exclude_unset=True)
     old_value = asset.current_value
     
@@ -211,6 +215,7 @@ def update_asset(
         )
         db.add(snapshot)
     
+    apply_effect_change(db, current_user.id, before, asset_effect(asset))
     db.commit()
     db.refresh(asset)
     return asset
@@ -231,6 +236,7 @@ def delete_asset(
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
     
+    apply_effect_change(db, current_user.id, asset_effect(asset), None)
     db.delete(asset)
     db.commit()
     return {"message": "Asset deleted successfully"}
@@ -249,6 +255,8 @@ def create_liability(
         **liability.model_dump()
     )
     db.add(db_liability)
+    db.flush()
+    apply_effect_change(db, current_user.id, None, liability_effect(db_liability))
     db.commit()
     db.refresh(db_liability)
     
@@ -313,6 +321,7 @@ def update_liability(
     if not liability:
         raise HTTPException(status_code=404, detail="Liability not found")
     
+    before = liability_effect(liability)
     update_data = liability_update.model_dump(exclude_unset=True)
     old_balance = liability.current_balance
     
@@ -330,6 +339,7 @@ def update_liability(
         )
         db.add(snapshot)
     
+    apply_effect_change(db, current_user.id, before, liability_effect(liability))
     db.commit()
     db.refresh(liability)
     return liability
@@ -350,6 +360,7 @@ def delete_liability(
     if not liability:
         raise HTTPException(status_code=404, detail="Liability not found")
     
+    apply_effect_change(db, current_user.id, liability_effect(liability), None)
     db.delete(liability)
     db.commit()
     return {"message": "Liability deleted successfully"}
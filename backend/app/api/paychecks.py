@@ -9,6 +9,7 @@ from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.paycheck import Paycheck, PaycheckInstance, PaycheckAllocation, PaycheckFrequency
 from app.models.budget import Budget, BudgetCategory
+from app.services.dashboard_state import refresh_dashboard_sections
 from app.schemas.paycheck import (
     PaycheckCreate, PaycheckUpdate, Paycheck as PaycheckSchema,
     PaycheckInstanceCreate, PaycheckInstance as PaycheckInstanceSchema,
@@ -75,6 +76,7 @@ def create_paycheck(
         )
         db.add(allocation)
     
+    refresh_dashboard_sections(db, current_user.id, "paychecks")
     db.commit()
     db.refresh(paycheck)
     return paycheck
@@ -166,6 +168,7 @@ def update_paycheck(
             )
             db.add(allocation)
     
+    refresh_dashboard_sections(db, current_user.id, "paychecks")
     db.commit()
     db.refresh(paycheck)
     return paycheck
@@ -190,6 +193,7 @@ def delete_paycheck(
         )
     
     db.delete(paycheck)
+    refresh_dashboard_sections(db, current_user.id, "paychecks")
     db.commit()
     return None
 
@@ -364,7 +368,7 @@ def get_budget_funding_plan(
     ).order_by(PaycheckInstance.date).all()
     
     total_paycheck_income = sum(inst.amount_cents for inst in instances)
-    total_allocated = sum(cat.allocated_cents for cat in budget.categories)
+    total_allocated = sum(cat.allocated_cents for cat in budget.categories if cat.is_active)
     available = total_paycheck_income - total_allocated
     
     return {
@@ -421,6 +425,8 @@ def get_category_funding_status(
     # Build response
     result = []
     for category in budget.categories:
+        if not category.is_active:
+            continue
         funded = category_funding.get(category.id, {"funded_cents": 0, "sources": []})
         remaining = category.allocated_cents - funded["funded_cents"]
         
@@ -506,10 +512,13 @@ def auto_allocate_paychecks(
             db.add(instance)
             db.flush()
             
-            # Copy allocation template from paycheck
-            template_allocations = db.query(PaycheckAllocation).filter(
+            # Copy the paycheck's allocation templates for this budget's categories
+            template_allocations = db.query(PaycheckAllocation).join(
+                BudgetCategory, PaycheckAllocation.category_id == BudgetCategory.id
+            ).filter(
                 PaycheckAllocation.paycheck_id == paycheck.id,
-                PaycheckAllocation.instance_id.is_(None)
+                PaycheckAllocation.instance_id.is_(None),
+                BudgetCategory.budget_id == budget_id
             ).all()
             
             for template in template_allocations:
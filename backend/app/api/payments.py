@@ -6,6 +6,7 @@ from app.models.payment import Payment as PaymentModel
 from app.models.invoice import Invoice as InvoiceModel, InvoiceStatus
 from app.models.user import User
 from app.schemas.payment import Payment, PaymentCreate
+from app.services.revenue_rollup import apply_payment
 
 router = APIRouter(prefix="/api/invoices", tags=["payments"])
 
@@ -34,6 +35,9 @@ def record_payment(
         invoice.status = InvoiceStatus.PAID
         invoice.balance_due_cents = 0
     
+    # Keep the metrics rollups in the same transaction as the payment
+    apply_payment(db, invoice.customer_id, payment_data.paid_at, payment_data.amount_cents)
+    
     db.commit()
     db.refresh(payment)
     return payment
@@ -7,6 +7,7 @@ from app.core.database import get_db
 from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.sinking_fund import SinkingFund, SinkingFundContribution
+from app.services.dashboard_state import refresh_dashboard_sections
 from app.schemas.sinking_fund import (
     SinkingFundCreate, SinkingFundUpdate, SinkingFund as SinkingFundSchema,
     SinkingFundWithContributions, SinkingFundProgress, SinkingFundSummary,
@@ -59,6 +60,7 @@ def create_sinking_fund(
     )
     
     db.add(fund)
+    refresh_dashboard_sections(db, current_user.id, "sinking_funds")
     db.commit()
     db.refresh(fund)
     
@@ -196,6 +198,7 @@ def update_sinking_fund(
     for field, value in update_data.items():
         setattr(fund, field, value)
     
+    refresh_dashboard_sections(db, current_user.id, "sinking_funds")
     db.commit()
     db.refresh(fund)
     
@@ -220,6 +223,7 @@ def delete_sinking_fund(
         )
     
     db.delete(fund)
+    refresh_dashboard_sections(db, current_user.id, "sinking_funds")
     db.commit()
     
     return None
@@ -264,6 +268,7 @@ def add_contribution(
         )
     
     db.add(contribution)
+    refresh_dashboard_sections(db, current_user.id, "sinking_funds")
     db.commit()
     db.refresh(contribution)
     
@@ -333,6 +338,7 @@ def delete_contribution(
     fund.current_balance_cents -= contribution.amount_cents
     
     db.delete(contribution)
+    refresh_dashboard_sections(db, current_user.id, "sinking_funds")
     db.commit()
     
     return None
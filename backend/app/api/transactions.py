@@ -1,23 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, extract, or_
+import base64
+import json
+from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFile, status, Query
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, extract, insert, or_, select, tuple_, update
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime
 from app.core.database import get_db
 from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.transaction import Transaction, TransactionSplit
 from app.models.budget import Budget, BudgetCategory
+from app.services.dashboard_state import apply_transaction_change, refresh_dashboard_sections, transaction_effect
+from app.services.category_spend import apply_category_spend, category_effect
+from app.services.transaction_import import detect_format, import_statement
+from app.services.transaction_duplicates import duplicate_clusters, find_duplicates, transaction_fingerprint
+from app.services.transaction_archive import latest_archived_query, reaches_archive, transaction_sources
+from app.services.recurring_charges import is_active, merchant_key, recurring_charges
+from app.services.transaction_running import running_spend
+from app.services.transaction_search import apply_search, search_terms
 from app.schemas.transaction import (
     TransactionCreate, TransactionUpdate, 
     Transaction as TransactionSchema,
     TransactionWithCategory,
     TransactionWithSplits,
-    TransactionSplitWithCategory
+    TransactionSplitWithCategory,
+    TransactionImportResult,
+    TransactionBulkRequest,
+    TransactionBulkResult,
+    TransactionDuplicateCluster,
+    TransactionRunningTotals,
+    TransactionRecurringCharge
 )
 
 router = APIRouter(prefix="/api/transactions", tags=["transactions"])
 
+def _serialize_transactions(db: Session, transactions: List[Transaction], split_source=TransactionSplit) -> List[dict]:
+    """Transactions as response dicts, with the splits of all of them loaded in one query"""
+    split_ids = [transaction.id for transaction in transactions if transaction.is_split]
+    splits_by_transaction = {}
+    if split_ids:
+        splits = db.query(split_source, BudgetCategory.name).join(
+            BudgetCategory, split_source.category_id == BudgetCategory.id
+        ).filter(
+            split_source.transaction_id.in_(split_ids)
+        ).order_by(split_source.id).all()
+        
+        for split, category_name in splits:
+            splits_by_transaction.setdefault(split.transaction_id, []).append({
+                "id": split.id,
+                "transaction_id": split.transaction_id,
+                "category_id": split.category_id,
+                "amount_cents": split.amount_cents,
+                "notes": split.notes,
+                "created_at": split.created_at,
+                "category_name": category_name
+            })
+    
+    return [
+        {
+            "id": transaction.id,
+            "user_id": transaction.user_id,
+            "budget_id": transaction.budget_id,
+            "category_id": transaction.category_id,
+            "amount_cents": transaction.amount_cents,
+            "date": transaction.date,
+            "notes": transaction.notes,
+            "is_split": transaction.is_split,
+            "created_at": transaction.created_at,
+            "updated_at": transaction.updated_at,
+            "splits": splits_by_transaction.get(transaction.id, [])
+        }
+        for transaction in transactions
+    ]
+
 def _get_transaction_with_splits(db: Session, transaction_id: int, user_id: int):
     """Helper function to get transaction with splits and category names"""
     transaction = db.query(Transaction).filter(
@@ -28,46 +83,48 @@ def _get_transaction_with_splits(db: Session, transaction_id: int, user_id: int)
     if not transaction:
         return None
     
-    result = {
-        "id": transaction.id,
-        "user_id": transaction.user_id,
-        "budget_id": transaction.budget_id,
-        "category_id": transaction.category_id,
-        "amount_cents": transaction.amount_cents,
-        "date": transaction.date,
-        "notes": transaction.notes,
-        "is_split": transaction.is_split,
-        "created_at": transaction.created_at,
-        "updated_at": transaction.updated_at,
-        "splits": []
-    }
-    
-    if transaction.is_split:
-        splits = db.query(TransactionSplit, BudgetCategory.name).join(
-            BudgetCategory, TransactionSplit.category_id == BudgetCategory.id
-        ).filter(TransactionSplit.transaction_id == transaction_id).all()
-        
-        result["splits"] = [
-            {
-                "id": split.id,
-                "transaction_id": split.transaction_id,
-                "category_id": split.category_id,
-                "amount_cents": split.amount_cents,
-                "notes": split.notes,
-                "created_at": split.created_at,
-                "category_name": category_name
-            }
-            for split, category_name in splits
-        ]
-    
-    return result
+    return _serialize_transactions(db, [transaction])[0]
+
+def _encode_cursor(transaction: Transaction) -> str:
+    """Opaque keyset position after `transaction` in (date, created_at, id) order"""
+    position = [transaction.date.isoformat(), transaction.created_at.isoformat(), transaction.id]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def _decode_cursor(cursor: str):
+    try:
+        day, created_at, transaction_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return date.fromisoformat(day), datetime.fromisoformat(created_at), int(transaction_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def _encode_search_cursor(offset: int) -> str:
+    """Opaque position in ranked search results"""
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode()
+
+def _decode_search_cursor(cursor: str) -> int:
+    try:
+        offset = int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["offset"])
+    except (ValueError, TypeError, KeyError):
+        offset = -1
+    if offset < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return offset
 
 @router.post("", response_model=TransactionWithSplits, status_code=status.HTTP_201_CREATED)
 def create_transaction(
     transaction_data: TransactionCreate,
+    response: Response,
+    on_duplicate: str = Query("allow", pattern="^(allow|reject)$", description="reject answers 409 for an exact duplicate, e.g. a retried request"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """Create a transaction; a likely duplicate is reported in the X-Duplicate-Of header"""
     # Verify budget belongs to user
     budget = db.query(Budget).filter(
         Budget.id == transaction_data.budget_id,
@@ -80,38 +137,55 @@ def create_transaction(
             detail="Budget not found"
         )
     
-    # For non-split transactions, verify category belongs to budget
-    if not transaction_data.is_split:
-        if transaction_data.category_id is None:
+    if not transaction_data.is_split and transaction_data.category_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="category_id is required for non-split transactions"
+        )
+    splits = transaction_data.splits or []
+    if transaction_data.is_split:
+        if not splits:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="category_id is required for non-split transactions"
+                detail="splits must be provided when is_split is True"
             )
-        
-        category = db.query(BudgetCategory).filter(
-            BudgetCategory.id == transaction_data.category_id,
+        total_splits = sum(split.amount_cents for split in splits)
+        if total_splits != transaction_data.amount_cents:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Sum of splits ({total_splits}) must equal transaction amount ({transaction_data.amount_cents})"
+            )
+    
+    # Verify the category, or every split category, belongs to the budget with one query
+    category_ids = {split.category_id for split in splits} if transaction_data.is_split else {transaction_data.category_id}
+    found = {
+        category_id for (category_id,) in db.query(BudgetCategory.id).filter(
+            BudgetCategory.id.in_(category_ids),
             BudgetCategory.budget_id == transaction_data.budget_id
-        ).first()
-        
-        if not category:
+        )
+    }
+    if not transaction_data.is_split and not found:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found in this budget"
+        )
+    for split in splits:
+        if split.category_id not in found:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found in this budget"
+                detail=f"Category {split.category_id} not found in this budget"
             )
     
-    # For split transactions, verify all split categories belong to budget
-    if transaction_data.is_split and transaction_data.splits:
-        for split in transaction_data.splits:
-            category = db.query(BudgetCategory).filter(
-                BudgetCategory.id == split.category_id,
-                BudgetCategory.budget_id == transaction_data.budget_id
-            ).first()
-            
-            if not category:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Category {split.category_id} not found in this budget"
-                )
+    fingerprint = transaction_fingerprint(transaction_data.amount_cents, transaction_data.notes)
+    duplicate = find_duplicates(db, current_user.id, [(fingerprint, transaction_data.date)]).get(0)
+    if duplicate:
+        duplicate_id, exact = duplicate
+        if exact and on_duplicate == "reject":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Duplicate of transaction {duplicate_id}"
+            )
+        response.headers["X-Duplicate-Of"] = str(duplicate_id)
     
     # Create transaction
     transaction = Transaction(
@@ -121,22 +195,31 @@ def create_transaction(
         amount_cents=transaction_data.amount_cents,
         date=transaction_data.date,
         notes=transaction_data.notes,
-        is_split=transaction_data.is_split
+        is_split=transaction_data.is_split,
+        fingerprint=fingerprint,
+        merchant=merchant_key(transaction_data.notes)
     )
     
     db.add(transaction)
     db.flush()  # Get transaction ID before creating splits
     
-    # Create splits if this is a split transaction
-    if transaction_data.is_split and transaction_data.splits:
-        for split_data in transaction_data.splits:
-            split = TransactionSplit(
-                transaction_id=transaction.id,
-                category_id=split_data.category_id,
-                amount_cents=split_data.amount_cents,
-                notes=split_data.notes
-            )
-            db.add(split)
+    # Create splits if this is a split transaction, in one executemany
+    if transaction_data.is_split:
+        now = datetime.utcnow()
+        db.execute(insert(TransactionSplit), [
+            {
+                "transaction_id": transaction.id,
+                "category_id": split.category_id,
+                "amount_cents": split.amount_cents,
+                "notes": split.notes,
+                "created_at": now
+            }
+            for split in splits
+        ])
+    
+    # Splits add up to the amount, so either way the whole amount is spent
+    apply_transaction_change(db, current_user.id, None, (transaction.budget_id, transaction.date, transaction.amount_cents))
+    apply_category_spend(db, {}, category_effect(transaction, splits=splits))
     
     db.commit()
     db.refresh(transaction)
@@ -145,50 +228,424 @@ def create_transaction(
     result = _get_transaction_with_splits(db, transaction.id, current_user.id)
     return result
 
+@router.post("/import", response_model=TransactionImportResult)
+def import_transactions(
+    file: UploadFile = File(..., description="Bank statement: CSV, OFX/QFX or QIF"),
+    file_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ofx|qif)$", description="Defaults to the file extension"),
+    negative_is_spending: bool = Query(True, description="Spending is negative in the file (OFX and QIF always are)"),
+    fallback_category: str = Query("Uncategorized", min_length=1, max_length=255, description="Category for rows no pattern matches"),
+    batch_size: Optional[int] = Query(None, ge=1, le=10000, description="Rows per INSERT; defaults to IMPORT_BATCH_SIZE"),
+    skip_duplicates: bool = Query(True, description="Leave out rows that duplicate transactions already recorded"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Import a bank statement into the budgets for each row's month"""
+    file_format = file_format or detect_format(file.filename)
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown statement format; pass format=csv, ofx or qif"
+        )
+    
+    try:
+        return import_statement(
+            db, current_user.id, file.file, file_format,
+            negative_is_spending=negative_is_spending,
+            fallback_category=fallback_category,
+            batch_size=batch_size,
+            skip_duplicates=skip_duplicates
+        )
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+def _add_effect(total: dict, effect: dict):
+    for category_id, (cents, count) in effect.items():
+        total_cents, total_count = total.get(category_id, (0, 0))
+        total[category_id] = (total_cents + cents, total_count + count)
+
+def _insert_transactions(db: Session, rows: List[dict]) -> List[int]:
+    """Insert rows with batched INSERT ... RETURNING; ids come back in the order of `rows`"""
+    table = Transaction.__table__
+    if db.get_bind().dialect.name == 'sqlite':
+        # SQLite cannot tag RETURNING rows with their parameters, so ordered returning would
+        # fall back to one INSERT per row. It holds the write lock for the whole statement,
+        # though, so rowids are handed out in insertion order and sorting restores it.
+        return sorted(db.scalars(insert(table).returning(table.c.id), rows).all())
+    return db.scalars(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows).all()
+
+@router.post("/bulk", response_model=TransactionBulkResult)
+def bulk_transactions(
+    request: TransactionBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Apply many creates, updates and deletes in one database transaction.
+    
+    Everything the operations reference is validated up front with one IN
+    query per kind. Operations that fail validation are reported and skipped;
+    the rest are written set-based and committed together.
+    """
+    operations = request.operations
+    results = [
+        {"index": index, "op": op.op, "id": op.id, "success": True, "error": None}
+        for index, op in enumerate(operations)
+    ]
+    
+    def fail(index: int, error: str):
+        results[index].update(success=False, error=error)
+    
+    # Load everything the operations reference
+    target_ids = {op.id for op in operations if op.op != "create" and op.id is not None}
+    transactions = {}
+    if target_ids:
+        transactions = {
+            transaction.id: transaction for transaction in db.query(Transaction).options(
+                selectinload(Transaction.splits)
+            ).filter(
+                Transaction.id.in_(target_ids),
+                Transaction.user_id == current_user.id
+            )
+        }
+    
+    budget_ids = {op.transaction.budget_id for op in operations if op.op == "create" and op.transaction}
+    owned_budgets = set()
+    if budget_ids:
+        owned_budgets = {
+            budget_id for (budget_id,) in db.query(Budget.id).filter(
+                Budget.id.in_(budget_ids),
+                Budget.user_id == current_user.id
+            )
+        }
+    
+    category_ids = set()
+    for op in operations:
+        if op.op == "create" and op.transaction:
+            if op.transaction.category_id is not None:
+                category_ids.add(op.transaction.category_id)
+            category_ids.update(split.category_id for split in op.transaction.splits or [])
+        elif op.op == "update" and op.changes and op.changes.category_id is not None:
+            category_ids.add(op.changes.category_id)
+    category_budgets = {}
+    if category_ids:
+        category_budgets = dict(db.query(BudgetCategory.id, BudgetCategory.budget_id).filter(
+            BudgetCategory.id.in_(category_ids)
+        ).all())
+    
+    # Validate every operation against what was loaded
+    creates, updates, deletes = [], [], []
+    claimed = set()
+    for index, op in enumerate(operations):
+        if op.op == "create":
+            data = op.transaction
+            splits = (data.splits or []) if data else []
+            total_splits = sum(split.amount_cents for split in splits)
+            if data is None:
+                fail(index, "transaction is required for create")
+            elif data.budget_id not in owned_budgets:
+                fail(index, "Budget not found")
+            elif not data.is_split and data.category_id is None:
+                fail(index, "category_id is required for non-split transactions")
+            elif not data.is_split and category_budgets.get(data.category_id) != data.budget_id:
+                fail(index, "Category not found in this budget")
+            elif data.is_split and not splits:
+                fail(index, "splits must be provided when is_split is True")
+            elif data.is_split and total_splits != data.amount_cents:
+                fail(index, f"Sum of splits ({total_splits}) must equal transaction amount ({data.amount_cents})")
+            elif data.is_split and any(category_budgets.get(split.category_id) != data.budget_id for split in splits):
+                fail(index, "Split category not found in this budget")
+            else:
+                creates.append((index, data))
+            continue
+        
+        transaction = transactions.get(op.id)
+        if transaction is None:
+            fail(index, "Transaction not found")
+        elif op.id in claimed:
+            fail(index, "Transaction already changed by an earlier operation")
+        elif op.op == "delete":
+            claimed.add(op.id)
+            deletes.append(transaction)
+        elif op.changes is None:
+            fail(index, "changes is required for update")
+        elif transaction.is_split and op.changes.amount_cents not in (None, transaction.amount_cents):
+            fail(index, "amount_cents of a split transaction must equal the sum of its splits")
+        elif transaction.is_split and op.changes.category_id is not None:
+            fail(index, "Split transactions are categorized by their splits")
+        elif op.changes.category_id is not None and category_budgets.get(op.changes.category_id) != transaction.budget_id:
+            fail(index, "Category not found in this budget")
+        else:
+            claimed.add(op.id)
+            updates.append((transaction, op.changes))
+    
+    fingerprints = {
+        index: transaction_fingerprint(data.amount_cents, data.notes) for index, data in creates
+    }
+    if request.skip_duplicates and creates:
+        duplicates = find_duplicates(db, current_user.id, [(fingerprints[index], data.date) for index, data in creates])
+        for position, (duplicate_id, _) in duplicates.items():
+            fail(creates[position][0], f"Duplicate of transaction {duplicate_id}")
+        creates = [item for position, item in enumerate(creates) if position not in duplicates]
+    
+    now = datetime.utcnow()
+    spend_before, spend_after = {}, {}
+    
+    if deletes:
+        delete_ids = [transaction.id for transaction in deletes]
+        for transaction in deletes:
+            _add_effect(spend_before, category_effect(transaction))
+        db.query(TransactionSplit).filter(
+            TransactionSplit.transaction_id.in_(delete_ids)
+        ).delete(synchronize_session=False)
+        db.query(Transaction).filter(
+            Transaction.id.in_(delete_ids)
+        ).delete(synchronize_session=False)
+    
+    if updates:
+        rows = []
+        for transaction, changes in updates:
+            values = changes.model_dump(exclude_none=True)
+            if "amount_cents" in values or "notes" in values:
+                values["fingerprint"] = transaction_fingerprint(
+                    values.get("amount_cents", transaction.amount_cents), values.get("notes", transaction.notes)
+                )
+            if "notes" in values:
+                values["merchant"] = merchant_key(values["notes"])
+            # The loaded rows are left untouched so the session has nothing to flush row by row
+            changed = Transaction(
+                is_split=transaction.is_split,
+                category_id=values.get("category_id", transaction.category_id),
+                amount_cents=values.get("amount_cents", transaction.amount_cents)
+            )
+            _add_effect(spend_before, category_effect(transaction))
+            _add_effect(spend_after, category_effect(changed, splits=transaction.splits))
+            rows.append({"id": transaction.id, "updated_at": now, **values})
+        # Bulk UPDATE by primary key: one executemany per distinct set of changed fields
+        db.execute(update(Transaction), rows)
+    
+    if creates:
+        new_ids = _insert_transactions(db, [
+            {
+                "user_id": current_user.id,
+                "budget_id": data.budget_id,
+                "category_id": None if data.is_split else data.category_id,
+                "amount_cents": data.amount_cents,
+                "date": data.date,
+                "notes": data.notes,
+                "is_split": data.is_split,
+                "fingerprint": fingerprints[index],
+                "merchant": merchant_key(data.notes),
+                "created_at": now,
+                "updated_at": now
+            }
+            for index, data in creates
+        ])
+        
+        split_rows = []
+        for (index, data), transaction_id in zip(creates, new_ids):
+            results[index]["id"] = transaction_id
+            created = Transaction(is_split=data.is_split, category_id=data.category_id, amount_cents=data.amount_cents)
+            _add_effect(spend_after, category_effect(created, splits=data.splits or []))
+            split_rows.extend(
+                {
+                    "transaction_id": transaction_id,
+                    "category_id": split.category_id,
+                    "amount_cents": split.amount_cents,
+                    "notes": split.notes,
+                    "created_at": now
+                }
+                for split in data.splits or []
+            )
+        if split_rows:
+            db.execute(insert(TransactionSplit), split_rows)
+    
+    if creates or updates or deletes:
+        apply_category_spend(db, spend_before, spend_after)
+        refresh_dashboard_sections(db, current_user.id, "budget", "transactions")
+        db.commit()
+    
+    failed = sum(1 for result in results if not result["success"])
+    return {
+        "results": results,
+        "succeeded": len(results) - failed,
+        "failed": failed
+    }
+
 @router.get("", response_model=List[TransactionWithSplits])
 def list_transactions(
+    response: Response,
     budget_id: Optional[int] = Query(None),
     category_id: Optional[int] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
-    limit: int = Query(50, le=200),
+    limit: int = Query(50, ge=1, le=200),
+    q: Optional[str] = Query(None, max_length=200, description="Words to find in the notes, matched as prefixes and ranked by relevance"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(Transaction).filter(Transaction.user_id == current_user.id)
-    
-    if budget_id:
-        query = query.filter(Transaction.budget_id == budget_id)
+    terms = None
+    if q is not None:
+        terms = search_terms(q)
+        if not terms:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Search needs at least one word"
+            )
     
-    if category_id:
-        # For split transactions, filter by splits
-        split_transaction_ids = db.query(TransactionSplit.transaction_id).filter(
-            TransactionSplit.category_id == category_id
-        ).subquery()
+    def fetch(source, split_source, *columns):
+        """One page from `source`, with one extra row telling whether there is another.
+        
+        With `columns`, each row is the transaction followed by their values.
+        """
+        query = db.query(source, *columns).filter(source.user_id == current_user.id)
+        
+        relevance = None
+        if terms is not None:
+            query, relevance = apply_search(db, query, terms)
+        
+        if budget_id:
+            query = query.filter(source.budget_id == budget_id)
+        
+        if category_id:
+            # For split transactions, filter by splits
+            split_transaction_ids = select(split_source.transaction_id).where(
+                split_source.category_id == category_id
+            )
+            
+            query = query.filter(
+                or_(
+                    source.category_id == category_id,
+                    source.id.in_(split_transaction_ids)
+                )
+            )
+        
+        if start_date:
+            query = query.filter(source.date >= start_date)
+        
+        if end_date:
+            query = query.filter(source.date <= end_date)
+        
+        newest_first = (source.date.desc(), source.created_at.desc(), source.id.desc())
         
-        query = query.filter(
-            or_(
-                Transaction.category_id == category_id,
-                Transaction.id.in_(split_transaction_ids)
+        if relevance is not None:
+            # Ranked results have no keyset order, so search pages continue by offset
+            offset = _decode_search_cursor(cursor) if cursor else 0
+            transactions = query.order_by(relevance, *newest_first).offset(offset).limit(limit + 1).all()
+            return transactions, _encode_search_cursor(offset + limit)
+        
+        # Keyset pagination: continue strictly after the last row of the previous page
+        if cursor:
+            query = query.filter(
+                tuple_(source.date, source.created_at, source.id) < tuple_(*_decode_cursor(cursor))
             )
+        rows = query.order_by(*newest_first).limit(limit + 1).all()
+        last = rows[limit - 1] if len(rows) > limit else None
+        return rows, _encode_cursor(last[0] if columns else last) if last is not None else None
+    
+    split_source = TransactionSplit
+    if terms is not None:
+        # Archived notes aren't in the search index, so searches read the hot tables only
+        transactions, next_cursor = fetch(Transaction, TransactionSplit)
+    else:
+        # The hot page carries the newest archived date in range along, so a page that
+        # fills up with rows newer than every archived one costs no extra query
+        latest_archived = latest_archived_query(db, current_user.id, start_date, end_date, budget_id)
+        rows, next_cursor = fetch(Transaction, TransactionSplit, latest_archived.scalar_subquery())
+        transactions = [transaction for transaction, _ in rows]
+        latest = rows[0][1] if rows else latest_archived.scalar()
+        if latest is not None and (len(transactions) <= limit or transactions[limit].date <= latest):
+            source, split_source = transaction_sources(True)
+            transactions, next_cursor = fetch(source, split_source)
+    
+    # The extra row only tells us whether there is another page
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return _serialize_transactions(db, transactions, split_source)
+
+@router.get("/duplicates", response_model=List[TransactionDuplicateCluster])
+def list_duplicate_transactions(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Clusters of transactions in the user's history that look like duplicates of each other"""
+    return duplicate_clusters(db, current_user.id)
+
+@router.get("/recurring", response_model=List[TransactionRecurringCharge])
+def list_recurring_charges(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Subscriptions, bills and other charges the user pays on a regular cadence, next due first.
+    
+    Not read-only: when transactions changed since the last request, the charges
+    are detected again and the stored results updated and committed.
+    """
+    try:
+        charges = recurring_charges(db, current_user.id)
+    except RuntimeError as e:
+        # numpy is an optional dependency, needed by this endpoint only
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
         )
     
-    if start_date:
-        query = query.filter(Transaction.date >= start_date)
-    
-    if end_date:
-        query = query.filter(Transaction.date <= end_date)
+    today = date.today()
+    return [
+        {
+            "merchant": charge.merchant,
+            "notes": charge.notes,
+            "category_id": charge.category_id,
+            "cadence": charge.cadence,
+            "occurrences": charge.occurrences,
+            "amount_cents": charge.amount_cents,
+            "average_amount_cents": charge.average_amount_cents,
+            "amount_variation": charge.amount_variation,
+            "first_date": charge.first_date,
+            "last_date": charge.last_date,
+            "next_date": charge.next_date,
+            "active": is_active(charge, today),
+            "last_transaction_id": charge.last_transaction_id
+        }
+        for charge in charges
+    ]
+
+@router.get("/running", response_model=TransactionRunningTotals)
+def get_running_totals(
+    budget_id: int = Query(...),
+    category_id: Optional[int] = Query(None),
+    by: str = Query("category", pattern="^(category|total)$", description="One series per category, or one for the whole budget"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cumulative spend per day of a budget, as dates plus a parallel array per series"""
+    budget = db.query(Budget).filter(
+        Budget.id == budget_id,
+        Budget.user_id == current_user.id
+    ).first()
     
-    transactions = query.order_by(Transaction.date.desc(), Transaction.created_at.desc()).limit(limit).all()
+    if not budget:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Budget not found"
+        )
     
-    # Get full details with splits for each transaction
-    results = []
-    for transaction in transactions:
-        result = _get_transaction_with_splits(db, transaction.id, current_user.id)
-        if result:
-            results.append(result)
+    if category_id is not None and not any(category.id == category_id for category in budget.categories):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found in this budget"
+        )
     
-    return results
+    source, split_source = transaction_sources(
+        reaches_archive(db, current_user.id, date(budget.year, budget.month, 1))
+    )
+    return running_spend(db, budget, by_category=(by == "category"), category_id=category_id,
+                         source=source, split_source=split_source)
 
 @router.get("/{transaction_id}", response_model=TransactionWithSplits)
 def get_transaction(
@@ -224,40 +681,22 @@ def get_budget_transaction_summary(
             detail="Budget not found"
         )
     
-    # Get all categories with their spent amounts
+    # Spent totals are maintained on the category rows, so this is a single query
     categories = db.query(BudgetCategory).filter(
         BudgetCategory.budget_id == budget_id
     ).all()
     
-    category_summary = []
-    for category in categories:
-        # Get regular transactions
-        regular_spent = db.query(Transaction).filter(
-            Transaction.category_id == category.id,
-            Transaction.is_split == False
-        ).with_entities(
-            Transaction.amount_cents
-        ).all()
-        
-        # Get split transactions
-        split_spent = db.query(TransactionSplit).filter(
-            TransactionSplit.category_id == category.id
-        ).with_entities(
-            TransactionSplit.amount_cents
-        ).all()
-        
-        regular_cents = sum(t[0] for t in regular_spent) if regular_spent else 0
-        split_cents = sum(s[0] for s in split_spent) if split_spent else 0
-        spent_cents = regular_cents + split_cents
-        remaining_cents = category.allocated_cents - spent_cents
-        
-        category_summary.append({
+    category_summary = [
+        {
             "category_id": category.id,
             "category_name": category.name,
             "allocated_cents": category.allocated_cents,
-            "spent_cents": spent_cents,
-            "remaining_cents": remaining_cents
-        })
+            "spent_cents": category.spent_cents,
+            "remaining_cents": category.allocated_cents - category.spent_cents,
+            "transaction_count": category.transaction_count
+        }
+        for category in categories
+    ]
     
     return {
         "budget_id": budget_id,
@@ -282,6 +721,9 @@ def update_transaction(
             detail="Transaction not found"
         )
     
+    before = transaction_effect(transaction)
+    before_categories = category_effect(transaction)
+    
     # If category is being changed, verify it belongs to the same budget
     if transaction_data.category_id is not None:
         category = db.query(BudgetCategory).filter(
@@ -306,6 +748,12 @@ def update_transaction(
     if transaction_data.notes is not None:
         transaction.notes = transaction_data.notes
     
+    transaction.fingerprint = transaction_fingerprint(transaction.amount_cents, transaction.notes)
+    transaction.merchant = merchant_key(transaction.notes)
+    
+    apply_transaction_change(db, current_user.id, before, transaction_effect(transaction))
+    apply_category_spend(db, before_categories, category_effect(transaction))
+    
     db.commit()
     db.refresh(transaction)
     
@@ -328,6 +776,8 @@ def delete_transaction(
             detail="Transaction not found"
         )
     
+    apply_transaction_change(db, current_user.id, transaction_effect(transaction), None)
+    apply_category_spend(db, category_effect(transaction), {})
     db.delete(transaction)
     db.commit()
     
@@ -3,12 +3,35 @@ from typing import List
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./invoicing.db"
+    DATABASE_POOL_SIZE: int = 5  # Connections kept open (PostgreSQL)
+    DATABASE_MAX_OVERFLOW: int = 10  # Extra connections opened under load (PostgreSQL)
     SECRET_KEY: str = "dev-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    STREAM_TICKET_EXPIRE_SECONDS: int = 60  # Event stream tickets, passed in the URL instead of the access token
     CORS_ORIGINS: str = "http://localhost:3000"
-    
+    PDF_STORAGE_BACKEND: str = "local"  # "local" or "s3"
+    PDF_STORAGE_DIR: str = "storage/pdfs"
+    PDF_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # LRU cap for local PDFs, applied by trim_pdf_storage.py
+    PDF_DELETE_GRACE_SECONDS: int = 3600  # Superseded renders outlive downloads still streaming them
+    PDF_EXPORT_WORKERS: int = 4
+    PDF_PRESIGNED_REDIRECTS: bool = False  # Redirect downloads to the object store instead of proxying
+    PDF_PRESIGNED_TTL_SECONDS: int = 300
+    S3_BUCKET: str = ""
+    S3_PREFIX: str = "pdfs"
+    S3_ENDPOINT_URL: str = ""  # Set for MinIO or other S3-compatible stores
+    S3_REGION: str = ""
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    DASHBOARD_SECTION_WORKERS: int = 6  # Connections used at once to compute dashboard sections, at most pool size + overflow
+    EVENT_BACKEND: str = "local"  # "local" (single worker) or "redis" (fan-out across workers)
+    EVENT_REDIS_URL: str = "redis://localhost:6379/0"
+    EVENT_CHANNEL_PREFIX: str = "dashboard-events"
+    EVENT_KEEPALIVE_SECONDS: int = 15
+    IMPORT_BATCH_SIZE: int = 1000  # Statement import rows per executemany INSERT
+    ARCHIVE_AFTER_MONTHS: int = 13  # Whole months kept in the hot transaction tables before archival
+
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
@@ -1,21 +1,54 @@
-from sqlalchemy import create_engine
+import re
+import sqlite3
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
 # PostgreSQL doesn't need check_same_thread, only SQLite does
 connect_args = {"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+# SQLite keeps SQLAlchemy's default pool, whose size depends on the database being a file or :memory:
+pool_args = {} if "sqlite" in settings.DATABASE_URL else {
+    "pool_size": settings.DATABASE_POOL_SIZE,
+    "max_overflow": settings.DATABASE_MAX_OVERFLOW
+}
 
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args=connect_args,
-    pool_pre_ping=True  # Verify connections before using them
+    pool_pre_ping=True,  # Verify connections before using them
+    **pool_args
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def _trigrams(value: str) -> set:
+    """Trigrams of each word, padded the way pg_trgm pads them"""
+    grams = set()
+    for word in re.findall(r"\w+", value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def trigram_similarity(a: str, b: str) -> float:
+    """Same measure as pg_trgm's similarity(), for databases without the extension"""
+    if a is None or b is None:
+        return None
+    left, right = _trigrams(a), _trigrams(b)
+    if not left or not right:
+        return 0.0
+    common = len(left & right)
+    return common / (len(left) + len(right) - common)
+
+@event.listens_for(Engine, "connect")
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    # PostgreSQL gets similarity() from pg_trgm; give SQLite the same function
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function("similarity", 2, trigram_similarity, deterministic=True)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -27,6 +27,13 @@ def create_refresh_token(data: dict) -> str:
     to_encode.update({"exp": expire, "type": "refresh"})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
+def create_stream_ticket(data: dict) -> str:
+    """Short-lived token that only opens event streams, for clients that cannot send headers"""
+    to_encode = data.copy()
+    expire = datetime.utcnow() + timedelta(seconds=settings.STREAM_TICKET_EXPIRE_SECONDS)
+    to_encode.update({"exp": expire, "type": "stream"})
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
 def decode_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
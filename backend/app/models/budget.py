@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, Index, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, Index, Text, Boolean, func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
@@ -32,6 +32,9 @@ class BudgetCategory(Base):
     description = Column(Text, nullable=True)  # Optional description for categories
     category_group = Column(String(100), nullable=True)  # For grouping categories
     is_active = Column(Boolean, default=True)
+    # Maintained by the transactions API (see app/services/category_spend.py)
+    spent_cents = Column(Integer, nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -41,4 +44,8 @@ class BudgetCategory(Base):
         Index('idx_budget_category_budget_order', 'budget_id', 'order'),
         Index('idx_budget_category_budget_active', 'budget_id', 'is_active'),
         Index('idx_budget_category_group', 'budget_id', 'category_group'),
+        # Prefix search, text_pattern_ops so LIKE 'abc%' can use it under any collation;
+        # on PostgreSQL also a pg_trgm index (supabase_migrations/category_search.sql)
+        Index('idx_budget_category_budget_lower_name', 'budget_id', func.lower(name).label('lower_name'),
+              postgresql_ops={'lower_name': 'text_pattern_ops'}),
     )
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, JSON
+from datetime import datetime
+from app.core.database import Base
+
+class DashboardState(Base):
+    """Materialized dashboard metrics per user, kept current by the write endpoints"""
+    __tablename__ = "dashboard_state"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    as_of = Column(Date, nullable=False)  # Day the month- and date-relative values were computed for
+    version = Column(Integer, nullable=False, default=0)  # Bumped by every write, see rebuild_dashboard_state
+    
+    # Current month's budget (budget_id is NULL when there is none)
+    budget_id = Column(Integer, nullable=True)
+    budget_income_cents = Column(Integer, nullable=False, default=0)
+    budget_allocated_cents = Column(Integer, nullable=False, default=0)
+    budget_spent_cents = Column(Integer, nullable=False, default=0)
+    
+    transaction_count_month = Column(Integer, nullable=False, default=0)
+    
+    sinking_fund_count = Column(Integer, nullable=False, default=0)
+    sinking_total_goal_cents = Column(Integer, nullable=False, default=0)
+    sinking_total_saved_cents = Column(Integer, nullable=False, default=0)
+    sinking_funds = Column(JSON, nullable=False, default=list)  # First five active funds
+    
+    total_assets_cents = Column(Integer, nullable=False, default=0)
+    asset_count = Column(Integer, nullable=False, default=0)
+    total_liabilities_cents = Column(Integer, nullable=False, default=0)
+    liability_count = Column(Integer, nullable=False, default=0)
+    
+    goal_count = Column(Integer, nullable=False, default=0)
+    goal_active_count = Column(Integer, nullable=False, default=0)
+    goal_completed_count = Column(Integer, nullable=False, default=0)
+    goal_target_cents = Column(Integer, nullable=False, default=0)
+    goal_saved_cents = Column(Integer, nullable=False, default=0)
+    
+    paycheck_upcoming_count = Column(Integer, nullable=False, default=0)
+    next_paycheck = Column(JSON, nullable=True)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index
+from datetime import datetime
+from app.core.database import Base
+
+class RecurringCharge(Base):
+    """A merchant the user pays on a regular cadence, found by app.services.recurring_charges"""
+    __tablename__ = "recurring_charges"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    merchant = Column(String, nullable=False)  # Normalized notes the transactions share
+    notes = Column(String, nullable=True)  # As written on the latest transaction
+    category_id = Column(Integer, nullable=True)  # Of the latest transaction
+    cadence = Column(String(16), nullable=False)  # weekly, biweekly, monthly, quarterly or yearly
+    occurrences = Column(Integer, nullable=False)
+    amount_cents = Column(Integer, nullable=False)  # Latest amount
+    average_amount_cents = Column(Integer, nullable=False)
+    amount_variation = Column(Float, nullable=False)  # Standard deviation over mean of the amounts
+    first_date = Column(Date, nullable=False)
+    last_date = Column(Date, nullable=False)
+    next_date = Column(Date, nullable=False)
+    last_transaction_id = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_recurring_charges_user_merchant', 'user_id', 'merchant', unique=True),
+    )
+
+class RecurringScan(Base):
+    """Which of a user's transactions the stored recurring charges were computed from"""
+    __tablename__ = "recurring_scans"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    transaction_count = Column(Integer, nullable=False)
+    last_transaction_id = Column(Integer, nullable=False)
+    last_updated_at = Column(DateTime, nullable=True)  # Latest transactions.updated_at seen
+    scanned_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
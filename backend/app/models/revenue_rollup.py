@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from datetime import datetime
+from app.core.database import Base
+
+class RevenueByMonth(Base):
+    """Running payment totals per calendar month, maintained by record_payment"""
+    __tablename__ = "revenue_by_month"
+    
+    month = Column(String(7), primary_key=True)  # YYYY-MM
+    revenue_cents = Column(Integer, nullable=False, default=0)
+    payment_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class RevenueByCustomer(Base):
+    """Running payment totals per customer, maintained by record_payment"""
+    __tablename__ = "revenue_by_customer"
+    
+    customer_id = Column(Integer, ForeignKey("customers.id"), primary_key=True)
+    total_paid_cents = Column(Integer, nullable=False, default=0)
+    payment_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_revenue_by_customer_total', 'total_paid_cents'),
+    )
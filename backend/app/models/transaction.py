@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
+from app.models.transaction_search import attach_search_ddl
 
 class Transaction(Base):
     __tablename__ = "transactions"
@@ -14,12 +15,22 @@ class Transaction(Base):
     date = Column(Date, nullable=False)
     notes = Column(String, nullable=True)
     is_split = Column(Boolean, default=False, nullable=False)  # Flag for split transactions
+    fingerprint = Column(String(32), nullable=True)  # Amount and normalized notes, for duplicate detection
+    merchant = Column(String, nullable=True)  # Notes normalized into a merchant, for recurring charge detection
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     budget = relationship("Budget")
     category = relationship("BudgetCategory")
     splits = relationship("TransactionSplit", back_populates="transaction", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index('idx_transaction_user_date', 'user_id', 'date'),
+        Index('idx_transaction_budget_date', 'budget_id', 'date'),
+        Index('idx_transaction_category_split', 'category_id', 'is_split'),
+        Index('idx_transaction_user_fingerprint', 'user_id', 'fingerprint', 'date'),
+        Index('idx_transaction_user_merchant', 'user_id', 'merchant'),
+    )
 
 
 class TransactionSplit(Base):
@@ -34,3 +45,11 @@ class TransactionSplit(Base):
     
     transaction = relationship("Transaction", back_populates="splits")
     category = relationship("BudgetCategory")
+    
+    __table_args__ = (
+        Index('idx_transaction_splits_transaction_id', 'transaction_id'),
+        Index('idx_transaction_splits_category_id', 'category_id'),
+    )
+
+
+attach_search_ddl(TransactionSplit.__table__)
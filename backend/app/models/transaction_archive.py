@@ -0,0 +1,59 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Boolean, Index
+from app.core.database import Base
+
+class ArchivedTransaction(Base):
+    """Transactions of closed periods, moved out of `transactions` by the archival job.
+    
+    Same columns in the same order as Transaction, ids kept, so the two tables
+    can be read as one through a UNION ALL.
+    """
+    __tablename__ = "transactions_archive"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    budget_id = Column(Integer, ForeignKey("budgets.id"), nullable=False)
+    category_id = Column(Integer, ForeignKey("budget_categories.id"), nullable=True)
+    amount_cents = Column(Integer, nullable=False)
+    date = Column(Date, nullable=False)
+    notes = Column(String, nullable=True)
+    is_split = Column(Boolean, default=False, nullable=False)
+    fingerprint = Column(String(32), nullable=True)
+    merchant = Column(String, nullable=True)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index('idx_transactions_archive_user_date', 'user_id', 'date'),
+        Index('idx_transactions_archive_budget_date', 'budget_id', 'date'),
+        Index('idx_transactions_archive_category_split', 'category_id', 'is_split'),
+        Index('idx_transactions_archive_user_merchant', 'user_id', 'merchant'),
+    )
+
+
+class ArchivedTransactionSplit(Base):
+    """Splits of archived transactions; same columns as TransactionSplit"""
+    __tablename__ = "transaction_splits_archive"
+    
+    id = Column(Integer, primary_key=True)
+    transaction_id = Column(Integer, ForeignKey("transactions_archive.id"), nullable=False)
+    category_id = Column(Integer, ForeignKey("budget_categories.id"), nullable=False)
+    amount_cents = Column(Integer, nullable=False)
+    notes = Column(String, nullable=True)
+    created_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index('idx_transaction_splits_archive_transaction_id', 'transaction_id'),
+        Index('idx_transaction_splits_archive_category_id', 'category_id'),
+    )
+
+
+class ArchivedCategoryMonth(Base):
+    """What the archived transactions of one month contribute to a category"""
+    __tablename__ = "archived_category_months"
+    
+    category_id = Column(Integer, ForeignKey("budget_categories.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    spent_cents = Column(Integer, nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,124 @@
+"""Full-text search index over transaction and split notes.
+
+One search document per transaction: its notes followed by the notes of its
+splits. Database triggers keep the documents in step with every write, ORM or
+bulk, so application code never maintains them.
+
+- SQLite: an FTS5 table keyed by the transaction id (rowid)
+- PostgreSQL: a tsvector per transaction with a GIN index
+"""
+from sqlalchemy import DDL, event
+
+# Notes of a transaction and its splits, for the transaction id bound to `{id}`
+_SQLITE_DOCUMENT = """
+    (SELECT coalesce(t.notes, '') || ' ' || coalesce(
+        (SELECT group_concat(s.notes, ' ') FROM transaction_splits s WHERE s.transaction_id = t.id), '')
+     FROM transactions t WHERE t.id = {id})
+"""
+
+_SQLITE_REFRESH = "INSERT OR REPLACE INTO transaction_search(rowid, document) VALUES ({id}, " + _SQLITE_DOCUMENT + ");"
+
+SQLITE_STATEMENTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transaction_search
+    USING fts5(document, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transaction_search_insert AFTER INSERT ON transactions BEGIN
+        {_SQLITE_REFRESH.format(id="new.id")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transaction_search_update AFTER UPDATE OF notes ON transactions BEGIN
+        {_SQLITE_REFRESH.format(id="new.id")}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transaction_search_delete AFTER DELETE ON transactions BEGIN
+        DELETE FROM transaction_search WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transaction_search_split_insert AFTER INSERT ON transaction_splits BEGIN
+        {_SQLITE_REFRESH.format(id="new.transaction_id")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transaction_search_split_update AFTER UPDATE OF notes ON transaction_splits BEGIN
+        {_SQLITE_REFRESH.format(id="new.transaction_id")}
+    END
+    """,
+    # The parent may already be gone when its splits are deleted with it; leave its row alone then
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transaction_search_split_delete AFTER DELETE ON transaction_splits
+    WHEN EXISTS (SELECT 1 FROM transactions WHERE id = old.transaction_id) BEGIN
+        {_SQLITE_REFRESH.format(id="old.transaction_id")}
+    END
+    """,
+]
+
+SQLITE_BACKFILL = """
+    INSERT OR REPLACE INTO transaction_search(rowid, document)
+    SELECT t.id, coalesce(t.notes, '') || ' ' || coalesce(
+        (SELECT group_concat(s.notes, ' ') FROM transaction_splits s WHERE s.transaction_id = t.id), '')
+    FROM transactions t
+"""
+
+# Deleting a transaction drops its row through ON DELETE CASCADE
+POSTGRES_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS transaction_search (
+        transaction_id INTEGER PRIMARY KEY REFERENCES transactions(id) ON DELETE CASCADE,
+        document TSVECTOR NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_transaction_search_document ON transaction_search USING gin (document)",
+    """
+    CREATE OR REPLACE FUNCTION refresh_transaction_search(target_id INTEGER) RETURNS VOID AS $$
+        INSERT INTO transaction_search (transaction_id, document)
+        SELECT t.id, to_tsvector('simple', coalesce(t.notes, '') || ' ' || coalesce(
+            (SELECT string_agg(s.notes, ' ') FROM transaction_splits s WHERE s.transaction_id = t.id), ''))
+        FROM transactions t WHERE t.id = target_id
+        ON CONFLICT (transaction_id) DO UPDATE SET document = EXCLUDED.document;
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION transaction_search_sync() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_TABLE_NAME = 'transactions' THEN
+            PERFORM refresh_transaction_search(NEW.id);
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM refresh_transaction_search(OLD.transaction_id);
+        ELSE
+            PERFORM refresh_transaction_search(NEW.transaction_id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS transaction_search_sync ON transactions",
+    """
+    CREATE TRIGGER transaction_search_sync AFTER INSERT OR UPDATE OF notes ON transactions
+    FOR EACH ROW EXECUTE FUNCTION transaction_search_sync()
+    """,
+    "DROP TRIGGER IF EXISTS transaction_search_split_sync ON transaction_splits",
+    """
+    CREATE TRIGGER transaction_search_split_sync AFTER INSERT OR UPDATE OF notes OR DELETE ON transaction_splits
+    FOR EACH ROW EXECUTE FUNCTION transaction_search_sync()
+    """,
+]
+
+POSTGRES_BACKFILL = """
+    INSERT INTO transaction_search (transaction_id, document)
+    SELECT t.id, to_tsvector('simple', coalesce(t.notes, '') || ' ' || coalesce(
+        (SELECT string_agg(s.notes, ' ') FROM transaction_splits s WHERE s.transaction_id = t.id), ''))
+    FROM transactions t
+    ON CONFLICT (transaction_id) DO UPDATE SET document = EXCLUDED.document
+"""
+
+
+def attach_search_ddl(table):
+    """Create the index whenever metadata.create_all creates `table`; pass the splits table, created last"""
+    for dialect, statements in (("sqlite", SQLITE_STATEMENTS), ("postgresql", POSTGRES_STATEMENTS)):
+        for statement in statements:
+            event.listen(table, "after_create", DDL(statement).execute_if(dialect=dialect))
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
 from datetime import datetime
 
@@ -11,6 +11,9 @@ class BudgetCategoryCreate(BudgetCategoryBase):
     description: Optional[str] = None
     category_group: Optional[str] = None
 
+class BudgetCategoryMerge(BudgetCategoryCreate):
+    id: Optional[int] = None  # Existing category to update; otherwise matched by name
+
 class BudgetCategoryUpdate(BaseModel):
     name: Optional[str] = None
     allocated_cents: Optional[int] = Field(None, ge=0)
@@ -51,7 +54,7 @@ class BudgetCreate(BudgetBase):
 
 class BudgetUpdate(BaseModel):
     income_cents: Optional[int] = Field(None, ge=0)
-    categories: Optional[List[BudgetCategoryCreate]] = None
+    categories: Optional[List[BudgetCategoryMerge]] = None
 
 class Budget(BudgetBase):
     id: int
@@ -60,9 +63,34 @@ class Budget(BudgetBase):
     created_at: datetime
     updated_at: datetime
     
+    @field_validator('categories')
+    @classmethod
+    def hide_removed_categories(cls, v):
+        # Categories removed by update_budget are soft-deleted to keep transaction links
+        return [category for category in v if category.is_active]
+    
     class Config:
         from_attributes = True
 
+class BudgetCategoryActivity(BudgetCategory):
+    spent_cents: int
+    transaction_count: int
+
+class BudgetCategoryPage(BaseModel):
+    categories: List[BudgetCategoryActivity]
+    total: int
+    limit: int
+    offset: int
+    has_more: bool
+
+class BudgetPeriodSummary(BudgetBase):
+    id: int
+    user_id: int
+    total_allocated_cents: int
+    spent_cents: int
+    remaining_cents: int
+    categories: Optional[List[BudgetCategoryActivity]] = None  # Omitted unless requested
+
 class BudgetSummary(BaseModel):
     budget: Budget
     total_allocated_cents: int
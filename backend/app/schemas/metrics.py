@@ -10,6 +10,10 @@ class TopCustomer(BaseModel):
     name: str
     total_paid_cents: int
 
+class StreamTicket(BaseModel):
+    ticket: str
+    expires_in: int  # Seconds
+
 class MetricsSummary(BaseModel):
     outstanding_count: int
     outstanding_total_cents: int
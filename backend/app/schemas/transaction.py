@@ -79,3 +79,68 @@ class TransactionWithSplits(Transaction):
     
     class Config:
         from_attributes = True
+
+class TransactionImportResult(BaseModel):
+    imported: int
+    categorized: int  # Matched a learned pattern; the rest went to the fallback category
+    skipped: int
+    batches: int
+    duplicates: int  # Rows matching a recorded transaction; skipped unless skip_duplicates is off
+    errors: List[str]  # First skipped rows with the reason
+
+class TransactionBulkOperation(BaseModel):
+    op: str = Field(pattern="^(create|update|delete)$")
+    id: Optional[int] = None  # Transaction to update or delete
+    transaction: Optional[TransactionCreate] = None  # For create
+    changes: Optional[TransactionUpdate] = None  # For update
+
+class TransactionBulkRequest(BaseModel):
+    operations: List[TransactionBulkOperation] = Field(max_length=5000)
+    skip_duplicates: bool = False  # Fail creates that duplicate a recorded transaction
+
+class TransactionBulkItemResult(BaseModel):
+    index: int
+    op: str
+    id: Optional[int] = None
+    success: bool
+    error: Optional[str] = None
+
+class TransactionBulkResult(BaseModel):
+    results: List[TransactionBulkItemResult]
+    succeeded: int
+    failed: int
+
+class TransactionDuplicateCluster(BaseModel):
+    fingerprint: str
+    exact: bool  # All on the same date; otherwise within a day of each other
+    amount_cents: int
+    notes: Optional[str] = None
+    first_date: date
+    last_date: date
+    transaction_ids: List[int]
+
+class TransactionRunningSeries(BaseModel):
+    category_id: Optional[int] = None  # None for the whole-budget series
+    category_name: Optional[str] = None
+    allocated_cents: int
+    cumulative_cents: List[int]  # Parallel to TransactionRunningTotals.dates
+
+class TransactionRunningTotals(BaseModel):
+    budget_id: int
+    dates: List[date]  # Days with spending, oldest first
+    series: List[TransactionRunningSeries]
+
+class TransactionRecurringCharge(BaseModel):
+    merchant: str  # Normalized notes shared by the charges
+    notes: Optional[str] = None  # As written on the latest charge
+    category_id: Optional[int] = None
+    cadence: str  # weekly, biweekly, monthly, quarterly or yearly
+    occurrences: int
+    amount_cents: int  # Latest amount
+    average_amount_cents: int
+    amount_variation: float  # Standard deviation over mean of the amounts
+    first_date: date
+    last_date: date
+    next_date: date  # When the next charge is expected
+    active: bool  # False once next_date has passed without a charge
+    last_transaction_id: int
@@ -3,8 +3,9 @@ from sqlalchemy import func, and_, or_, case, extract
 from datetime import date, datetime, timedelta
 from typing import List, Dict, Any, Optional
 from app.models.budget import Budget, BudgetCategory
-from app.models.transaction import Transaction, TransactionSplit
+from app.models.transaction import TransactionSplit
 from app.models.paycheck import Paycheck
+from app.services.transaction_archive import reaches_archive, transaction_sources
 from app.schemas.budget_report import (
     ReportRequest, CategorySpending, MonthlyTrend, BudgetComparison,
     SpendingReport, IncomeReport, CategoryReport, TrendReport, ComparisonReport
@@ -21,23 +22,25 @@ class BudgetReportService:
     ) -> SpendingReport:
         """Generate comprehensive spending report"""
         
+        source, _ = transaction_sources(reaches_archive(db, user_id, request.date_range_start))
+        
         # Base query for transactions
-        query = db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.date >= request.date_range_start,
-            Transaction.date <= request.date_range_end
+        query = db.query(source).filter(
+            source.user_id == user_id,
+            source.date >= request.date_range_start,
+            source.date <= request.date_range_end
         )
         
         # Apply filters
         if request.filters:
             if request.filters.budget_ids:
-                query = query.filter(Transaction.budget_id.in_(request.filters.budget_ids))
+                query = query.filter(source.budget_id.in_(request.filters.budget_ids))
             if request.filters.category_ids:
-                query = query.filter(Transaction.category_id.in_(request.filters.category_ids))
+                query = query.filter(source.category_id.in_(request.filters.category_ids))
             if request.filters.min_amount_cents:
-                query = query.filter(Transaction.amount_cents >= request.filters.min_amount_cents)
+                query = query.filter(source.amount_cents >= request.filters.min_amount_cents)
             if request.filters.max_amount_cents:
-                query = query.filter(Transaction.amount_cents <= request.filters.max_amount_cents)
+                query = query.filter(source.amount_cents <= request.filters.max_amount_cents)
         
         transactions = query.all()
         
@@ -50,19 +53,19 @@ class BudgetReportService:
         category_spending = db.query(
             BudgetCategory.id,
             BudgetCategory.name,
-            func.sum(Transaction.amount_cents).label('total'),
-            func.count(Transaction.id).label('count')
+            func.sum(source.amount_cents).label('total'),
+            func.count(source.id).label('count')
         ).join(
-            Transaction, Transaction.category_id == BudgetCategory.id
+            source, source.category_id == BudgetCategory.id
         ).filter(
-            Transaction.user_id == user_id,
-            Transaction.date >= request.date_range_start,
-            Transaction.date <= request.date_range_end
+            source.user_id == user_id,
+            source.date >= request.date_range_start,
+            source.date <= request.date_range_end
         )
         
         if request.filters and request.filters.budget_ids:
             category_spending = category_spending.filter(
-                Transaction.budget_id.in_(request.filters.budget_ids)
+                source.budget_id.in_(request.filters.budget_ids)
             )
         
         category_spending = category_spending.group_by(
@@ -146,6 +149,8 @@ class BudgetReportService:
     ) -> List[CategoryReport]:
         """Generate detailed category analysis"""
         
+        source, _ = transaction_sources(reaches_archive(db, user_id, request.date_range_start))
+        
         # Get all categories in date range
         budgets = db.query(Budget).filter(
             Budget.user_id == user_id
@@ -177,11 +182,11 @@ class BudgetReportService:
         for cat in category_data:
             # Get spending for this category
             spent = db.query(
-                func.sum(Transaction.amount_cents)
+                func.sum(source.amount_cents)
             ).filter(
-                Transaction.category_id == cat.id,
-                Transaction.date >= request.date_range_start,
-                Transaction.date <= request.date_range_end
+                source.category_id == cat.id,
+                source.date >= request.date_range_start,
+                source.date <= request.date_range_end
             ).scalar() or 0
             
             avg_allocated = cat.total_allocated // cat.budget_count if cat.budget_count > 0 else 0
@@ -254,6 +259,8 @@ class BudgetReportService:
     ) -> ComparisonReport:
         """Generate budget comparison report"""
         
+        source, _ = transaction_sources(reaches_archive(db, user_id, request.date_range_start))
+        
         # Get budgets in date range
         budgets = db.query(Budget).filter(
             Budget.user_id == user_id
@@ -269,15 +276,15 @@ class BudgetReportService:
                 continue
             
             # Calculate allocated
-            allocated = sum(cat.allocated_cents for cat in budget.categories)
+            allocated = sum(cat.allocated_cents for cat in budget.categories if cat.is_active)
             
             # Calculate spent
             spent = db.query(
-                func.sum(Transaction.amount_cents)
+                func.sum(source.amount_cents)
             ).filter(
-                Transaction.budget_id == budget.id,
-                Transaction.date >= request.date_range_start,
-                Transaction.date <= request.date_range_end
+                source.budget_id == budget.id,
+                source.date >= request.date_range_start,
+                source.date <= request.date_range_end
             ).scalar() or 0
             
             remaining = budget.income_cents - spent
@@ -317,34 +324,36 @@ class BudgetReportService:
     ) -> List[MonthlyTrend]:
         """Generate trend data grouped by period"""
         
+        source, _ = transaction_sources(reaches_archive(db, user_id, start_date))
+        
         # Build base query
         if group_by == 'day':
-            period_expr = func.date(Transaction.date)
+            period_expr = func.date(source.date)
             period_format = '%Y-%m-%d'
         elif group_by == 'week':
-            period_expr = func.strftime('%Y-W%W', Transaction.date)
+            period_expr = func.strftime('%Y-W%W', source.date)
             period_format = '%Y-W%W'
         else:  # month
-            period_expr = func.strftime('%Y-%m', Transaction.date)
+            period_expr = func.strftime('%Y-%m', source.date)
             period_format = '%Y-%m'
         
         query = db.query(
             period_expr.label('period'),
-            func.sum(Transaction.amount_cents).label('total'),
-            func.count(Transaction.id).label('count'),
-            func.avg(Transaction.amount_cents).label('avg')
+            func.sum(source.amount_cents).label('total'),
+            func.count(source.id).label('count'),
+            func.avg(source.amount_cents).label('avg')
         ).filter(
-            Transaction.user_id == user_id,
-            Transaction.date >= start_date,
-            Transaction.date <= end_date
+            source.user_id == user_id,
+            source.date >= start_date,
+            source.date <= end_date
         )
         
         # Apply filters
         if filters:
             if filters.budget_ids:
-                query = query.filter(Transaction.budget_id.in_(filters.budget_ids))
+                query = query.filter(source.budget_id.in_(filters.budget_ids))
             if filters.category_ids:
-                query = query.filter(Transaction.category_id.in_(filters.category_ids))
+                query = query.filter(source.category_id.in_(filters.category_ids))
         
         results = query.group_by('period').order_by('period').all()
         
@@ -368,13 +377,14 @@ class BudgetReportService:
         
         end_date = date.today()
         start_date = end_date - timedelta(days=months * 30)
+        source, _ = transaction_sources(reaches_archive(db, user_id, start_date))
         
         # Total spending
         total_spent = db.query(
-            func.sum(Transaction.amount_cents)
+            func.sum(source.amount_cents)
         ).filter(
-            Transaction.user_id == user_id,
-            Transaction.date >= start_date
+            source.user_id == user_id,
+            source.date >= start_date
         ).scalar() or 0
         
         # Total income
@@ -391,25 +401,25 @@ class BudgetReportService:
         # Top spending categories
         top_categories = db.query(
             BudgetCategory.name,
-            func.sum(Transaction.amount_cents).label('total')
+            func.sum(source.amount_cents).label('total')
         ).join(
-            Transaction, Transaction.category_id == BudgetCategory.id
+            source, source.category_id == BudgetCategory.id
         ).filter(
-            Transaction.user_id == user_id,
-            Transaction.date >= start_date
+            source.user_id == user_id,
+            source.date >= start_date
         ).group_by(
             BudgetCategory.name
         ).order_by(
-            func.sum(Transaction.amount_cents).desc()
+            func.sum(source.amount_cents).desc()
         ).limit(5).all()
         
         # Recent trend
         monthly_trend = db.query(
-            func.strftime('%Y-%m', Transaction.date).label('month'),
-            func.sum(Transaction.amount_cents).label('total')
+            func.strftime('%Y-%m', source.date).label('month'),
+            func.sum(source.amount_cents).label('total')
         ).filter(
-            Transaction.user_id == user_id,
-            Transaction.date >= start_date
+            source.user_id == user_id,
+            source.date >= start_date
         ).group_by('month').order_by('month').all()
         
         return {
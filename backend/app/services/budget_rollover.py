@@ -0,0 +1,76 @@
+"""Cloning a month's budget into the next period with set-based statements"""
+from datetime import datetime
+from typing import Tuple
+from sqlalchemy import case, func, insert, literal, null, select
+from sqlalchemy.orm import Session
+from app.models.budget import Budget, BudgetCategory
+from app.models.paycheck import PaycheckAllocation
+
+
+def next_period(month: int, year: int) -> Tuple[int, int]:
+    return (1, year + 1) if month == 12 else (month + 1, year)
+
+
+def clone_to_next_period(db: Session, budget: Budget, carry_over: bool = False) -> Budget:
+    """Create the budget for the period after `budget`; runs inside the caller's transaction.
+    
+    Active categories are copied with one INSERT ... SELECT. With `carry_over`,
+    whatever a category has left (allocated minus spent, if positive) is added
+    to its new allocation. Paycheck allocation templates that point at the
+    copied categories are cloned onto the copy of their own category with a
+    second INSERT ... SELECT.
+    The caller checks that the next period does not exist yet.
+    """
+    month, year = next_period(budget.month, budget.year)
+    new_budget = Budget(user_id=budget.user_id, month=month, year=year, income_cents=budget.income_cents)
+    db.add(new_budget)
+    db.flush()
+    
+    now = datetime.utcnow()
+    allocated = BudgetCategory.allocated_cents
+    if carry_over:
+        remaining = BudgetCategory.allocated_cents - BudgetCategory.spent_cents
+        allocated = allocated + case((remaining > 0, remaining), else_=0)
+    
+    db.execute(insert(BudgetCategory).from_select(
+        ["budget_id", "name", "allocated_cents", "order", "description", "category_group",
+         "is_active", "spent_cents", "transaction_count", "created_at", "updated_at"],
+        select(
+            literal(new_budget.id), BudgetCategory.name, allocated, BudgetCategory.order,
+            BudgetCategory.description, BudgetCategory.category_group,
+            literal(True), literal(0), literal(0), literal(now), literal(now)
+        ).where(
+            BudgetCategory.budget_id == budget.id,
+            BudgetCategory.is_active == True
+        ).order_by(BudgetCategory.id)
+    ))
+    
+    # Copies get ascending ids in the order they were selected, so the n-th
+    # source by id maps to the n-th copy by id, whatever their names and order
+    def positions(budget_id: int):
+        return select(
+            BudgetCategory.id,
+            func.row_number().over(order_by=BudgetCategory.id).label('position')
+        ).where(
+            BudgetCategory.budget_id == budget_id,
+            BudgetCategory.is_active == True
+        ).subquery()
+    
+    source = positions(budget.id)
+    copy = positions(new_budget.id)
+    
+    db.execute(insert(PaycheckAllocation).from_select(
+        ["paycheck_id", "instance_id", "category_id", "amount_cents", "order", "created_at", "updated_at"],
+        select(
+            PaycheckAllocation.paycheck_id, null(), copy.c.id, PaycheckAllocation.amount_cents,
+            PaycheckAllocation.order, literal(now), literal(now)
+        ).join(
+            source, PaycheckAllocation.category_id == source.c.id
+        ).join(
+            copy, copy.c.position == source.c.position
+        ).where(
+            PaycheckAllocation.instance_id.is_(None)
+        )
+    ))
+    
+    return new_budget
@@ -0,0 +1,106 @@
+"""Maintenance of budget_categories.spent_cents and transaction_count"""
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.orm import Session
+from app.models.budget import BudgetCategory
+from app.models.transaction import Transaction, TransactionSplit
+from app.models.transaction_archive import ArchivedCategoryMonth
+
+# category_id -> (cents, transaction count) that a transaction contributes
+CategoryEffect = Dict[int, Tuple[int, int]]
+
+
+def category_effect(transaction: Optional[Transaction], splits=None) -> CategoryEffect:
+    """What a transaction contributes to each category.
+    
+    A split transaction counts once in every category it is split into. Pass
+    `splits` when they are not (yet) loaded on the transaction.
+    """
+    if transaction is None:
+        return {}
+    
+    effect = {}
+    if transaction.is_split:
+        for split in (transaction.splits if splits is None else splits):
+            cents, count = effect.get(split.category_id, (0, 0))
+            effect[split.category_id] = (cents + split.amount_cents, count + 1)
+    elif transaction.category_id is not None:
+        effect[transaction.category_id] = (transaction.amount_cents, 1)
+    return effect
+
+
+def apply_category_spend(db: Session, before: CategoryEffect, after: CategoryEffect):
+    """Move a transaction's contribution from `before` to `after`; runs inside the caller's transaction"""
+    deltas = {}
+    for effect, sign in ((before, -1), (after, 1)):
+        for category_id, (cents, count) in effect.items():
+            spent, counted = deltas.get(category_id, (0, 0))
+            deltas[category_id] = (spent + sign * cents, counted + sign * count)
+    
+    params = [
+        {"category_pk": category_id, "spent_delta": spent, "count_delta": count}
+        for category_id, (spent, count) in deltas.items()
+        if spent or count
+    ]
+    if not params:
+        return
+    
+    table = BudgetCategory.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("category_pk"))
+        .values(
+            spent_cents=table.c.spent_cents + bindparam("spent_delta"),
+            transaction_count=table.c.transaction_count + bindparam("count_delta")
+        ),
+        params
+    )
+
+
+def _actual_totals():
+    """Correlated subqueries recomputing both columns from transactions, splits and archived months"""
+    regular = (Transaction.category_id == BudgetCategory.id, Transaction.is_split == False)
+    split = (TransactionSplit.category_id == BudgetCategory.id,)
+    archived = (ArchivedCategoryMonth.category_id == BudgetCategory.id,)
+    
+    spent = (
+        select(func.coalesce(func.sum(Transaction.amount_cents), 0)).where(*regular).scalar_subquery()
+        + select(func.coalesce(func.sum(TransactionSplit.amount_cents), 0)).where(*split).scalar_subquery()
+        + select(func.coalesce(func.sum(ArchivedCategoryMonth.spent_cents), 0)).where(*archived).scalar_subquery()
+    )
+    count = (
+        select(func.count(Transaction.id)).where(*regular).scalar_subquery()
+        + select(func.count(TransactionSplit.id)).where(*split).scalar_subquery()
+        + select(func.coalesce(func.sum(ArchivedCategoryMonth.transaction_count), 0)).where(*archived).scalar_subquery()
+    )
+    return spent, count
+
+
+def rebuild_category_spend(db: Session, budget_id: Optional[int] = None) -> int:
+    """Recompute both columns in one set-based UPDATE; returns the number of categories"""
+    spent, count = _actual_totals()
+    stmt = update(BudgetCategory).values(spent_cents=spent, transaction_count=count)
+    if budget_id is not None:
+        stmt = stmt.where(BudgetCategory.budget_id == budget_id)
+    result = db.execute(stmt.execution_options(synchronize_session=False))
+    db.commit()
+    return result.rowcount
+
+
+def verify_category_spend(db: Session, budget_id: Optional[int] = None) -> List[dict]:
+    """Categories whose maintained columns disagree with the transactions"""
+    spent, count = _actual_totals()
+    query = db.query(
+        BudgetCategory.id,
+        BudgetCategory.budget_id,
+        BudgetCategory.spent_cents,
+        BudgetCategory.transaction_count,
+        spent.label("actual_spent_cents"),
+        count.label("actual_transaction_count")
+    ).filter(
+        or_(BudgetCategory.spent_cents != spent, BudgetCategory.transaction_count != count)
+    )
+    if budget_id is not None:
+        query = query.filter(BudgetCategory.budget_id == budget_id)
+    
+    return [row._asdict() for row in query.all()]
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, desc
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import re
 from collections import defaultdict
@@ -155,6 +155,50 @@ class CategorySuggestionService:
         
         return unique_suggestions[:limit]
     
+    def build_batch_matcher(self, user_id: int) -> Callable[[str], Optional[str]]:
+        """Category name for a transaction's notes, from patterns loaded in one query.
+        
+        Applies the same exact-pattern and keyword scoring as get_suggestions
+        without a query per transaction, for imports. Returns names because
+        patterns may point at categories of an earlier month's budget.
+        """
+        patterns = self.db.query(
+            CategoryPattern.pattern_text,
+            CategoryPattern.confidence_score,
+            CategoryPattern.usage_count,
+            BudgetCategory.name
+        ).join(
+            BudgetCategory, CategoryPattern.category_id == BudgetCategory.id
+        ).filter(
+            CategoryPattern.user_id == user_id
+        ).order_by(
+            desc(CategoryPattern.confidence_score),
+            desc(CategoryPattern.usage_count)
+        ).all()
+        
+        exact = {}
+        keyword_scores = defaultdict(lambda: defaultdict(float))
+        for pattern_text, confidence, usage_count, name in patterns:
+            exact.setdefault(pattern_text, name)
+            score = (confidence or 0) * (1 + min((usage_count or 0) / 10, 1))
+            for word in set(pattern_text.split()):
+                keyword_scores[word][name] += score
+        
+        def match(notes: str) -> Optional[str]:
+            pattern_text = self.normalize_text(notes)
+            if not pattern_text:
+                return None
+            if pattern_text in exact:
+                return exact[pattern_text]
+            
+            scores = defaultdict(float)
+            for keyword in self.extract_keywords(notes):
+                for name, score in keyword_scores.get(keyword, {}).items():
+                    scores[name] += score
+            return max(scores, key=scores.get) if scores else None
+        
+        return match
+    
     def _get_keyword_matches(
         self, 
         user_id: int, 
@@ -6,6 +6,7 @@ from datetime import date
 from sqlalchemy.orm import Session
 from app.models.transaction import Transaction, TransactionSplit
 from app.models.budget import Budget, BudgetCategory
+from app.services.transaction_archive import reaches_archive, transaction_sources
 
 
 class CSVExportService:
@@ -22,35 +23,37 @@ class CSVExportService:
     ) -> str:
         """Export transactions to CSV format"""
         
+        source, _ = transaction_sources(reaches_archive(db, user_id, start_date))
+        
         # Build query
         query = db.query(
-            Transaction.id,
-            Transaction.date,
-            Transaction.amount_cents,
-            Transaction.notes,
-            Transaction.is_split,
+            source.id,
+            source.date,
+            source.amount_cents,
+            source.notes,
+            source.is_split,
             Budget.month,
             Budget.year,
             BudgetCategory.name.label('category_name')
         ).join(
-            Budget, Transaction.budget_id == Budget.id
+            Budget, source.budget_id == Budget.id
         ).outerjoin(
-            BudgetCategory, Transaction.category_id == BudgetCategory.id
+            BudgetCategory, source.category_id == BudgetCategory.id
         ).filter(
-            Transaction.user_id == user_id
+            source.user_id == user_id
         )
         
         # Apply filters
         if budget_id:
-            query = query.filter(Transaction.budget_id == budget_id)
+            query = query.filter(source.budget_id == budget_id)
         if category_id:
-            query = query.filter(Transaction.category_id == category_id)
+            query = query.filter(source.category_id == category_id)
         if start_date:
-            query = query.filter(Transaction.date >= start_date)
+            query = query.filter(source.date >= start_date)
         if end_date:
-            query = query.filter(Transaction.date <= end_date)
+            query = query.filter(source.date <= end_date)
         
-        query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+        query = query.order_by(source.date.desc(), source.id.desc())
         transactions = query.all()
         
         # Create CSV in memory
@@ -96,38 +99,40 @@ class CSVExportService:
     ) -> str:
         """Export transaction splits to CSV format (detailed view)"""
         
+        source, split_source = transaction_sources(reaches_archive(db, user_id, start_date))
+        
         # Build query for split transactions
         query = db.query(
-            Transaction.id.label('transaction_id'),
-            Transaction.date,
-            Transaction.amount_cents.label('total_amount_cents'),
-            Transaction.notes.label('transaction_notes'),
-            TransactionSplit.id.label('split_id'),
-            TransactionSplit.amount_cents.label('split_amount_cents'),
-            TransactionSplit.notes.label('split_notes'),
+            source.id.label('transaction_id'),
+            source.date,
+            source.amount_cents.label('total_amount_cents'),
+            source.notes.label('transaction_notes'),
+            split_source.id.label('split_id'),
+            split_source.amount_cents.label('split_amount_cents'),
+            split_source.notes.label('split_notes'),
             BudgetCategory.name.label('category_name'),
             Budget.month,
             Budget.year
         ).join(
-            TransactionSplit, Transaction.id == TransactionSplit.transaction_id
+            split_source, source.id == split_source.transaction_id
         ).join(
-            Budget, Transaction.budget_id == Budget.id
+            Budget, source.budget_id == Budget.id
         ).join(
-            BudgetCategory, TransactionSplit.category_id == BudgetCategory.id
+            BudgetCategory, split_source.category_id == BudgetCategory.id
         ).filter(
-            Transaction.user_id == user_id,
-            Transaction.is_split == True
+            source.user_id == user_id,
+            source.is_split == True
         )
         
         # Apply filters
         if budget_id:
-            query = query.filter(Transaction.budget_id == budget_id)
+            query = query.filter(source.budget_id == budget_id)
         if start_date:
-            query = query.filter(Transaction.date >= start_date)
+            query = query.filter(source.date >= start_date)
         if end_date:
-            query = query.filter(Transaction.date <= end_date)
+            query = query.filter(source.date <= end_date)
         
-        query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+        query = query.order_by(source.date.desc(), source.id.desc())
         splits = query.all()
         
         # Create CSV in memory
@@ -210,17 +215,14 @@ class CSVExportService:
         # Write data rows
         for budget in budgets:
             budget_period = f"{budget.month:02d}/{budget.year}"
-            total_allocated = sum(cat.allocated_cents for cat in budget.categories)
+            total_allocated = sum(cat.allocated_cents for cat in budget.categories if cat.is_active)
             budget_remaining = budget.income_cents - total_allocated
             
             for category in budget.categories:
                 if not category.is_active:
                     continue
                 
-                # Calculate spent amount
-                spent_cents = CSVExportService._calculate_category_spent(
-                    db, category.id
-                )
+                spent_cents = category.spent_cents
                 remaining_cents = category.allocated_cents - spent_cents
                 
                 writer.writerow([
@@ -236,22 +238,3 @@ class CSVExportService:
                 ])
         
         return output.getvalue()
-    
-    @staticmethod
-    def _calculate_category_spent(db: Session, category_id: int) -> int:
-        """Calculate total spent for a category"""
-        # Regular transactions
-        regular_spent = db.query(Transaction).filter(
-            Transaction.category_id == category_id,
-            Transaction.is_split == False
-        ).with_entities(Transaction.amount_cents).all()
-        
-        # Split transactions
-        split_spent = db.query(TransactionSplit).filter(
-            TransactionSplit.category_id == category_id
-        ).with_entities(TransactionSplit.amount_cents).all()
-        
-        regular_total = sum(t[0] for t in regular_spent) if regular_spent else 0
-        split_total = sum(s[0] for s in split_spent) if split_spent else 0
-        
-        return regular_total + split_total
@@ -0,0 +1,595 @@
+"""Materialized per-user dashboard metrics.
+
+Each section is computed by a single aggregate query and stored in the
+user's dashboard_state row. Write endpoints keep the row current either by
+applying deltas (transactions, net worth, goals) or by recomputing only the
+section they touched (budgets, sinking funds, paychecks), inside the same
+database transaction as the write. Each update also queues a push event for
+the user's subscribers (see app/services/events.py), sent once the write
+commits. The dashboard endpoint is then a single primary-key read; the row
+is rebuilt when it is missing or was computed on an earlier day, since the
+month and "upcoming" windows move with the date.
+
+Every write bumps the row's version, even when the row is stale (a missing
+row is created as a stale placeholder), so a rebuild can tell whether a
+write committed while it was reading the sections. The write's events carry
+the new version, so a subscriber can skip those its snapshot already holds.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Optional, Tuple
+from sqlalchemy import func, case, literal, select, update
+from sqlalchemy.sql import ClauseElement
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.config import settings
+from app.services.events import queue_event
+from app.models.dashboard_state import DashboardState
+from app.models.budget import Budget, BudgetCategory
+from app.models.transaction import Transaction
+from app.models.sinking_fund import SinkingFund, SinkingFundContribution
+from app.models.net_worth import Asset, Liability
+from app.models.financial_goal import FinancialGoal
+from app.models.paycheck import Paycheck
+
+SECTIONS = ("budget", "transactions", "sinking_funds", "net_worth", "goals", "paychecks")
+
+# as_of of placeholder rows created by a write before any read; never today, so the next read rebuilds
+STALE_AS_OF = date.min
+
+# Optimistic rebuilds before one that locks the row, see rebuild_dashboard_state
+REBUILD_ATTEMPTS = 3
+
+# Shared by every dashboard read, so it bounds the connections they take at once.
+# More workers than the pool can hand out would only queue for connections
+# (and starve other requests), so the pool's capacity caps it.
+_section_executor = ThreadPoolExecutor(
+    max_workers=max(1, min(
+        settings.DASHBOARD_SECTION_WORKERS,
+        settings.DATABASE_POOL_SIZE + settings.DATABASE_MAX_OVERFLOW
+    )),
+    thread_name_prefix="dashboard-section"
+)
+
+# (budget_id, date, spent_cents) of a transaction, or None when it does not exist
+TransactionEffect = Optional[Tuple[int, date, int]]
+
+
+def month_bounds(today: date):
+    month_start = today.replace(day=1)
+    if today.month == 12:
+        next_month_start = date(today.year + 1, 1, 1)
+    else:
+        next_month_start = date(today.year, today.month + 1, 1)
+    return month_start, next_month_start
+
+
+def _budget_columns(db: Session, user_id: int, today: date) -> dict:
+    """Current month's budget with allocated and spent totals, in one query"""
+    allocated = select(
+        func.coalesce(func.sum(BudgetCategory.allocated_cents), 0)
+    ).where(
+        BudgetCategory.budget_id == Budget.id,
+        BudgetCategory.is_active == True
+    ).scalar_subquery()
+    
+    # spent_cents is maintained per category by the transactions API
+    spent = select(
+        func.coalesce(func.sum(BudgetCategory.spent_cents), 0)
+    ).where(
+        BudgetCategory.budget_id == Budget.id
+    ).scalar_subquery()
+    
+    row = db.query(
+        Budget.id,
+        Budget.income_cents,
+        allocated.label('allocated'),
+        spent.label('spent')
+    ).filter(
+        Budget.user_id == user_id,
+        Budget.month == today.month,
+        Budget.year == today.year
+    ).first()
+    
+    if not row:
+        return {
+            "budget_id": None,
+            "budget_income_cents": 0,
+            "budget_allocated_cents": 0,
+            "budget_spent_cents": 0
+        }
+    
+    return {
+        "budget_id": row.id,
+        "budget_income_cents": row.income_cents,
+        "budget_allocated_cents": row.allocated,
+        "budget_spent_cents": row.spent
+    }
+
+
+def _transaction_columns(db: Session, user_id: int, today: date) -> dict:
+    month_start, next_month_start = month_bounds(today)
+    count = db.query(func.count(Transaction.id)).filter(
+        Transaction.user_id == user_id,
+        Transaction.date >= month_start,
+        Transaction.date < next_month_start
+    ).scalar() or 0
+    
+    return {"transaction_count_month": count}
+
+
+def _sinking_fund_columns(db: Session, user_id: int, today: date) -> dict:
+    """Totals over all active funds plus the first five, in one query"""
+    # Only this user's contributions, rather than grouping everyone's before the join
+    contributed = select(
+        SinkingFundContribution.fund_id,
+        func.sum(SinkingFundContribution.amount_cents).label('total')
+    ).join(
+        SinkingFund, SinkingFund.id == SinkingFundContribution.fund_id
+    ).where(
+        SinkingFund.user_id == user_id,
+        SinkingFund.is_active == True
+    ).group_by(SinkingFundContribution.fund_id).subquery()
+    
+    contributed_cents = func.coalesce(contributed.c.total, 0)
+    rows = db.query(
+        SinkingFund.id,
+        SinkingFund.name,
+        SinkingFund.target_cents,
+        contributed_cents.label('contributed'),
+        func.count().over().label('fund_count'),
+        func.sum(SinkingFund.target_cents).over().label('total_goal'),
+        func.sum(contributed_cents).over().label('total_saved')
+    ).outerjoin(
+        contributed, contributed.c.fund_id == SinkingFund.id
+    ).filter(
+        SinkingFund.user_id == user_id,
+        SinkingFund.is_active == True
+    ).order_by(SinkingFund.id).limit(5).all()
+    
+    return {
+        "sinking_fund_count": rows[0].fund_count if rows else 0,
+        "sinking_total_goal_cents": rows[0].total_goal if rows else 0,
+        "sinking_total_saved_cents": rows[0].total_saved if rows else 0,
+        "sinking_funds": [
+            {
+                "id": row.id,
+                "name": row.name,
+                "target_amount_cents": row.target_cents,
+                "contributed_cents": row.contributed,
+                "remaining_cents": row.target_cents - row.contributed
+            }
+            for row in rows
+        ]
+    }
+
+
+def _net_worth_columns(db: Session, user_id: int, today: date) -> dict:
+    """Asset and liability totals and counts, in one query"""
+    active_assets = (Asset.user_id == user_id, Asset.is_active == True)
+    active_liabilities = (Liability.user_id == user_id, Liability.is_active == True)
+    
+    total_assets, asset_count, total_liabilities, liability_count = db.execute(select(
+        select(func.coalesce(func.sum(Asset.current_value_cents), 0)).where(*active_assets).scalar_subquery(),
+        select(func.count(Asset.id)).where(*active_assets).scalar_subquery(),
+        select(func.coalesce(func.sum(Liability.current_balance_cents), 0)).where(*active_liabilities).scalar_subquery(),
+        select(func.count(Liability.id)).where(*active_liabilities).scalar_subquery()
+    )).one()
+    
+    return {
+        "total_assets_cents": total_assets,
+        "asset_count": asset_count,
+        "total_liabilities_cents": total_liabilities,
+        "liability_count": liability_count
+    }
+
+
+def _goal_columns(db: Session, user_id: int, today: date) -> dict:
+    is_active = FinancialGoal.status == 'active'
+    row = db.query(
+        func.count(FinancialGoal.id).label('total'),
+        func.coalesce(func.sum(case((is_active, 1), else_=0)), 0).label('active'),
+        func.coalesce(func.sum(case((FinancialGoal.status == 'completed', 1), else_=0)), 0).label('completed'),
+        func.coalesce(func.sum(case((is_active, FinancialGoal.target_amount_cents), else_=0)), 0).label('target'),
+        func.coalesce(func.sum(case((is_active, FinancialGoal.current_amount_cents), else_=0)), 0).label('saved')
+    ).filter(
+        FinancialGoal.user_id == user_id
+    ).one()
+    
+    return {
+        "goal_count": row.total,
+        "goal_active_count": row.active,
+        "goal_completed_count": row.completed,
+        "goal_target_cents": row.target,
+        "goal_saved_cents": row.saved
+    }
+
+
+def _paycheck_columns(db: Session, user_id: int, today: date) -> dict:
+    upcoming_paychecks = db.query(
+        Paycheck.id,
+        Paycheck.net_amount_cents,
+        Paycheck.pay_date
+    ).filter(
+        Paycheck.user_id == user_id,
+        Paycheck.is_active == True,
+        Paycheck.pay_date >= today
+    ).order_by(Paycheck.pay_date).limit(3).all()
+    
+    return {
+        "paycheck_upcoming_count": len(upcoming_paychecks),
+        "next_paycheck": {
+            "id": upcoming_paychecks[0].id,
+            "amount_cents": upcoming_paychecks[0].net_amount_cents,
+            "pay_date": upcoming_paychecks[0].pay_date.isoformat()
+        } if upcoming_paychecks else None
+    }
+
+
+_SECTION_COLUMNS = {
+    "budget": _budget_columns,
+    "transactions": _transaction_columns,
+    "sinking_funds": _sinking_fund_columns,
+    "net_worth": _net_worth_columns,
+    "goals": _goal_columns,
+    "paychecks": _paycheck_columns
+}
+
+
+def compute_sections(db: Session, user_id: int, today: date, sections=SECTIONS) -> dict:
+    """Column values for the given sections, one query per section"""
+    values = {}
+    for section in sections:
+        values.update(_SECTION_COLUMNS[section](db, user_id, today))
+    return values
+
+
+def _compute_section_in_own_session(bind, section: str, user_id: int, today: date) -> dict:
+    # Sessions are not thread-safe, so each worker checks out its own pooled connection
+    with Session(bind=bind) as session:
+        return _SECTION_COLUMNS[section](session, user_id, today)
+
+
+def compute_sections_concurrently(db: Session, user_id: int, today: date, sections=SECTIONS) -> dict:
+    """Like compute_sections, but each section runs on its own connection at the same time.
+    
+    Latency is that of the slowest section instead of the sum. The shared
+    executor caps how many connections dashboard reads take from the pool.
+    Commits `db` first, so the request's own connection goes back to the
+    pool instead of being held while the workers wait for theirs.
+    """
+    if len(sections) <= 1:
+        return compute_sections(db, user_id, today, sections)
+    
+    bind = db.get_bind()
+    db.commit()
+    futures = [
+        _section_executor.submit(_compute_section_in_own_session, bind, section, user_id, today)
+        for section in sections
+    ]
+    values = {}
+    for future in futures:
+        values.update(future.result())
+    return values
+
+
+def _insert(db: Session):
+    return postgresql.insert if db.get_bind().dialect.name == 'postgresql' else sqlite.insert
+
+
+def _update_state(db: Session, user_id: int, values: dict) -> int:
+    """Apply `values` to the user's row if it is up to date, and bump its version either way.
+    
+    A missing row is created as a stale placeholder, so there is always a
+    version to bump. Returns the new version.
+    """
+    table = DashboardState.__table__
+    is_current = table.c.as_of == date.today()
+    set_ = {}
+    for column, value in values.items():
+        column = table.c[getattr(column, 'key', column)]
+        if not isinstance(value, ClauseElement):
+            value = literal(value, column.type)
+        set_[column.name] = case((is_current, value), else_=column)
+    set_['version'] = table.c.version + 1
+    
+    stmt = _insert(db)(table).values(user_id=user_id, as_of=STALE_AS_OF, version=1)
+    stmt = stmt.on_conflict_do_update(index_elements=['user_id'], set_=set_)
+    return db.execute(stmt.returning(table.c.version)).scalar_one()
+
+
+def _state_version(db: Session, user_id: int) -> int:
+    """Version of the user's row, creating a stale placeholder when there is none"""
+    table = DashboardState.__table__
+    db.execute(_insert(db)(table).values(user_id=user_id, as_of=STALE_AS_OF).on_conflict_do_nothing())
+    return db.execute(select(table.c.version).where(table.c.user_id == user_id)).scalar_one()
+
+
+def rebuild_dashboard_state(db: Session, user_id: int, today: Optional[date] = None) -> DashboardState:
+    """Recompute every section and store them in the user's row; the caller commits.
+    
+    The sections are read on other connections while writes go on, so the
+    values are only stored if the row's version has not moved since before
+    they were read; otherwise a write committed in between and they are
+    read again. This commits the session once, before the first read.
+    After REBUILD_ATTEMPTS tries the row is locked by bumping its version
+    first, which makes writes wait until the caller commits, and the
+    sections are read on this session.
+    """
+    today = today or date.today()
+    table = DashboardState.__table__
+    for _ in range(REBUILD_ATTEMPTS):
+        version = _state_version(db, user_id)
+        db.commit()
+        values = {
+            "as_of": today,
+            **compute_sections_concurrently(db, user_id, today),
+            "updated_at": datetime.utcnow(),
+            "version": version + 1
+        }
+        stored = db.execute(update(table).where(
+            table.c.user_id == user_id,
+            table.c.version == version
+        ).values(values))
+        if stored.rowcount:
+            return DashboardState(user_id=user_id, **values)
+        db.rollback()
+    
+    version = db.execute(update(table).where(
+        table.c.user_id == user_id
+    ).values(version=table.c.version + 1).returning(table.c.version)).scalar_one()
+    values = {
+        "as_of": today,
+        **compute_sections(db, user_id, today),
+        "updated_at": datetime.utcnow()
+    }
+    db.execute(update(table).where(table.c.user_id == user_id).values(values))
+    return DashboardState(user_id=user_id, version=version, **values)
+
+
+def refresh_dashboard_sections(db: Session, user_id: int, *sections: str):
+    """Recompute only the given sections of an up-to-date row; runs inside the caller's transaction"""
+    db.flush()  # Sessions do not autoflush, and the section queries must see the caller's changes
+    today = date.today()
+    values = compute_sections(db, user_id, today, sections)
+    values["updated_at"] = datetime.utcnow()
+    version = _update_state(db, user_id, values)
+    
+    computed = DashboardState(**values)
+    for section in sections:
+        queue_event(db, user_id, {
+            "type": "section",
+            "section": section,
+            "data": _SECTION_RESPONSES[section](computed),
+            "version": version
+        })
+
+
+# Counter column -> (response section, field) for delta events
+_DELTA_FIELDS = {
+    "budget_spent_cents": ("budget", "spent_cents"),
+    "transaction_count_month": ("transactions", "count_this_month"),
+    "total_assets_cents": ("net_worth", "total_assets_cents"),
+    "asset_count": ("net_worth", "asset_count"),
+    "total_liabilities_cents": ("net_worth", "total_liabilities_cents"),
+    "liability_count": ("net_worth", "liability_count"),
+    "goal_count": ("goals", "total_goals"),
+    "goal_active_count": ("goals", "active_goals"),
+    "goal_completed_count": ("goals", "completed_goals"),
+    "goal_target_cents": ("goals", "total_target_cents"),
+    "goal_saved_cents": ("goals", "total_saved_cents")
+}
+
+
+def _queue_delta_events(db: Session, user_id: int, version: int, deltas: dict, budget_id: Optional[int] = None):
+    """Queue one delta event per touched section, in response field names"""
+    changes = {}
+    for column, delta in deltas.items():
+        if delta:
+            section, field = _DELTA_FIELDS[column]
+            changes.setdefault(section, {})[field] = delta
+    
+    # Derived fields, so clients can patch their copy without recomputing
+    if "net_worth" in changes:
+        net_worth = changes["net_worth"]
+        net_worth["net_worth_cents"] = net_worth.get("total_assets_cents", 0) - net_worth.get("total_liabilities_cents", 0)
+    if "budget" in changes:
+        changes["budget"]["available_cents"] = -changes["budget"]["spent_cents"]
+    
+    for section, section_changes in changes.items():
+        event = {"type": "delta", "section": section, "changes": section_changes, "version": version}
+        if section == "budget":
+            # Only applies when it matches the budget the client is showing
+            event["budget_id"] = budget_id
+        queue_event(db, user_id, event)
+
+
+def apply_dashboard_deltas(db: Session, user_id: int, **deltas: int):
+    """Add deltas onto counter columns of an up-to-date row; runs inside the caller's transaction"""
+    values = {
+        getattr(DashboardState, column): getattr(DashboardState, column) + delta
+        for column, delta in deltas.items() if delta
+    }
+    if not values:
+        return
+    
+    values[DashboardState.updated_at] = datetime.utcnow()
+    version = _update_state(db, user_id, values)
+    _queue_delta_events(db, user_id, version, deltas)
+
+
+def transaction_effect(transaction: Transaction) -> TransactionEffect:
+    """What a stored transaction contributes to the budget and transaction sections"""
+    if transaction.is_split:
+        spent = sum(split.amount_cents for split in transaction.splits)
+    else:
+        spent = transaction.amount_cents if transaction.category_id is not None else 0
+    return (transaction.budget_id, transaction.date, spent)
+
+
+def apply_transaction_change(db: Session, user_id: int, before: TransactionEffect, after: TransactionEffect):
+    """Move a transaction's contribution from `before` to `after` (either may be None)"""
+    today = date.today()
+    month_start, next_month_start = month_bounds(today)
+    
+    count_delta = 0
+    spent_by_budget = {}
+    for effect, sign in ((before, -1), (after, 1)):
+        if effect is None:
+            continue
+        budget_id, txn_date, spent = effect
+        if month_start <= txn_date < next_month_start:
+            count_delta += sign
+        spent_by_budget[budget_id] = spent_by_budget.get(budget_id, 0) + sign * spent
+    
+    # Spending only counts when it lands in the budget the row is tracking
+    spent_expr = DashboardState.budget_spent_cents
+    changed = False
+    for budget_id, delta in spent_by_budget.items():
+        if delta:
+            spent_expr = spent_expr + case((DashboardState.budget_id == budget_id, delta), else_=0)
+            changed = True
+    
+    values = {}
+    if changed:
+        values[DashboardState.budget_spent_cents] = spent_expr
+    if count_delta:
+        values[DashboardState.transaction_count_month] = DashboardState.transaction_count_month + count_delta
+    if not values:
+        return
+    
+    values[DashboardState.updated_at] = datetime.utcnow()
+    version = _update_state(db, user_id, values)
+    
+    _queue_delta_events(db, user_id, version, {"transaction_count_month": count_delta})
+    for budget_id, delta in spent_by_budget.items():
+        _queue_delta_events(db, user_id, version, {"budget_spent_cents": delta}, budget_id=budget_id)
+
+
+def asset_effect(asset: Asset) -> dict:
+    if not asset.is_active:
+        return {}
+    return {"total_assets_cents": asset.current_value_cents, "asset_count": 1}
+
+
+def liability_effect(liability: Liability) -> dict:
+    if not liability.is_active:
+        return {}
+    return {"total_liabilities_cents": liability.current_balance_cents, "liability_count": 1}
+
+
+def goal_effect(goal: FinancialGoal) -> dict:
+    effect = {"goal_count": 1}
+    if goal.status == 'active':
+        effect.update(
+            goal_active_count=1,
+            goal_target_cents=goal.target_amount_cents or 0,
+            goal_saved_cents=goal.current_amount_cents or 0
+        )
+    elif goal.status == 'completed':
+        effect["goal_completed_count"] = 1
+    return effect
+
+
+def apply_effect_change(db: Session, user_id: int, before: Optional[dict], after: Optional[dict]):
+    """Replace a row's contribution `before` with `after`, as produced by the *_effect helpers"""
+    deltas = {}
+    for effect, sign in ((before, -1), (after, 1)):
+        for column, value in (effect or {}).items():
+            deltas[column] = deltas.get(column, 0) + sign * value
+    apply_dashboard_deltas(db, user_id, **deltas)
+
+
+def _dashboard_state(db: Session, user_id: int, sections) -> DashboardState:
+    state = db.get(DashboardState, user_id)
+    if state is None or state.as_of != date.today():
+        if set(sections) == set(SECTIONS):
+            state = rebuild_dashboard_state(db, user_id)
+            db.commit()
+        else:
+            state = DashboardState(**compute_sections_concurrently(db, user_id, date.today(), sections))
+    return state
+
+
+def get_dashboard(db: Session, user_id: int, sections=SECTIONS) -> dict:
+    """Dashboard response limited to `sections`.
+    
+    An up-to-date row is a primary-key read. Otherwise a request for every
+    section rebuilds and stores the row, while a request for a subset only
+    computes those sections and leaves the row for the next full read.
+    """
+    return dashboard_response(_dashboard_state(db, user_id, sections), sections)
+
+
+def get_dashboard_snapshot(db: Session, user_id: int) -> Tuple[int, dict]:
+    """The full dashboard and its version; events at or below the version are already in it"""
+    state = _dashboard_state(db, user_id, SECTIONS)
+    return state.version, dashboard_response(state)
+
+
+def _budget_response(state: DashboardState):
+    if state.budget_id is None:
+        return None
+    return {
+        "budget_id": state.budget_id,
+        "income_cents": state.budget_income_cents,
+        "allocated_cents": state.budget_allocated_cents,
+        "spent_cents": state.budget_spent_cents,
+        "remaining_cents": state.budget_income_cents - state.budget_allocated_cents,
+        "available_cents": state.budget_allocated_cents - state.budget_spent_cents
+    }
+
+
+def _transactions_response(state: DashboardState):
+    return {"count_this_month": state.transaction_count_month}
+
+
+def _sinking_funds_response(state: DashboardState):
+    return {
+        "total_saved_cents": state.sinking_total_saved_cents,
+        "total_goal_cents": state.sinking_total_goal_cents,
+        "fund_count": state.sinking_fund_count,
+        "funds": state.sinking_funds or []
+    }
+
+
+def _net_worth_response(state: DashboardState):
+    return {
+        "total_assets_cents": state.total_assets_cents,
+        "total_liabilities_cents": state.total_liabilities_cents,
+        "net_worth_cents": state.total_assets_cents - state.total_liabilities_cents,
+        "asset_count": state.asset_count,
+        "liability_count": state.liability_count
+    }
+
+
+def _goals_response(state: DashboardState):
+    return {
+        "total_goals": state.goal_count,
+        "active_goals": state.goal_active_count,
+        "completed_goals": state.goal_completed_count,
+        "total_target_cents": state.goal_target_cents,
+        "total_saved_cents": state.goal_saved_cents
+    }
+
+
+def _paychecks_response(state: DashboardState):
+    return {
+        "upcoming_count": state.paycheck_upcoming_count,
+        "next_paycheck": state.next_paycheck
+    }
+
+
+_SECTION_RESPONSES = {
+    "budget": _budget_response,
+    "transactions": _transactions_response,
+    "sinking_funds": _sinking_funds_response,
+    "net_worth": _net_worth_response,
+    "goals": _goals_response,
+    "paychecks": _paychecks_response
+}
+
+
+def dashboard_response(state: DashboardState, sections=SECTIONS) -> dict:
+    """Shape a row (stored or freshly computed) as the /api/metrics/dashboard response"""
+    return {section: _SECTION_RESPONSES[section](state) for section in sections}
@@ -0,0 +1,160 @@
+"""Per-user push events for dashboard changes.
+
+Write endpoints queue events on their database session; they are published
+only once that session commits, so subscribers never see a change that was
+rolled back. Publishing goes through a backend so every worker process can
+fan the event out to its own subscribers:
+
+- "local": in-process only, for a single worker and for tests
+- "redis": Redis pub/sub between workers (requires the redis package)
+"""
+import asyncio
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Set
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One connected client; events are handed to its event loop from any thread"""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, event: dict):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: dict):
+        if self.queue.full():
+            # A client this far behind cannot apply deltas reliably; tell it to refetch instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = {"type": "resync"}
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class EventBroker:
+    """In-process fan-out of events to the subscribers connected to this worker"""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def deliver(self, user_id: int, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            subscription.offer(event)
+
+
+class EventBackend(ABC):
+    """Carries published events to the broker of every worker"""
+
+    def __init__(self, broker: EventBroker):
+        self.broker = broker
+
+    @abstractmethod
+    def publish(self, user_id: int, event: dict):
+        ...
+
+
+class LocalEventBackend(EventBackend):
+    """Stand-in for a single worker: delivers straight to this process's broker"""
+
+    def publish(self, user_id: int, event: dict):
+        self.broker.deliver(user_id, event)
+
+
+class RedisEventBackend(EventBackend):
+    """Redis pub/sub, one channel per user, with a listener thread per worker"""
+
+    def __init__(self, broker: EventBroker, url: str, channel_prefix: str):
+        super().__init__(broker)
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("EVENT_BACKEND=redis requires redis (pip install redis)")
+
+        self.client = redis.Redis.from_url(url)
+        self.channel_prefix = channel_prefix
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(**{f"{channel_prefix}:*": self._on_message})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def _on_message(self, message):
+        channel = message["channel"].decode() if isinstance(message["channel"], bytes) else message["channel"]
+        user_id = int(channel.rsplit(":", 1)[1])
+        self.broker.deliver(user_id, json.loads(message["data"]))
+
+    def publish(self, user_id: int, event: dict):
+        self.client.publish(f"{self.channel_prefix}:{user_id}", json.dumps(event))
+
+
+_broker = EventBroker()
+_backend: Optional[EventBackend] = None
+
+
+def get_event_broker() -> EventBroker:
+    return _broker
+
+
+def get_event_backend() -> EventBackend:
+    """Backend selected by EVENT_BACKEND, created once per process"""
+    global _backend
+    if _backend is None:
+        if settings.EVENT_BACKEND == "redis":
+            _backend = RedisEventBackend(_broker, settings.EVENT_REDIS_URL, settings.EVENT_CHANNEL_PREFIX)
+        else:
+            _backend = LocalEventBackend(_broker)
+    return _backend
+
+
+def queue_event(db: Session, user_id: int, event: dict):
+    """Publish `event` to the user's subscribers once `db` commits"""
+    db.info.setdefault("pending_events", []).append((user_id, event))
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_pending_events(session: Session):
+    pending = session.info.pop("pending_events", None)
+    if not pending:
+        return
+    try:
+        backend = get_event_backend()
+        for user_id, event in pending:
+            backend.publish(user_id, event)
+    except Exception:
+        # The write already committed; clients will catch up on their next full fetch
+        logger.exception("Failed to publish dashboard events")
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session):
+    session.info.pop("pending_events", None)
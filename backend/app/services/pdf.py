@@ -1,46 +1,153 @@
+import io
 import os
+import json
+import time
+import hashlib
+import threading
+from typing import Optional
+from contextlib import contextmanager
 from jinja2 import Environment, FileSystemLoader
 from xhtml2pdf import pisa
 from sqlalchemy.orm import Session
+from app.core.config import settings as app_settings
 from app.models.invoice import Invoice as InvoiceModel
 from app.models.customer import Customer as CustomerModel
 from app.models.settings import Settings as SettingsModel
+from app.services.storage import get_pdf_storage, shard_key
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "..", "templates")
+TEMPLATE_NAME = "invoice.html"
+
+# Bump when rendering logic changes in a way the template source doesn't capture
+RENDER_VERSION = 1
+
+_env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+
+# One lock per render key so identical concurrent requests render once: key -> [lock, users]
+_render_locks = {}
+_render_locks_guard = threading.Lock()
+
+def _template_version() -> str:
+    """Hash of the template source, so editing the template invalidates cached PDFs"""
+    source, _, _ = _env.loader.get_source(_env, TEMPLATE_NAME)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+def compute_render_key(invoice, customer, settings, items) -> str:
+    """Content hash of every input that affects the rendered PDF"""
+    payload = {
+        "render_version": RENDER_VERSION,
+        "template": _template_version(),
+        "invoice": {
+            "id": invoice.id,
+            "invoice_number": invoice.invoice_number,
+            "issue_date": str(invoice.issue_date),
+            "due_date": str(invoice.due_date),
+            "status": str(getattr(invoice.status, "value", invoice.status)),
+            "subtotal_cents": invoice.subtotal_cents,
+            "tax_cents": invoice.tax_cents,
+            "discount_cents": invoice.discount_cents,
+            "total_cents": invoice.total_cents,
+            "balance_due_cents": invoice.balance_due_cents,
+            "notes": invoice.notes,
+        },
+        "items": [
+            [item.description, item.quantity, item.unit_price_cents, item.tax_rate, item.line_total_cents]
+            for item in sorted(items, key=lambda i: i.id or 0)
+        ],
+        "customer": [customer.name, customer.email, customer.phone, customer.address] if customer else None,
+        "settings": [settings.company_name, settings.address, settings.email, settings.currency],
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+@contextmanager
+def _render_lock(key: str):
+    """Hold the key's lock; the entry is dropped once no thread holds or waits for it"""
+    with _render_locks_guard:
+        entry = _render_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _render_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _render_locks[key]
+
+def _render_pdf(html_content: str) -> bytes:
+    output = io.BytesIO()
+    pisa_status = pisa.CreatePDF(html_content, dest=output)
+    if pisa_status.err:
+        return None
+    return output.getvalue()
 
 def generate_invoice_pdf(invoice_id: int, db: Session):
+    """Return the storage key of an up-to-date PDF for the invoice, rendering only if its inputs changed"""
     invoice = db.query(InvoiceModel).filter(InvoiceModel.id == invoice_id).first()
     if not invoice:
         return None
-    
+
     customer = db.query(CustomerModel).filter(CustomerModel.id == invoice.customer_id).first()
     settings = db.query(SettingsModel).first()
-    
+
     if not settings:
         settings = SettingsModel()
-    
-    template_dir = os.path.join(os.path.dirname(__file__), "..", "templates")
-    env = Environment(loader=FileSystemLoader(template_dir))
-    template = env.get_template("invoice.html")
-    
-    html_content = template.render(
-        invoice=invoice,
-        customer=customer,
-        settings=settings,
-        items=invoice.items
-    )
-    
-    pdf_dir = "storage/pdfs"
-    os.makedirs(pdf_dir, exist_ok=True)
-    
-    pdf_path = os.path.join(pdf_dir, f"invoice_{invoice.id}.pdf")
-    
-    # Convert HTML to PDF using xhtml2pdf
-    with open(pdf_path, "wb") as pdf_file:
-        pisa_status = pisa.CreatePDF(html_content, dest=pdf_file)
-    
-    if pisa_status.err:
-        return None
-    
-    invoice.pdf_path = pdf_path
-    db.commit()
-    
-    return pdf_path
+
+    items = invoice.items
+    key = shard_key(compute_render_key(invoice, customer, settings, items))
+    storage = get_pdf_storage()
+
+    with _render_lock(key):
+        if storage.exists(key):
+            storage.touch(key)
+        else:
+            template = _env.get_template(TEMPLATE_NAME)
+            html_content = template.render(
+                invoice=invoice,
+                customer=customer,
+                settings=settings,
+                items=items
+            )
+
+            pdf_bytes = _render_pdf(html_content)
+            if pdf_bytes is None:
+                return None
+            storage.save(key, pdf_bytes)
+
+    previous_key = invoice.pdf_path
+    if previous_key != key:
+        invoice.pdf_path = key
+        db.commit()
+
+        # A download of the old render may still be streaming, so it is left to
+        # collect_unreferenced_pdfs, which waits PDF_DELETE_GRACE_SECONDS from now
+        if previous_key:
+            storage.touch(previous_key)
+
+    return key
+
+def collect_unreferenced_pdfs(db: Session, grace_seconds: Optional[int] = None) -> int:
+    """Delete stored PDFs no invoice points at any more and untouched for the grace period; returns the count"""
+    if grace_seconds is None:
+        grace_seconds = app_settings.PDF_DELETE_GRACE_SECONDS
+    referenced = {key for (key,) in db.query(InvoiceModel.pdf_path).filter(InvoiceModel.pdf_path.isnot(None))}
+    cutoff = time.time() - grace_seconds
+    storage = get_pdf_storage()
+
+    deleted = 0
+    for key, _, modified in storage.iter_objects():
+        # Keys being rendered right now are unreferenced until their commit, but fresh
+        if key not in referenced and modified < cutoff:
+            storage.delete(key)
+            deleted += 1
+    return deleted
+
+def trim_pdf_storage(db: Session, grace_seconds: Optional[int] = None) -> dict:
+    """Collect superseded renders, then evict least recently used ones down to PDF_CACHE_MAX_BYTES"""
+    if grace_seconds is None:
+        grace_seconds = app_settings.PDF_DELETE_GRACE_SECONDS
+    collected = collect_unreferenced_pdfs(db, grace_seconds)
+    # Objects used within the grace period may be streaming; an evicted current render is rendered again on demand
+    evicted = get_pdf_storage().enforce_limit(app_settings.PDF_CACHE_MAX_BYTES, keep_after=time.time() - grace_seconds)
+    return {"collected": collected, "evicted": evicted}
@@ -0,0 +1,101 @@
+"""Streamed ZIP export of invoice PDFs"""
+import zipfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.pdf import generate_invoice_pdf
+from app.services.storage import get_pdf_storage
+
+
+class _ZipStreamBuffer:
+    """Write-only file object that hands bytes to the response as soon as zipfile emits them.
+
+    It deliberately has no tell()/seek(), which makes zipfile write entries with
+    data descriptors instead of seeking back, so the archive is never held in
+    memory or on disk.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _render_in_own_session(invoice_id: int, session_factory: Callable[[], Session]):
+    # Sessions are not thread-safe, so each worker gets its own connection
+    db = session_factory()
+    try:
+        return generate_invoice_pdf(invoice_id, db)
+    finally:
+        db.close()
+
+
+def entry_names(invoices: List[Tuple[int, str]]) -> Dict[int, str]:
+    """ZIP entry name per invoice id: the invoice number, plus the id where numbers would collide"""
+    # Path separators would turn the number into folders inside the archive
+    numbers = {invoice_id: invoice_number.replace("/", "-").replace("\\", "-") for invoice_id, invoice_number in invoices}
+    counts = Counter(number.lower() for number in numbers.values())
+    return {
+        invoice_id: f"{number}.pdf" if counts[number.lower()] == 1 else f"{number}-{invoice_id}.pdf"
+        for invoice_id, number in numbers.items()
+    }
+
+
+def stream_invoice_pdfs_zip(
+    invoices: List[Tuple[int, str]],
+    session_factory: Callable[[], Session] = SessionLocal
+) -> Iterator[bytes]:
+    """Yield a ZIP archive of (invoice_id, invoice_number) PDFs, one entry per finished render"""
+    buffer = _ZipStreamBuffer()
+    storage = get_pdf_storage()
+    names = entry_names(invoices)
+    failed = []
+
+    executor = ThreadPoolExecutor(max_workers=max(1, settings.PDF_EXPORT_WORKERS))
+    try:
+        futures = {
+            executor.submit(_render_in_own_session, invoice_id, session_factory): invoice_id
+            for invoice_id, _ in invoices
+        }
+
+        with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            for future in as_completed(futures):
+                name = names[futures[future]]
+                try:
+                    pdf_key = future.result()
+                    if not pdf_key:
+                        raise RuntimeError("render failed")
+                    with archive.open(name, mode="w") as entry:
+                        for chunk in storage.iter_chunks(pdf_key):
+                            entry.write(chunk)
+                            data = buffer.drain()
+                            if data:
+                                yield data
+                except Exception as e:
+                    failed.append(f"{name}: {e}")
+
+                data = buffer.drain()
+                if data:
+                    yield data
+
+            if failed:
+                archive.writestr("errors.txt", "\n".join(failed) + "\n")
+
+        yield buffer.drain()
+    finally:
+        # Stops queued renders if the client disconnects mid-download
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,182 @@
+"""Detection of recurring charges: subscriptions, bills and other repeating payments.
+
+Transactions are grouped by merchant, their notes normalized by
+CategorySuggestionService.normalize_text without tokens holding digits
+(store numbers, references). Every write stores that key in the indexed
+transactions.merchant column. A merchant is recurring when most gaps between
+its dates fit one cadence and its amounts barely vary; both tests run with
+NumPy over every merchant at once.
+
+Results are stored in recurring_charges. recurring_scans records which
+transactions they cover: when only new transactions have arrived since, just
+the rows of their merchants are loaded and analyzed again; an edit or delete
+rescans everything. recurring_charges() refreshes the stored results as it
+reads them, so the GET endpoint serving them writes and commits whenever
+transactions changed. NumPy is in requirements.txt but imported here only,
+so the rest of the app still runs without it.
+"""
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.recurring_charge import RecurringCharge, RecurringScan
+from app.models.transaction import Transaction
+from app.services.category_suggestion import CategorySuggestionService
+from app.services.transaction_archive import reaches_archive, transaction_sources
+
+# name, typical gap in days, allowed deviation in days, step to the next date
+CADENCES = [
+    ("weekly", 7, 1, relativedelta(weeks=1)),
+    ("biweekly", 14, 2, relativedelta(weeks=2)),
+    ("monthly", 30.44, 5, relativedelta(months=1)),
+    ("quarterly", 91.31, 8, relativedelta(months=3)),
+    ("yearly", 365.25, 12, relativedelta(years=1)),
+]
+MIN_OCCURRENCES = 3
+MIN_REGULAR_SHARE = 0.75  # Of the gaps, so one skipped or doubled month is tolerated
+MAX_AMOUNT_VARIATION = 0.25  # Standard deviation over mean; bills vary, subscriptions don't
+
+# Parallel sequences: merchant, date, amount_cents, transaction id, category_id, notes
+Columns = Tuple[Sequence[str], Sequence[date], Sequence[int], Sequence[int], Sequence[Optional[int]], Sequence[Optional[str]]]
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("Recurring charge detection requires numpy (pip install numpy)")
+    return numpy
+
+
+@lru_cache(maxsize=65536)
+def merchant_key(notes: Optional[str]) -> str:
+    words = CategorySuggestionService.normalize_text(notes or "").split()
+    return " ".join(word for word in words if not any(char.isdigit() for char in word))
+
+
+def detect_recurring(columns: Columns) -> List[dict]:
+    """Recurring merchants among the transactions in `columns`, as RecurringCharge column values"""
+    np = _numpy()
+    merchants, dates, amounts, ids, category_ids, notes = columns
+    if not merchants:
+        return []
+    
+    groups: Dict[str, int] = {}
+    group = np.fromiter((groups.setdefault(merchant, len(groups)) for merchant in merchants), np.int64, len(merchants))
+    days = np.array(dates, dtype="datetime64[D]").astype(np.int64)
+    order = np.lexsort((np.asarray(ids, dtype=np.int64), days, group))
+    group, days, cents = group[order], days[order], np.asarray(amounts, dtype=np.float64)[order]
+    sizes = np.bincount(group, minlength=len(groups))
+    ends = np.cumsum(sizes)
+    
+    # Each gap between consecutive dates of a merchant votes for the cadence it fits, if any
+    same = group[1:] == group[:-1]
+    gaps, gap_group = np.diff(days)[same], group[1:][same]
+    periods = np.array([period for _, period, _, _ in CADENCES])
+    tolerances = np.array([tolerance for _, _, tolerance, _ in CADENCES])
+    distance = np.abs(gaps[:, None] - periods[None, :])
+    nearest = distance.argmin(axis=1)
+    fits = distance[np.arange(len(gaps)), nearest] <= tolerances[nearest]
+    votes = np.zeros((len(groups), len(CADENCES)), dtype=np.int64)
+    np.add.at(votes, (gap_group[fits], nearest[fits]), 1)
+    cadence = votes.argmax(axis=1)
+    regular_share = votes.max(axis=1) / np.maximum(sizes - 1, 1)
+    
+    means = np.bincount(group, weights=cents, minlength=len(groups)) / sizes
+    squares = np.bincount(group, weights=cents * cents, minlength=len(groups)) / sizes
+    variation = np.sqrt(np.maximum(squares - means * means, 0)) / np.maximum(np.abs(means), 1)
+    
+    recurring = (sizes >= MIN_OCCURRENCES) & (regular_share >= MIN_REGULAR_SHARE) & (variation <= MAX_AMOUNT_VARIATION)
+    names = list(groups)
+    
+    charges = []
+    for index in np.flatnonzero(recurring):
+        if not names[index]:
+            continue
+        name, _, _, step = CADENCES[cadence[index]]
+        first, last = order[ends[index] - sizes[index]], order[ends[index] - 1]
+        charges.append({
+            "merchant": names[index],
+            "notes": notes[last],
+            "category_id": category_ids[last],
+            "cadence": name,
+            "occurrences": int(sizes[index]),
+            "amount_cents": amounts[last],
+            "average_amount_cents": int(round(means[index])),
+            "amount_variation": round(float(variation[index]), 4),
+            "first_date": dates[first],
+            "last_date": dates[last],
+            "next_date": dates[last] + step,
+            "last_transaction_id": ids[last],
+        })
+    return charges
+
+
+def is_active(charge: RecurringCharge, today: date) -> bool:
+    """Whether the next charge is still expected, i.e. its date plus the cadence's leeway hasn't passed"""
+    tolerance = next(tolerance for name, _, tolerance, _ in CADENCES if name == charge.cadence)
+    return (today - charge.next_date).days <= tolerance
+
+
+def _load_columns(db: Session, user_id: int, merchants=None) -> Columns:
+    """The user's transactions, hot and archived, optionally only those of the given merchants"""
+    source, _ = transaction_sources(reaches_archive(db, user_id, date.min))
+    query = select(
+        source.merchant, source.date, source.amount_cents, source.id, source.category_id, source.notes
+    ).where(source.user_id == user_id, source.merchant != "")
+    if merchants is not None:
+        query = query.where(source.merchant.in_(sorted(merchants)))
+    
+    rows = db.execute(query).all()
+    return tuple(zip(*rows)) if rows else ((),) * 6
+
+
+def recurring_charges(db: Session, user_id: int) -> List[RecurringCharge]:
+    """The user's recurring charges, brought up to date with their transactions first.
+    
+    When transactions changed since the last scan, the refreshed results are
+    stored and committed before they are returned.
+    """
+    count, last_id, last_updated = db.query(
+        func.count(Transaction.id), func.coalesce(func.max(Transaction.id), 0), func.max(Transaction.updated_at)
+    ).filter(Transaction.user_id == user_id).one()
+    
+    scan = db.get(RecurringScan, user_id)
+    stored = db.query(RecurringCharge).filter(RecurringCharge.user_id == user_id)
+    if scan is not None and (scan.transaction_count, scan.last_transaction_id, scan.last_updated_at) == (count, last_id, last_updated):
+        return stored.order_by(RecurringCharge.next_date).all()
+    
+    appended = False
+    if scan is not None:
+        new = db.query(Transaction).filter(Transaction.user_id == user_id, Transaction.id > scan.last_transaction_id)
+        new_count = new.count()
+        unchanged = db.query(func.max(Transaction.updated_at)).filter(
+            Transaction.user_id == user_id, Transaction.id <= scan.last_transaction_id
+        ).scalar()
+        appended = count == scan.transaction_count + new_count and (
+            unchanged is None or scan.last_updated_at is None or unchanged <= scan.last_updated_at
+        )
+    
+    if appended:
+        # Only merchants of the new transactions can have changed
+        merchants = {merchant for merchant, in new.with_entities(Transaction.merchant).distinct()} - {None, ""}
+        charges = detect_recurring(_load_columns(db, user_id, merchants)) if merchants else []
+        stored.filter(RecurringCharge.merchant.in_(list(merchants))).delete(synchronize_session=False)
+    else:
+        charges = detect_recurring(_load_columns(db, user_id))
+        stored.delete(synchronize_session=False)
+    
+    db.add_all(RecurringCharge(user_id=user_id, **charge) for charge in charges)
+    if scan is None:
+        scan = RecurringScan(user_id=user_id)
+        db.add(scan)
+    scan.transaction_count, scan.last_transaction_id, scan.last_updated_at = count, last_id, last_updated
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request refreshed the same user first; its results are as current
+        db.rollback()
+    return stored.order_by(RecurringCharge.next_date).all()
@@ -0,0 +1,83 @@
+"""Maintenance of the revenue rollup tables"""
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.invoice import Invoice
+from app.models.payment import Payment
+from app.models.revenue_rollup import RevenueByMonth, RevenueByCustomer
+
+
+def month_key(paid_at: datetime) -> str:
+    return paid_at.strftime('%Y-%m')
+
+
+def _upsert_increment(db: Session, model, key_column: str, key_value, values: dict):
+    """INSERT the row or add `values` onto the existing one, atomically"""
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+    
+    table = model.__table__
+    now = datetime.utcnow()
+    stmt = insert(table).values({key_column: key_value, **values, 'updated_at': now})
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[key_column],
+        set_={
+            **{column: table.c[column] + stmt.excluded[column] for column in values},
+            'updated_at': now
+        }
+    )
+    db.execute(stmt)
+
+
+def apply_payment(db: Session, customer_id: int, paid_at: datetime, amount_cents: int, count: int = 1):
+    """Add a payment to the rollups; runs inside the caller's transaction"""
+    _upsert_increment(db, RevenueByMonth, 'month', month_key(paid_at), {
+        'revenue_cents': amount_cents,
+        'payment_count': count
+    })
+    _upsert_increment(db, RevenueByCustomer, 'customer_id', customer_id, {
+        'total_paid_cents': amount_cents,
+        'payment_count': count
+    })
+
+
+def rebuild_revenue_rollups(db: Session):
+    """Recompute both rollup tables from the payments table"""
+    db.query(RevenueByMonth).delete()
+    db.query(RevenueByCustomer).delete()
+    
+    if db.get_bind().dialect.name == 'postgresql':
+        month_expr = func.to_char(Payment.paid_at, 'YYYY-MM')
+    else:
+        month_expr = func.strftime('%Y-%m', Payment.paid_at)
+    
+    now = datetime.utcnow()
+    by_month = db.query(
+        month_expr.label('month'),
+        func.sum(Payment.amount_cents).label('revenue'),
+        func.count(Payment.id).label('count')
+    ).group_by(month_expr).all()
+    
+    if by_month:
+        db.execute(RevenueByMonth.__table__.insert(), [
+            {'month': row.month, 'revenue_cents': row.revenue, 'payment_count': row.count, 'updated_at': now}
+            for row in by_month
+        ])
+    
+    by_customer = db.query(
+        Invoice.customer_id,
+        func.sum(Payment.amount_cents).label('total'),
+        func.count(Payment.id).label('count')
+    ).join(
+        Payment, Payment.invoice_id == Invoice.id
+    ).group_by(Invoice.customer_id).all()
+    
+    if by_customer:
+        db.execute(RevenueByCustomer.__table__.insert(), [
+            {'customer_id': row.customer_id, 'total_paid_cents': row.total, 'payment_count': row.count, 'updated_at': now}
+            for row in by_customer
+        ])
+    
+    db.commit()
+    return len(by_month), len(by_customer)
@@ -0,0 +1,256 @@
+"""Storage backends for rendered invoice PDFs"""
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional, Tuple
+from app.core.config import settings
+
+CHUNK_SIZE = 64 * 1024
+
+# Keys written by shard_key; invoices rendered before sharding hold other pdf_path values
+SHARD_KEY_PATTERN = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$")
+
+
+def shard_key(content_hash: str, extension: str = "pdf") -> str:
+    """Spread objects over 65,536 directories so no single directory grows unbounded"""
+    return f"{content_hash[:2]}/{content_hash[2:4]}/{content_hash}.{extension}"
+
+
+class PDFStorage(ABC):
+    """Interface shared by all PDF storage backends"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def save(self, key: str, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def iter_chunks(self, key: str) -> Iterator[bytes]:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def iter_objects(self) -> Iterator[Tuple[str, int, float]]:
+        """(key, size in bytes, last modified or touched as a Unix timestamp) of every stored PDF"""
+
+    def touch(self, key: str) -> None:
+        """Record a cache hit; backends without access tracking ignore it"""
+
+    def enforce_limit(self, max_bytes: int, keep_after: Optional[float] = None) -> int:
+        """Evict least recently used objects, none touched after `keep_after`; returns how many.
+
+        Backends with their own lifecycle rules ignore it.
+        """
+        return 0
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path for the object, when the backend has one"""
+        return None
+
+    def presigned_url(self, key: str, filename: str) -> Optional[str]:
+        """Time-limited direct download URL, when the backend supports it"""
+        return None
+
+
+class LocalPDFStorage(PDFStorage):
+    """Sharded directory tree on local disk"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def save(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write then rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def iter_chunks(self, key: str) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def touch(self, key: str) -> None:
+        try:
+            os.utime(self._path(key), None)
+        except OSError:
+            pass
+
+    def iter_objects(self) -> Iterator[Tuple[str, int, float]]:
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.endswith(".pdf"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                yield key, stat.st_size, stat.st_mtime
+
+    def enforce_limit(self, max_bytes: int, keep_after: Optional[float] = None) -> int:
+        # Walks the whole tree, so it runs from trim_pdf_storage.py rather than per render
+        if max_bytes <= 0:
+            return 0
+
+        entries = sorted((modified, size, key) for key, size, modified in self.iter_objects())
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for modified, size, key in entries:
+            if total <= max_bytes:
+                break
+            if keep_after is not None and modified > keep_after:
+                continue
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        return evicted
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+
+class S3PDFStorage(PDFStorage):
+    """S3-compatible object storage (AWS S3, MinIO, ...)"""
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        presigned_ttl_seconds: int = 300
+    ):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("PDF_STORAGE_BACKEND=s3 requires boto3 (pip install boto3)")
+
+        self._client_error = ClientError
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None
+        )
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.presigned_ttl_seconds = presigned_ttl_seconds
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def save(self, key: str, data: bytes) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            Body=data,
+            ContentType="application/pdf"
+        )
+
+    def iter_chunks(self, key: str) -> Iterator[bytes]:
+        response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        body = response["Body"]
+        try:
+            for chunk in body.iter_chunks(CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
+
+    def delete(self, key: str) -> None:
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self._client_error:
+            pass
+
+    def iter_objects(self) -> Iterator[Tuple[str, int, float]]:
+        # Without touch() tracking, LastModified is the upload time
+        paginator = self.client.get_paginator("list_objects_v2")
+        prefix = f"{self.prefix}/" if self.prefix else ""
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                if item["Key"].endswith(".pdf"):
+                    yield item["Key"][len(prefix):], item["Size"], item["LastModified"].timestamp()
+
+    def presigned_url(self, key: str, filename: str) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self._object_key(key),
+                "ResponseContentType": "application/pdf",
+                "ResponseContentDisposition": f'attachment; filename="{filename}"'
+            },
+            ExpiresIn=self.presigned_ttl_seconds
+        )
+
+
+_storage = None
+
+
+def get_pdf_storage() -> PDFStorage:
+    """Backend selected by PDF_STORAGE_BACKEND, created once per process"""
+    global _storage
+    if _storage is None:
+        if settings.PDF_STORAGE_BACKEND == "s3":
+            _storage = S3PDFStorage(
+                bucket=settings.S3_BUCKET,
+                prefix=settings.S3_PREFIX,
+                endpoint_url=settings.S3_ENDPOINT_URL,
+                region=settings.S3_REGION,
+                access_key_id=settings.S3_ACCESS_KEY_ID,
+                secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+                presigned_ttl_seconds=settings.PDF_PRESIGNED_TTL_SECONDS
+            )
+        else:
+            _storage = LocalPDFStorage(settings.PDF_STORAGE_DIR)
+    return _storage
@@ -0,0 +1,164 @@
+"""Cold storage for the transactions of closed periods.
+
+The archival job moves transactions dated before archive_cutoff(), with their
+splits, into transactions_archive and transaction_splits_archive, and adds
+what they contributed to each category per month to archived_category_months
+so budget_categories totals still add up. Reads whose date range reaches an
+archived date (an open-ended range reaches all of them) query
+transaction_sources(True), a UNION ALL of the hot and archive tables;
+everything else keeps reading the hot tables only.
+
+Archived transactions are read-only history: they are left out of the search
+index and can't be fetched, changed or deleted by id.
+"""
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Optional
+from sqlalchemy import delete, extract, func, insert, select, union_all
+from sqlalchemy.orm import Query, Session, aliased
+from app.core.config import settings
+from app.models.transaction import Transaction, TransactionSplit
+from app.models.transaction_archive import ArchivedCategoryMonth, ArchivedTransaction, ArchivedTransactionSplit
+
+_hot, _hot_splits = Transaction.__table__, TransactionSplit.__table__
+_archive, _archive_splits = ArchivedTransaction.__table__, ArchivedTransactionSplit.__table__
+
+
+
+def archive_cutoff(today: Optional[date] = None) -> date:
+    """First day of the oldest month kept in the hot tables"""
+    today = today or date.today()
+    months = today.year * 12 + today.month - 1 - settings.ARCHIVE_AFTER_MONTHS
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def latest_archived_query(db: Session, user_id: int, start_date: Optional[date] = None,
+                          end_date: Optional[date] = None, budget_id: Optional[int] = None) -> Query:
+    """Query for the date of the user's newest archived transaction in the range, NULL when it has none.
+    
+    A missing start or end leaves that side of the range open. Callers can run it
+    on its own or carry it along another query with .scalar_subquery().
+    """
+    query = db.query(func.max(ArchivedTransaction.date)).filter(ArchivedTransaction.user_id == user_id)
+    if start_date is not None:
+        query = query.filter(ArchivedTransaction.date >= start_date)
+    if end_date is not None:
+        query = query.filter(ArchivedTransaction.date <= end_date)
+    if budget_id is not None:
+        query = query.filter(ArchivedTransaction.budget_id == budget_id)
+    return query
+
+
+def latest_archived_date(db: Session, user_id: int, start_date: Optional[date] = None,
+                         end_date: Optional[date] = None, budget_id: Optional[int] = None) -> Optional[date]:
+    """Date of the user's newest archived transaction in the range, or None when it has none"""
+    return latest_archived_query(db, user_id, start_date, end_date, budget_id).scalar()
+
+
+def reaches_archive(db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date] = None) -> bool:
+    """Whether a date range covers archived transactions of the user; no start reaches back to the oldest"""
+    return latest_archived_date(db, user_id, start_date, end_date) is not None
+
+
+@lru_cache(maxsize=None)
+def _combined_sources():
+    # Built on first use: aliasing configures the mappers, which needs every model imported
+    return (
+        aliased(Transaction, union_all(select(_hot), select(_archive)).subquery("all_transactions")),
+        aliased(TransactionSplit, union_all(select(_hot_splits), select(_archive_splits)).subquery("all_transaction_splits"))
+    )
+
+
+def transaction_sources(include_archive: bool):
+    """Entities to read transactions and splits from: the hot tables, or a UNION ALL of the hot and archive tables"""
+    if include_archive:
+        return _combined_sources()
+    return Transaction, TransactionSplit
+
+
+def _month_totals(db: Session, moving) -> Dict[tuple, List[int]]:
+    """(category_id, year, month) -> [user_id, cents, count] contributed by the transactions in `moving`"""
+    year, month = extract('year', Transaction.date), extract('month', Transaction.date)
+    regular = db.query(
+        Transaction.category_id, year, month, Transaction.user_id,
+        func.sum(Transaction.amount_cents), func.count(Transaction.id)
+    ).filter(
+        Transaction.id.in_(moving),
+        Transaction.is_split == False,
+        Transaction.category_id.isnot(None)
+    ).group_by(Transaction.category_id, year, month, Transaction.user_id)
+    split = db.query(
+        TransactionSplit.category_id, year, month, Transaction.user_id,
+        func.sum(TransactionSplit.amount_cents), func.count(TransactionSplit.id)
+    ).join(
+        Transaction, TransactionSplit.transaction_id == Transaction.id
+    ).filter(
+        Transaction.id.in_(moving)
+    ).group_by(TransactionSplit.category_id, year, month, Transaction.user_id)
+    
+    totals = {}
+    for category_id, in_year, in_month, user_id, cents, count in regular.all() + split.all():
+        total = totals.setdefault((category_id, int(in_year), int(in_month)), [user_id, 0, 0])
+        total[1] += cents
+        total[2] += count
+    return totals
+
+
+def _add_month_totals(db: Session, totals: Dict[tuple, List[int]]):
+    existing = {
+        (row.category_id, row.year, row.month): row
+        for row in db.query(ArchivedCategoryMonth).filter(
+            ArchivedCategoryMonth.category_id.in_({category_id for category_id, _, _ in totals})
+        )
+    }
+    for key, (user_id, cents, count) in totals.items():
+        row = existing.get(key)
+        if row is None:
+            category_id, year, month = key
+            db.add(ArchivedCategoryMonth(category_id=category_id, year=year, month=month, user_id=user_id,
+                                         spent_cents=cents, transaction_count=count))
+        else:
+            row.spent_cents += cents
+            row.transaction_count += count
+    db.flush()
+
+
+def archive_user_transactions(db: Session, user_id: int, before: date, keep_id: int) -> dict:
+    """Move one user's transactions dated before `before` to the archive, in the caller's transaction"""
+    moving = select(Transaction.id).where(
+        Transaction.user_id == user_id,
+        Transaction.date < before,
+        Transaction.id < keep_id
+    )
+    _add_month_totals(db, _month_totals(db, moving))
+    
+    db.execute(insert(_archive).from_select(
+        list(_hot.c.keys()), select(_hot).where(_hot.c.id.in_(moving))
+    ))
+    splits = db.execute(insert(_archive_splits).from_select(
+        list(_hot_splits.c.keys()), select(_hot_splits).where(_hot_splits.c.transaction_id.in_(moving))
+    )).rowcount
+    db.execute(delete(_hot_splits).where(_hot_splits.c.transaction_id.in_(moving)))
+    transactions = db.execute(delete(_hot).where(_hot.c.id.in_(moving))).rowcount
+    return {"transactions": transactions, "splits": splits}
+
+
+def archive_transactions(db: Session, before: Optional[date] = None, user_id: Optional[int] = None) -> dict:
+    """Archive every user's (or one user's) transactions dated before `before`, committing per user"""
+    before = before or archive_cutoff()
+    # SQLite hands the largest deleted rowid out again, which would give a new
+    # transaction an archived id; the newest transaction therefore stays hot
+    keep_id = db.query(func.coalesce(func.max(Transaction.id), 0)).scalar()
+    
+    users = db.query(Transaction.user_id).filter(Transaction.date < before).distinct()
+    if user_id is not None:
+        users = users.filter(Transaction.user_id == user_id)
+    
+    result = {"before": before, "users": 0, "transactions": 0, "splits": 0}
+    for (owner,) in users.all():
+        moved = archive_user_transactions(db, owner, before, keep_id)
+        db.commit()
+        result["users"] += 1
+        result["transactions"] += moved["transactions"]
+        result["splits"] += moved["splits"]
+    return result
@@ -0,0 +1,114 @@
+"""Duplicate detection for transactions.
+
+Every transaction stores a fingerprint of its amount and normalized notes,
+indexed together with the user and date. A new row duplicates an existing
+one when the fingerprints match on the same date (exact) or within
+DUPLICATE_WINDOW_DAYS of it (near: a bank posting a day later, say). The date
+is kept out of the hash so near matches are one index range lookup too.
+"""
+import hashlib
+import re
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models.transaction import Transaction
+
+DUPLICATE_WINDOW_DAYS = 1
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_notes(notes: Optional[str]) -> str:
+    """Lowercase words without punctuation, dropping tokens with digits (store numbers, references)"""
+    words = _PUNCTUATION.sub("", (notes or "").lower()).split()
+    return " ".join(word for word in words if not any(char.isdigit() for char in word))
+
+
+def transaction_fingerprint(amount_cents: int, notes: Optional[str]) -> str:
+    return hashlib.sha256(f"{amount_cents}|{normalize_notes(notes)}".encode()).hexdigest()[:32]
+
+
+def find_duplicates(
+    db: Session,
+    user_id: int,
+    candidates: List[Tuple[str, date]],
+    max_id: Optional[int] = None
+) -> Dict[int, Tuple[int, bool]]:
+    """Existing transactions that the (fingerprint, date) candidates would duplicate.
+    
+    Returns {candidate index: (existing transaction id, exact)}, preferring an
+    exact match. One query for all candidates; `max_id` ignores rows written
+    after that id, e.g. earlier batches of the same import.
+    """
+    if not candidates:
+        return {}
+    
+    window = timedelta(days=DUPLICATE_WINDOW_DAYS)
+    query = db.query(Transaction.id, Transaction.fingerprint, Transaction.date).filter(
+        Transaction.user_id == user_id,
+        Transaction.fingerprint.in_({fingerprint for fingerprint, _ in candidates}),
+        Transaction.date.between(min(day for _, day in candidates) - window, max(day for _, day in candidates) + window)
+    )
+    if max_id is not None:
+        query = query.filter(Transaction.id <= max_id)
+    
+    existing = {}
+    for transaction_id, fingerprint, day in query.order_by(Transaction.id):
+        existing.setdefault(fingerprint, []).append((day, transaction_id))
+    
+    duplicates = {}
+    for index, (fingerprint, day) in enumerate(candidates):
+        matches = [(abs((other - day).days), transaction_id)
+                   for other, transaction_id in existing.get(fingerprint, ())
+                   if abs(other - day) <= window]
+        if matches:
+            distance, transaction_id = min(matches)
+            duplicates[index] = (transaction_id, distance == 0)
+    return duplicates
+
+
+def latest_transaction_id(db: Session) -> int:
+    return db.query(func.coalesce(func.max(Transaction.id), 0)).scalar()
+
+
+def duplicate_clusters(db: Session, user_id: int) -> List[dict]:
+    """Groups of the user's transactions that duplicate each other, in one pass over the index.
+    
+    Rows sharing a fingerprint form a cluster while each is within the window
+    of the previous one, so a weekly subscription is not one big cluster.
+    """
+    repeated = select(Transaction.fingerprint).where(
+        Transaction.user_id == user_id,
+        Transaction.fingerprint.isnot(None)
+    ).group_by(Transaction.fingerprint).having(func.count() > 1)
+    
+    rows = db.query(
+        Transaction.id, Transaction.fingerprint, Transaction.date, Transaction.amount_cents, Transaction.notes
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.fingerprint.in_(repeated)
+    ).order_by(Transaction.fingerprint, Transaction.date, Transaction.id)
+    
+    clusters = []
+    current = None
+    for row in rows.yield_per(1000):
+        if (current is None or current["fingerprint"] != row.fingerprint
+                or (row.date - current["last_date"]).days > DUPLICATE_WINDOW_DAYS):
+            current = {
+                "fingerprint": row.fingerprint,
+                "amount_cents": row.amount_cents,
+                "notes": row.notes,
+                "first_date": row.date,
+                "last_date": row.date,
+                "transaction_ids": []
+            }
+            clusters.append(current)
+        current["last_date"] = row.date
+        current["transaction_ids"].append(row.id)
+    
+    return [
+        {**cluster, "exact": cluster["first_date"] == cluster["last_date"]}
+        for cluster in clusters
+        if len(cluster["transaction_ids"]) > 1
+    ]
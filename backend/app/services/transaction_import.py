@@ -0,0 +1,285 @@
+"""Streaming import of bank statements (CSV, OFX/QFX, QIF) into transactions.
+
+Files are parsed row by row from the upload stream and written in batches
+with one executemany INSERT each, so memory and round trips stay flat
+however long the statement is. Each row lands in the user's budget for its
+month and is categorized from the user's learned patterns.
+"""
+import csv
+import io
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.budget import Budget, BudgetCategory
+from app.models.transaction import Transaction
+from app.services.category_spend import apply_category_spend
+from app.services.category_suggestion import CategorySuggestionService
+from app.services.dashboard_state import refresh_dashboard_sections
+from app.services.recurring_charges import merchant_key
+from app.services.transaction_duplicates import find_duplicates, latest_transaction_id, transaction_fingerprint
+
+FORMATS = ("csv", "ofx", "qif")
+MAX_REPORTED_ERRORS = 100
+
+# (position in the file, raw date, raw signed amount, description)
+RawRow = Tuple[str, str, str, str]
+
+# Two-digit years first: %Y would read "24" as the year 24
+_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%y", "%m/%d/%Y", "%Y/%m/%d", "%d.%m.%Y", "%Y%m%d")
+_CSV_DATE_COLUMNS = ("date", "transaction date", "posted date", "posting date", "post date")
+_CSV_DESCRIPTION_COLUMNS = ("description", "payee", "name", "merchant", "notes")
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    return {"csv": "csv", "ofx": "ofx", "qfx": "ofx", "qif": "qif"}.get(extension)
+
+
+def _parse_date(value: str) -> date:
+    value = value.strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognized date '{value}'")
+
+
+def _parse_cents(value: str) -> int:
+    text = value.strip().replace(",", "").replace("$", "").replace(" ", "")
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    try:
+        cents = int((Decimal(text) * 100).quantize(Decimal(1)))
+    except InvalidOperation:
+        raise ValueError(f"unrecognized amount '{value}'")
+    return -cents if negative else cents
+
+
+def _csv_rows(stream: io.TextIOBase) -> Iterator[RawRow]:
+    reader = csv.reader(stream)
+    header = [column.strip().lower() for column in next(reader, [])]
+    
+    def column(*names):
+        return next((header.index(name) for name in names if name in header), None)
+    
+    date_col = column(*_CSV_DATE_COLUMNS)
+    amount_col = column("amount")
+    debit_col, credit_col = column("debit"), column("credit")
+    description_col = column(*_CSV_DESCRIPTION_COLUMNS)
+    memo_col = column("memo")
+    if date_col is None or (amount_col is None and debit_col is None and credit_col is None):
+        raise ValueError("CSV needs a date column and an amount (or debit/credit) column")
+    
+    for line, row in enumerate(reader, start=2):
+        if not any(cell.strip() for cell in row):
+            continue
+        cell = lambda index: row[index].strip() if index is not None and index < len(row) else ""
+        
+        if amount_col is not None:
+            amount = cell(amount_col)
+        elif cell(debit_col):
+            amount = f"-{cell(debit_col).lstrip('-')}"
+        else:
+            amount = cell(credit_col)
+        
+        description = " ".join(part for part in (cell(description_col), cell(memo_col)) if part)
+        yield f"line {line}", cell(date_col), amount, description
+
+
+def _ofx_rows(stream: io.TextIOBase) -> Iterator[RawRow]:
+    """STMTTRN blocks from SGML or XML OFX, read in chunks rather than whole"""
+    current = None
+    count = 0
+    pending = ""
+    while True:
+        chunk = stream.read(64 * 1024)
+        pending += chunk
+        parts = pending.split("<")
+        # The last part may be cut off mid-tag; keep it for the next chunk
+        pending = parts.pop() if chunk else ""
+        
+        for part in parts:
+            tag, _, value = part.partition(">")
+            tag = tag.strip().upper()
+            if tag == "STMTTRN":
+                current = {}
+            elif tag == "/STMTTRN" and current is not None:
+                count += 1
+                description = " ".join(part for part in (current.get("NAME", ""), current.get("MEMO", "")) if part)
+                yield f"transaction {count}", current.get("DTPOSTED", "")[:8], current.get("TRNAMT", ""), description
+                current = None
+            elif current is not None and tag and not tag.startswith("/"):
+                current[tag] = value.strip()
+        
+        if not chunk:
+            break
+
+
+def _qif_rows(stream: io.TextIOBase) -> Iterator[RawRow]:
+    record = {}
+    count = 0
+    for raw_line in stream:
+        line = raw_line.strip()
+        if not line or line.startswith("!"):
+            continue
+        if line == "^":
+            if record:
+                count += 1
+                description = " ".join(part for part in (record.get("P", ""), record.get("M", "")) if part)
+                # QIF dates look like 1/15'24 or 01/15/2024
+                raw_date = record.get("D", "").replace("'", "/").replace(" ", "")
+                yield f"record {count}", raw_date, record.get("T", record.get("U", "")), description
+            record = {}
+        else:
+            record[line[0]] = line[1:].strip()
+
+
+_PARSERS = {"csv": _csv_rows, "ofx": _ofx_rows, "qif": _qif_rows}
+
+
+def insert_transaction_batch(db: Session, rows: List[dict]):
+    """Insert plain (non-split) transaction rows with one executemany and book their category spend"""
+    if not rows:
+        return
+    db.execute(insert(Transaction), rows)
+    
+    effect = {}
+    for row in rows:
+        cents, count = effect.get(row["category_id"], (0, 0))
+        effect[row["category_id"]] = (cents + row["amount_cents"], count + 1)
+    apply_category_spend(db, {}, effect)
+
+
+def import_statement(
+    db: Session,
+    user_id: int,
+    file: BinaryIO,
+    file_format: str,
+    negative_is_spending: bool = True,
+    fallback_category: str = "Uncategorized",
+    batch_size: Optional[int] = None,
+    skip_duplicates: bool = True
+) -> dict:
+    """Import a statement's spending rows; all or nothing, committed at the end.
+    
+    Rows are skipped (and counted) when they are not spending, fall in a
+    month without a budget, or cannot be parsed, and, with `skip_duplicates`,
+    when they duplicate a transaction recorded before the import started (a
+    statement imported twice). Rows no learned pattern matches go to
+    `fallback_category`, created in the budget when missing.
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    
+    budgets = {
+        (year, month): budget_id for budget_id, year, month in db.query(
+            Budget.id, Budget.year, Budget.month
+        ).filter(Budget.user_id == user_id)
+    }
+    categories = {
+        (budget_id, name.lower()): category_id for category_id, budget_id, name in db.query(
+            BudgetCategory.id, BudgetCategory.budget_id, BudgetCategory.name
+        ).join(Budget, BudgetCategory.budget_id == Budget.id).filter(
+            Budget.user_id == user_id,
+            BudgetCategory.is_active == True
+        ).order_by(BudgetCategory.id.desc())  # Lowest id wins on duplicate names
+    }
+    match = CategorySuggestionService(db).build_batch_matcher(user_id)
+    
+    def fallback_category_id(budget_id: int) -> int:
+        key = (budget_id, fallback_category.lower())
+        if key not in categories:
+            order = db.query(func.coalesce(func.max(BudgetCategory.order), -1) + 1).filter(
+                BudgetCategory.budget_id == budget_id
+            ).scalar()
+            category = BudgetCategory(budget_id=budget_id, name=fallback_category, allocated_cents=0, order=order)
+            db.add(category)
+            db.flush()
+            categories[key] = category.id
+        return categories[key]
+    
+    result = {"imported": 0, "categorized": 0, "skipped": 0, "batches": 0, "duplicates": 0, "errors": []}
+    
+    def skip(position: str, reason: str):
+        result["skipped"] += 1
+        if len(result["errors"]) < MAX_REPORTED_ERRORS:
+            result["errors"].append(f"{position}: {reason}")
+    
+    # Rows this import writes must not count as duplicates of each other
+    max_existing_id = latest_transaction_id(db)
+    
+    def flush(batch: List[tuple]):
+        duplicates = find_duplicates(
+            db, user_id, [(row["fingerprint"], row["date"]) for _, row, _ in batch], max_id=max_existing_id
+        )
+        result["duplicates"] += len(duplicates)
+        rows = []
+        for index, (position, row, categorized) in enumerate(batch):
+            if skip_duplicates and index in duplicates:
+                skip(position, f"duplicate of transaction {duplicates[index][0]}")
+                continue
+            rows.append(row)
+            result["categorized"] += categorized
+        
+        if rows:
+            insert_transaction_batch(db, rows)
+            result["imported"] += len(rows)
+            result["batches"] += 1
+    
+    stream = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+    now = datetime.utcnow()
+    batch = []
+    
+    for position, raw_date, raw_amount, description in _PARSERS[file_format](stream):
+        try:
+            txn_date = _parse_date(raw_date)
+            cents = _parse_cents(raw_amount)
+        except ValueError as e:
+            skip(position, str(e))
+            continue
+        
+        amount_cents = -cents if negative_is_spending else cents
+        if amount_cents <= 0:
+            skip(position, "not spending")
+            continue
+        
+        budget_id = budgets.get((txn_date.year, txn_date.month))
+        if budget_id is None:
+            skip(position, f"no budget for {txn_date.month}/{txn_date.year}")
+            continue
+        
+        name = match(description)
+        category_id = categories.get((budget_id, name.lower())) if name else None
+        categorized = category_id is not None
+        if not categorized:
+            category_id = fallback_category_id(budget_id)
+        
+        batch.append((position, {
+            "user_id": user_id,
+            "budget_id": budget_id,
+            "category_id": category_id,
+            "amount_cents": amount_cents,
+            "date": txn_date,
+            "notes": description or None,
+            "is_split": False,
+            "fingerprint": transaction_fingerprint(amount_cents, description),
+            "merchant": merchant_key(description or None),
+            "created_at": now,
+            "updated_at": now
+        }, categorized))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    
+    if batch:
+        flush(batch)
+    
+    stream.detach()
+    if result["imported"]:
+        refresh_dashboard_sections(db, user_id, "budget", "transactions")
+    db.commit()
+    return result
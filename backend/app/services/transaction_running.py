@@ -0,0 +1,100 @@
+"""Cumulative spend of a budget's categories over its days, for spend-against-allocation charts.
+
+The database sums each day and runs the cumulative sums with a window
+function, so only one row per category and active day leaves it. Split
+transactions count in the categories they are split into.
+"""
+from typing import Optional
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import Session
+from app.models.budget import Budget
+from app.models.transaction import Transaction, TransactionSplit
+
+
+def _entries(budget_id: int, source, split_source):
+    """(category_id, date, amount_cents) of every spend in the budget, splits expanded"""
+    regular = select(
+        source.category_id.label("category_id"), source.date.label("date"), source.amount_cents.label("amount_cents")
+    ).where(
+        source.budget_id == budget_id,
+        source.is_split == False,
+        source.category_id.isnot(None)
+    )
+    split = select(
+        split_source.category_id, source.date, split_source.amount_cents
+    ).join(
+        source, split_source.transaction_id == source.id
+    ).where(
+        source.budget_id == budget_id
+    )
+    return union_all(regular, split).subquery("entries")
+
+
+def running_spend(
+    db: Session,
+    budget: Budget,
+    by_category: bool = True,
+    category_id: Optional[int] = None,
+    source=Transaction,
+    split_source=TransactionSplit
+) -> dict:
+    """Dates with spending plus, per series, the cumulative cents spent by each of those dates.
+    
+    With `by_category` there is one series per active category (or just
+    `category_id`), otherwise a single series for the whole budget (or just
+    `category_id`, so its spend lines up with its allocation).
+    """
+    categories = [
+        category for category in budget.categories
+        if category.is_active and (category_id is None or category.id == category_id)
+    ]
+    entries = _entries(budget.id, source, split_source)
+    
+    if by_category:
+        daily = select(
+            entries.c.category_id, entries.c.date, func.sum(entries.c.amount_cents).label("day_cents")
+        ).where(
+            entries.c.category_id.in_([category.id for category in categories])
+        ).group_by(entries.c.category_id, entries.c.date).subquery("daily")
+        keys = [daily.c.category_id]
+    else:
+        daily = select(
+            entries.c.date, func.sum(entries.c.amount_cents).label("day_cents")
+        )
+        if category_id is not None:
+            daily = daily.where(entries.c.category_id == category_id)
+        daily = daily.group_by(entries.c.date).subquery("daily")
+        keys = []
+    
+    cumulative = func.sum(daily.c.day_cents).over(partition_by=keys or None, order_by=daily.c.date)
+    rows = db.execute(select(*keys, daily.c.date, cumulative.label("cumulative_cents")).order_by(daily.c.date)).all()
+    
+    dates = sorted({row.date for row in rows})
+    position = {day: index for index, day in enumerate(dates)}
+    
+    if by_category:
+        series = [_series(category.id, category.name, category.allocated_cents, len(dates)) for category in categories]
+    else:
+        series = [_series(None, None, sum(category.allocated_cents for category in categories), len(dates))]
+    by_key = {entry["category_id"]: entry for entry in series}
+    for row in rows:
+        entry = by_key[row.category_id] if by_category else series[0]
+        entry["cumulative_cents"][position[row.date]] = row.cumulative_cents
+    
+    # Days without spending in a series repeat its previous total
+    for entry in series:
+        values = entry["cumulative_cents"]
+        for index in range(len(values)):
+            if values[index] is None:
+                values[index] = values[index - 1] if index else 0
+    
+    return {"budget_id": budget.id, "dates": dates, "series": series}
+
+
+def _series(category_id: Optional[int], category_name: Optional[str], allocated_cents: int, size: int) -> dict:
+    return {
+        "category_id": category_id,
+        "category_name": category_name,
+        "allocated_cents": allocated_cents,
+        "cumulative_cents": [None] * size
+    }
@@ -0,0 +1,37 @@
+"""Full-text search over transaction notes; the index itself is in app.models.transaction_search"""
+import re
+from typing import List, Tuple
+from sqlalchemy import column, func, literal_column, table
+from sqlalchemy.orm import Query, Session
+from app.models.transaction import Transaction
+
+MAX_SEARCH_TERMS = 8
+
+_WORD = re.compile(r"\w+")
+
+
+def search_terms(q: str) -> List[str]:
+    """Words of a search box entry; punctuation is dropped so it can't reach the query syntax"""
+    return _WORD.findall(q.lower())[:MAX_SEARCH_TERMS]
+
+
+def apply_search(db: Session, query: Query, terms: List[str]) -> Tuple[Query, object]:
+    """Restrict a Transaction query to notes matching every term as a prefix.
+    
+    Returns the query and the ordering that puts the best matches first.
+    """
+    if db.get_bind().dialect.name == 'postgresql':
+        search = table("transaction_search", column("transaction_id"), column("document"))
+        tsquery = func.to_tsquery('simple', " & ".join(f"{term}:*" for term in terms))
+        query = query.join(search, search.c.transaction_id == Transaction.id).filter(
+            search.c.document.op("@@")(tsquery)
+        )
+        return query, func.ts_rank(search.c.document, tsquery).desc()
+    
+    search = table("transaction_search", column("rowid"), column("rank"))
+    match = " ".join(f'"{term}"*' for term in terms)
+    query = query.join(search, search.c.rowid == Transaction.id).filter(
+        literal_column("transaction_search").op("MATCH")(match)
+    )
+    # FTS5 rank is bm25, where lower means more relevant
+    return query, search.c.rank
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Move transactions of closed periods into the archive tables.
+Everything dated before the first day of the month ARCHIVE_AFTER_MONTHS ago
+is archived; run it from a scheduler once a month.
+
+    python archive_transactions.py                  # archive up to the configured cutoff
+    python archive_transactions.py --before 2024-01-01
+    python archive_transactions.py --user 12
+"""
+import argparse
+import sys
+from datetime import date
+from app.core.database import SessionLocal
+from app.models.financial_goal import FinancialGoal  # noqa: F401 - User.financial_goals needs it mapped
+from app.services.category_spend import verify_category_spend
+from app.services.transaction_archive import archive_cutoff, archive_transactions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move transactions of closed periods into the archive tables")
+    parser.add_argument("--before", type=date.fromisoformat, help="archive transactions dated before this day (YYYY-MM-DD)")
+    parser.add_argument("--user", type=int, help="limit to one user id")
+    args = parser.parse_args(argv)
+    
+    before = args.before or archive_cutoff()
+    if before > archive_cutoff():
+        parser.error(f"--before must not be later than {archive_cutoff()}; newer periods are still open")
+    
+    db = SessionLocal()
+    try:
+        result = archive_transactions(db, before=before, user_id=args.user)
+        print(f"✓ Archived {result['transactions']} transactions and {result['splits']} splits "
+              f"of {result['users']} users dated before {before}")
+        
+        if verify_category_spend(db):
+            print("✗ Category totals no longer match; run rebuild_category_spend.py --verify")
+            return 1
+        print("✓ Category totals still match")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Migration script to add indexes used by category name search
+Works on both SQLite and PostgreSQL; the trigram index is PostgreSQL only
+"""
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+
+def migrate():
+    engine = create_engine(settings.DATABASE_URL)
+    
+    with engine.connect() as conn:
+        if engine.dialect.name == 'postgresql':
+            # Contains and fuzzy search use pg_trgm
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_budget_category_name_trgm
+                ON budget_categories USING gin (name gin_trgm_ops)
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_budget_category_budget_lower_name
+                ON budget_categories(budget_id, lower(name) text_pattern_ops)
+            """))
+        else:
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_budget_category_budget_lower_name
+                ON budget_categories(budget_id, lower(name))
+            """))
+        
+        conn.commit()
+        print("✓ Category search indexes created successfully!")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the maintained spent_cents and transaction_count
+columns to budget_categories, then backfill them from transactions
+Works on both SQLite and PostgreSQL
+"""
+import os
+import sys
+from sqlalchemy import create_engine, text, inspect
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+
+def migrate():
+    """Add and backfill budget_categories.spent_cents and transaction_count"""
+    engine = create_engine(settings.DATABASE_URL)
+    columns = [col['name'] for col in inspect(engine).get_columns('budget_categories')]
+    
+    with engine.connect() as conn:
+        for column in ('spent_cents', 'transaction_count'):
+            if column in columns:
+                print(f"✓ Column {column} already exists")
+                continue
+            conn.execute(text(f"""
+                ALTER TABLE budget_categories ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0
+            """))
+            print(f"✓ Added column {column}")
+        
+        conn.commit()
+    
+    # Backfill with the same code the rebuild command uses
+    from rebuild_category_spend import main as rebuild
+    rebuild([])
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the version column to dashboard_state
+Works on both SQLite and PostgreSQL; safe to re-run
+"""
+import os
+import sys
+from sqlalchemy import create_engine, text, inspect
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+
+def migrate():
+    """Add dashboard_state.version, which writes bump so rebuilds can detect them"""
+    engine = create_engine(settings.DATABASE_URL)
+    inspector = inspect(engine)
+    if 'dashboard_state' not in inspector.get_table_names():
+        print("✓ dashboard_state does not exist yet; rebuild_dashboard_state.py creates it with the column")
+        return
+    columns = [col['name'] for col in inspector.get_columns('dashboard_state')]
+    
+    with engine.connect() as conn:
+        if 'version' in columns:
+            print("✓ Column version already exists")
+        else:
+            conn.execute(text("ALTER TABLE dashboard_state ADD COLUMN version INTEGER NOT NULL DEFAULT 0"))
+            conn.commit()
+            print("✓ Added column version")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Migration script to move invoice PDFs rendered before sharded storage into it
+Works on both SQLite and PostgreSQL and either storage backend; safe to re-run
+
+invoices.pdf_path used to hold a file path relative to the backend directory:
+storage/pdfs/invoice_<id>.pdf at first, then storage/pdfs/<sha256>.pdf. Content
+hashed files move to their shard key; per-invoice files are dropped and
+rendered again on the next download. Orphaned legacy files that no invoice
+points at are left to trim_pdf_storage.py.
+"""
+import os
+import re
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import SessionLocal
+from app.models.financial_goal import FinancialGoal  # noqa: F401 - User.financial_goals needs it mapped
+from app.models.invoice import Invoice
+from app.services.storage import SHARD_KEY_PATTERN, get_pdf_storage, shard_key
+
+CONTENT_HASH_FILE = re.compile(r"^([0-9a-f]{64})\.pdf$")
+
+def migrate():
+    """Point every invoice at a storage key (or nothing), then delete the legacy files"""
+    storage = get_pdf_storage()
+    db = SessionLocal()
+    legacy_paths = set()
+    moved = cleared = 0
+    try:
+        for invoice in db.query(Invoice).filter(Invoice.pdf_path.isnot(None)):
+            path = invoice.pdf_path
+            if SHARD_KEY_PATTERN.match(path):
+                continue
+            legacy_paths.add(path)
+            match = CONTENT_HASH_FILE.match(os.path.basename(path))
+            if match and os.path.isfile(path):
+                key = shard_key(match.group(1))
+                if not storage.exists(key):
+                    with open(path, "rb") as legacy_file:
+                        storage.save(key, legacy_file.read())
+                invoice.pdf_path = key
+                moved += 1
+            else:
+                invoice.pdf_path = None
+                cleared += 1
+        db.commit()
+    finally:
+        db.close()
+
+    # Only after the commit, so an interrupted run never leaves a row pointing at a deleted file
+    for path in legacy_paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    print(f"✓ {moved} content-hashed PDFs moved to sharded keys")
+    print(f"✓ {cleared} per-invoice PDFs dropped; they render again on the next download")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Migration script to create the tables caching detected recurring charges
+Works on both SQLite and PostgreSQL; safe to re-run
+"""
+import os
+import sys
+from sqlalchemy import create_engine
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models import User  # noqa: F401 - referenced by the foreign keys
+from app.models.recurring_charge import RecurringCharge, RecurringScan
+
+TABLES = [RecurringCharge.__table__, RecurringScan.__table__]
+
+def migrate():
+    """Create recurring_charges and recurring_scans; both fill on the first request per user"""
+    engine = create_engine(settings.DATABASE_URL)
+    Base.metadata.create_all(engine, tables=TABLES)
+    for table in TABLES:
+        print(f"✓ Table {table.name} and its indexes exist")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Migration script to create the transaction archive tables used by
+archive_transactions.py
+Works on both SQLite and PostgreSQL; safe to re-run
+"""
+import os
+import sys
+from sqlalchemy import create_engine
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models import User, Budget, BudgetCategory  # noqa: F401 - referenced by the archive foreign keys
+from app.models.transaction_archive import ArchivedCategoryMonth, ArchivedTransaction, ArchivedTransactionSplit
+
+TABLES = [ArchivedTransaction.__table__, ArchivedTransactionSplit.__table__, ArchivedCategoryMonth.__table__]
+
+def migrate():
+    """Create transactions_archive, transaction_splits_archive and archived_category_months"""
+    engine = create_engine(settings.DATABASE_URL)
+    Base.metadata.create_all(engine, tables=TABLES)
+    for table in TABLES:
+        print(f"✓ Table {table.name} and its indexes exist")
+
+if __name__ == "__main__":
+    migrate()
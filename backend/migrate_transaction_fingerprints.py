@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the duplicate-detection fingerprint to transactions,
+then backfill it for existing rows
+Works on both SQLite and PostgreSQL; safe to re-run
+"""
+import os
+import sys
+from sqlalchemy import bindparam, create_engine, text, inspect
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.services.transaction_duplicates import transaction_fingerprint
+
+BATCH_SIZE = 5000
+
+def migrate():
+    """Add, index and backfill transactions.fingerprint"""
+    engine = create_engine(settings.DATABASE_URL)
+    columns = [col['name'] for col in inspect(engine).get_columns('transactions')]
+    
+    with engine.connect() as conn:
+        if 'fingerprint' in columns:
+            print("✓ Column fingerprint already exists")
+        else:
+            conn.execute(text("ALTER TABLE transactions ADD COLUMN fingerprint VARCHAR(32)"))
+            print("✓ Added column fingerprint")
+        
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_transaction_user_fingerprint
+            ON transactions(user_id, fingerprint, date)
+        """))
+        print("✓ Created index idx_transaction_user_fingerprint")
+        conn.commit()
+        
+        # The notes are normalized in Python, so the backfill runs here rather than in SQL
+        update = text("UPDATE transactions SET fingerprint = :fingerprint WHERE id = :transaction_id").bindparams(
+            bindparam("fingerprint"), bindparam("transaction_id")
+        )
+        backfilled = 0
+        while True:
+            rows = conn.execute(text("""
+                SELECT id, amount_cents, notes FROM transactions
+                WHERE fingerprint IS NULL ORDER BY id LIMIT :limit
+            """), {"limit": BATCH_SIZE}).fetchall()
+            if not rows:
+                break
+            conn.execute(update, [
+                {"fingerprint": transaction_fingerprint(amount_cents, notes), "transaction_id": transaction_id}
+                for transaction_id, amount_cents, notes in rows
+            ])
+            conn.commit()
+            backfilled += len(rows)
+        print(f"✓ Backfilled {backfilled} fingerprints")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Migration script to add indexes for the transaction access paths
+Works on both SQLite and PostgreSQL
+"""
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+
+INDEXES = [
+    # Lists, exports, trends and the dashboard filter a user's transactions by date
+    ("idx_transaction_user_date", "transactions(user_id, date)"),
+    # Budget summaries and the comparison report filter one budget's transactions by date
+    ("idx_transaction_budget_date", "transactions(budget_id, date)"),
+    # Category spend totals and the category report
+    ("idx_transaction_category_split", "transactions(category_id, is_split)"),
+    # Loading a transaction's splits, and split spend per category
+    ("idx_transaction_splits_transaction_id", "transaction_splits(transaction_id)"),
+    ("idx_transaction_splits_category_id", "transaction_splits(category_id)"),
+]
+
+def migrate():
+    engine = create_engine(settings.DATABASE_URL)
+    
+    with engine.connect() as conn:
+        for name, target in INDEXES:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {target}"))
+            print(f"✓ {name}")
+        
+        # Refresh planner statistics so the new indexes are picked up straight away
+        conn.execute(text("ANALYZE transactions"))
+        conn.execute(text("ANALYZE transaction_splits"))
+        
+        conn.commit()
+        print("✓ Transaction indexes created successfully!")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the recurring-charge merchant key to transactions and
+transactions_archive, then backfill it for existing rows
+Works on both SQLite and PostgreSQL; safe to re-run
+"""
+import os
+import sys
+from sqlalchemy import bindparam, create_engine, text, inspect
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.services.recurring_charges import merchant_key
+
+BATCH_SIZE = 5000
+TABLES = {
+    "transactions": "idx_transaction_user_merchant",
+    "transactions_archive": "idx_transactions_archive_user_merchant",
+}
+
+def migrate():
+    """Add, index and backfill the merchant column of both transaction tables"""
+    engine = create_engine(settings.DATABASE_URL)
+    existing = inspect(engine).get_table_names()
+    
+    with engine.connect() as conn:
+        for table, index in TABLES.items():
+            if table not in existing:
+                print(f"✓ Table {table} doesn't exist yet; it is created with the column")
+                continue
+            
+            columns = [col['name'] for col in inspect(engine).get_columns(table)]
+            if 'merchant' in columns:
+                print(f"✓ Column {table}.merchant already exists")
+            else:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN merchant VARCHAR"))
+                print(f"✓ Added column {table}.merchant")
+            
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index} ON {table}(user_id, merchant)"))
+            print(f"✓ Created index {index}")
+            conn.commit()
+            
+            # The notes are normalized in Python, so the backfill runs here rather than in SQL
+            update = text(f"UPDATE {table} SET merchant = :merchant WHERE id = :transaction_id").bindparams(
+                bindparam("merchant"), bindparam("transaction_id")
+            )
+            backfilled = 0
+            while True:
+                rows = conn.execute(text(f"""
+                    SELECT id, notes FROM {table}
+                    WHERE merchant IS NULL ORDER BY id LIMIT :limit
+                """), {"limit": BATCH_SIZE}).fetchall()
+                if not rows:
+                    break
+                conn.execute(update, [
+                    {"merchant": merchant_key(notes), "transaction_id": transaction_id}
+                    for transaction_id, notes in rows
+                ])
+                conn.commit()
+                backfilled += len(rows)
+            print(f"✓ Backfilled {backfilled} merchants in {table}")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Migration script to add full-text search over transaction notes
+Works on both SQLite (FTS5) and PostgreSQL (tsvector); safe to re-run
+"""
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+from app.models.transaction_search import (
+    POSTGRES_BACKFILL, POSTGRES_STATEMENTS, SQLITE_BACKFILL, SQLITE_STATEMENTS
+)
+
+def migrate():
+    engine = create_engine(settings.DATABASE_URL)
+    
+    if engine.dialect.name == 'postgresql':
+        statements, backfill = POSTGRES_STATEMENTS, POSTGRES_BACKFILL
+    else:
+        statements, backfill = SQLITE_STATEMENTS, SQLITE_BACKFILL
+    
+    with engine.connect() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+        print("✓ Search index and sync triggers created")
+        
+        # Index the transactions written before the triggers existed
+        conn.execute(text(backfill))
+        print("✓ Existing transactions indexed")
+        
+        conn.commit()
+        print("✓ Transaction search migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Verify or rebuild budget_categories.spent_cents and transaction_count.
+
+    python rebuild_category_spend.py            # recompute every category
+    python rebuild_category_spend.py --verify   # report drift only, exit 1 if any
+    python rebuild_category_spend.py --budget 12
+"""
+import argparse
+import sys
+from app.core.database import SessionLocal
+from app.models.financial_goal import FinancialGoal  # noqa: F401 - User.financial_goals needs it mapped
+from app.services.category_spend import rebuild_category_spend, verify_category_spend
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--verify", action="store_true", help="only report categories that have drifted")
+    parser.add_argument("--budget", type=int, help="limit to one budget id")
+    args = parser.parse_args(argv)
+    
+    db = SessionLocal()
+    try:
+        if args.verify:
+            mismatches = verify_category_spend(db, budget_id=args.budget)
+            for row in mismatches:
+                print(
+                    f"✗ Category {row['id']} (budget {row['budget_id']}): "
+                    f"spent {row['spent_cents']} vs {row['actual_spent_cents']}, "
+                    f"count {row['transaction_count']} vs {row['actual_transaction_count']}"
+                )
+            if mismatches:
+                print(f"{len(mismatches)} categories out of date; run without --verify to rebuild")
+                return 1
+            print("✓ All category totals match their transactions")
+            return 0
+        
+        count = rebuild_category_spend(db, budget_id=args.budget)
+        print(f"✓ Rebuilt spent totals for {count} categories")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Rebuild the dashboard_state rows for every user.
+Rows are also rebuilt lazily on the first dashboard read of each day; run this
+after bulk imports or direct database edits that bypass the API.
+"""
+from app.core.database import SessionLocal, engine
+from app.models.user import User
+from app.models.dashboard_state import DashboardState
+from app.services.dashboard_state import rebuild_dashboard_state
+
+def main():
+    DashboardState.__table__.create(bind=engine, checkfirst=True)
+    
+    db = SessionLocal()
+    try:
+        user_ids = [user_id for (user_id,) in db.query(User.id).all()]
+        for user_id in user_ids:
+            rebuild_dashboard_state(db, user_id)
+        db.commit()
+        print(f"✓ Rebuilt dashboard state for {len(user_ids)} users")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Rebuild the revenue_by_month and revenue_by_customer rollup tables from payments.
+Run once after deploying the rollups (backfill), or any time they need to be verified.
+"""
+from app.core.database import SessionLocal, engine
+from app.models import financial_goal  # noqa: F401 - registers the User.financial_goals target
+from app.models.revenue_rollup import RevenueByMonth, RevenueByCustomer
+from app.services.revenue_rollup import rebuild_revenue_rollups
+
+def main():
+    RevenueByMonth.__table__.create(bind=engine, checkfirst=True)
+    RevenueByCustomer.__table__.create(bind=engine, checkfirst=True)
+    
+    db = SessionLocal()
+    try:
+        months, customers = rebuild_revenue_rollups(db)
+        print(f"✓ Rebuilt revenue rollups: {months} months, {customers} customers")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
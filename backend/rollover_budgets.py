@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Roll every user's budget for last month into this month.
+Users who already have a budget for this month are skipped; run it from a
+scheduler on the first of the month.
+
+    python rollover_budgets.py               # copy allocations as they are
+    python rollover_budgets.py --carry-over  # add unspent balances to the new allocations
+"""
+import argparse
+from datetime import date
+from sqlalchemy import and_
+from sqlalchemy.orm import aliased
+from app.core.database import SessionLocal
+from app.models.budget import Budget
+from app.services.budget_rollover import clone_to_next_period
+from app.services.dashboard_state import refresh_dashboard_sections
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Roll last month's budgets into this month")
+    parser.add_argument("--carry-over", action="store_true", help="add each category's unspent balance to its new allocation")
+    args = parser.parse_args(argv)
+    
+    today = date.today()
+    month, year = (12, today.year - 1) if today.month == 1 else (today.month - 1, today.year)
+    
+    db = SessionLocal()
+    try:
+        current = aliased(Budget)
+        budgets = db.query(Budget).outerjoin(current, and_(
+            current.user_id == Budget.user_id,
+            current.month == today.month,
+            current.year == today.year
+        )).filter(
+            Budget.month == month,
+            Budget.year == year,
+            current.id.is_(None)
+        ).all()
+        
+        for budget in budgets:
+            clone_to_next_period(db, budget, carry_over=args.carry_over)
+            refresh_dashboard_sections(db, budget.user_id, "budget")
+            db.commit()
+        
+        print(f"✓ Rolled {len(budgets)} budgets into {today.month}/{today.year}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from app.core.database import SessionLocal, engine, Base
 from app.core.security import get_password_hash
 from app.models import User, Customer, Invoice, InvoiceItem, Payment, Settings
 from app.models.invoice import InvoiceStatus
+from app.services.revenue_rollup import rebuild_revenue_rollups
 
 def seed_database():
     print("Creating database tables...")
@@ -173,6 +174,7 @@ def seed_database():
         settings.last_sequence = 4
         
         db.commit()
+        rebuild_revenue_rollups(db)
         print("✓ Dummy data seeded successfully!")
         print("\n3 customers and 4 sample invoices created")
         print("Register your account at /auth/register to get started")
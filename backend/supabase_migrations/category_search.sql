@@ -0,0 +1,11 @@
+-- Migration: Indexes for category name search
+-- Description: Trigram index for contains and typo-tolerant (fuzzy) search,
+-- and a per-budget lower(name) index for as-you-type prefix search
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_budget_category_name_trgm
+ON budget_categories USING gin (name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_budget_category_budget_lower_name
+ON budget_categories(budget_id, lower(name) text_pattern_ops);
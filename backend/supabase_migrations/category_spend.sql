@@ -0,0 +1,23 @@
+-- Migration: Maintained spent totals per budget category
+-- Description: spent_cents and transaction_count are kept current by the
+-- transactions API; readers no longer scan transactions and splits
+
+ALTER TABLE budget_categories ADD COLUMN IF NOT EXISTS spent_cents INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE budget_categories ADD COLUMN IF NOT EXISTS transaction_count INTEGER NOT NULL DEFAULT 0;
+
+-- Backfill from existing transactions and splits
+UPDATE budget_categories c
+SET spent_cents = COALESCE((
+        SELECT SUM(t.amount_cents) FROM transactions t
+        WHERE t.category_id = c.id AND t.is_split = false
+    ), 0) + COALESCE((
+        SELECT SUM(s.amount_cents) FROM transaction_splits s
+        WHERE s.category_id = c.id
+    ), 0),
+    transaction_count = (
+        SELECT COUNT(*) FROM transactions t
+        WHERE t.category_id = c.id AND t.is_split = false
+    ) + (
+        SELECT COUNT(*) FROM transaction_splits s
+        WHERE s.category_id = c.id
+    );
@@ -0,0 +1,34 @@
+-- Migration: Materialized dashboard state
+-- Description: One row per user holding the /api/metrics/dashboard figures,
+-- kept current by the write endpoints. Rows are (re)built on first read each
+-- day, so no backfill is needed.
+
+CREATE TABLE IF NOT EXISTS dashboard_state (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    as_of DATE NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    budget_id INTEGER,
+    budget_income_cents INTEGER NOT NULL DEFAULT 0,
+    budget_allocated_cents INTEGER NOT NULL DEFAULT 0,
+    budget_spent_cents INTEGER NOT NULL DEFAULT 0,
+    transaction_count_month INTEGER NOT NULL DEFAULT 0,
+    sinking_fund_count INTEGER NOT NULL DEFAULT 0,
+    sinking_total_goal_cents INTEGER NOT NULL DEFAULT 0,
+    sinking_total_saved_cents INTEGER NOT NULL DEFAULT 0,
+    sinking_funds JSON NOT NULL DEFAULT '[]',
+    total_assets_cents INTEGER NOT NULL DEFAULT 0,
+    asset_count INTEGER NOT NULL DEFAULT 0,
+    total_liabilities_cents INTEGER NOT NULL DEFAULT 0,
+    liability_count INTEGER NOT NULL DEFAULT 0,
+    goal_count INTEGER NOT NULL DEFAULT 0,
+    goal_active_count INTEGER NOT NULL DEFAULT 0,
+    goal_completed_count INTEGER NOT NULL DEFAULT 0,
+    goal_target_cents INTEGER NOT NULL DEFAULT 0,
+    goal_saved_cents INTEGER NOT NULL DEFAULT 0,
+    paycheck_upcoming_count INTEGER NOT NULL DEFAULT 0,
+    next_paycheck JSON,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tables created before the version column
+ALTER TABLE dashboard_state ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
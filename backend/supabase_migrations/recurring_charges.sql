@@ -0,0 +1,32 @@
+-- Migration: Recurring charge detection cache
+-- Description: Subscriptions and bills found in each user's transactions by
+-- GET /api/transactions/recurring, plus the watermark of the transactions
+-- they were computed from. Rows fill on each user's first request, so no
+-- backfill is needed.
+
+CREATE TABLE IF NOT EXISTS recurring_charges (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    merchant VARCHAR NOT NULL,
+    notes VARCHAR,
+    category_id INTEGER,
+    cadence VARCHAR(16) NOT NULL,
+    occurrences INTEGER NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    average_amount_cents INTEGER NOT NULL,
+    amount_variation DOUBLE PRECISION NOT NULL,
+    first_date DATE NOT NULL,
+    last_date DATE NOT NULL,
+    next_date DATE NOT NULL,
+    last_transaction_id INTEGER NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_recurring_charges_user_merchant ON recurring_charges(user_id, merchant);
+
+CREATE TABLE IF NOT EXISTS recurring_scans (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    transaction_count INTEGER NOT NULL,
+    last_transaction_id INTEGER NOT NULL,
+    last_updated_at TIMESTAMP,
+    scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,38 @@
+-- Migration: Revenue rollup tables for the metrics summary
+-- Description: Pre-aggregated payment totals, kept current by record_payment
+
+CREATE TABLE IF NOT EXISTS revenue_by_month (
+    month VARCHAR(7) PRIMARY KEY,  -- YYYY-MM
+    revenue_cents INTEGER NOT NULL DEFAULT 0,
+    payment_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS revenue_by_customer (
+    customer_id INTEGER PRIMARY KEY REFERENCES customers(id) ON DELETE CASCADE,
+    total_paid_cents INTEGER NOT NULL DEFAULT 0,
+    payment_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_revenue_by_customer_total
+ON revenue_by_customer(total_paid_cents);
+
+-- Backfill from existing payments
+INSERT INTO revenue_by_month (month, revenue_cents, payment_count)
+SELECT to_char(paid_at, 'YYYY-MM'), SUM(amount_cents), COUNT(*)
+FROM payments
+GROUP BY to_char(paid_at, 'YYYY-MM')
+ON CONFLICT (month) DO UPDATE
+SET revenue_cents = EXCLUDED.revenue_cents, payment_count = EXCLUDED.payment_count;
+
+INSERT INTO revenue_by_customer (customer_id, total_paid_cents, payment_count)
+SELECT i.customer_id, SUM(p.amount_cents), COUNT(*)
+FROM payments p
+JOIN invoices i ON i.id = p.invoice_id
+GROUP BY i.customer_id
+ON CONFLICT (customer_id) DO UPDATE
+SET total_paid_cents = EXCLUDED.total_paid_cents, payment_count = EXCLUDED.payment_count;
+
+-- The summary no longer reads payments by paid_at, so the range index is unused
+DROP INDEX IF EXISTS idx_payment_paid_at;
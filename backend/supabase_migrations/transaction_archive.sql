@@ -0,0 +1,45 @@
+-- Migration: Cold storage for transactions of closed periods
+-- Description: archive_transactions.py moves transactions older than
+-- ARCHIVE_AFTER_MONTHS (and their splits) here, keeping their ids, and adds
+-- their per-category monthly totals to archived_category_months so
+-- budget_categories.spent_cents and transaction_count still add up
+
+CREATE TABLE IF NOT EXISTS transactions_archive (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    budget_id INTEGER NOT NULL REFERENCES budgets(id),
+    category_id INTEGER REFERENCES budget_categories(id),
+    amount_cents INTEGER NOT NULL,
+    date DATE NOT NULL,
+    notes VARCHAR,
+    is_split BOOLEAN NOT NULL DEFAULT FALSE,
+    fingerprint VARCHAR(32),
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_archive_user_date ON transactions_archive(user_id, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_archive_budget_date ON transactions_archive(budget_id, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_archive_category_split ON transactions_archive(category_id, is_split);
+
+CREATE TABLE IF NOT EXISTS transaction_splits_archive (
+    id INTEGER PRIMARY KEY,
+    transaction_id INTEGER NOT NULL REFERENCES transactions_archive(id),
+    category_id INTEGER NOT NULL REFERENCES budget_categories(id),
+    amount_cents INTEGER NOT NULL,
+    notes VARCHAR,
+    created_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_transaction_splits_archive_transaction_id ON transaction_splits_archive(transaction_id);
+CREATE INDEX IF NOT EXISTS idx_transaction_splits_archive_category_id ON transaction_splits_archive(category_id);
+
+CREATE TABLE IF NOT EXISTS archived_category_months (
+    category_id INTEGER NOT NULL REFERENCES budget_categories(id),
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    spent_cents INTEGER NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (category_id, year, month)
+);
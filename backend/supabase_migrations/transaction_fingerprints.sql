@@ -0,0 +1,10 @@
+-- Migration: Duplicate-detection fingerprint on transactions
+-- Description: A hash of the amount and normalized notes, looked up by user
+-- and date range to spot duplicate and near-duplicate transactions
+-- The notes are normalized in Python: run migrate_transaction_fingerprints.py
+-- afterwards to backfill existing rows
+
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(32);
+
+CREATE INDEX IF NOT EXISTS idx_transaction_user_fingerprint
+ON transactions(user_id, fingerprint, date);
@@ -0,0 +1,22 @@
+-- Migration: Indexes for the transaction access paths
+-- Description: Reports, exports, lists and category spend filter transactions
+-- by user and date, budget and date, or category; splits are loaded by
+-- transaction and totalled by category
+
+CREATE INDEX IF NOT EXISTS idx_transaction_user_date
+ON transactions(user_id, date);
+
+CREATE INDEX IF NOT EXISTS idx_transaction_budget_date
+ON transactions(budget_id, date);
+
+CREATE INDEX IF NOT EXISTS idx_transaction_category_split
+ON transactions(category_id, is_split);
+
+CREATE INDEX IF NOT EXISTS idx_transaction_splits_transaction_id
+ON transaction_splits(transaction_id);
+
+CREATE INDEX IF NOT EXISTS idx_transaction_splits_category_id
+ON transaction_splits(category_id);
+
+ANALYZE transactions;
+ANALYZE transaction_splits;
@@ -0,0 +1,15 @@
+-- Migration: Recurring-charge merchant key on transactions
+-- Description: Notes normalized into a merchant, looked up by user so a
+-- refresh of the recurring charges loads only the merchants of new transactions
+-- The notes are normalized in Python: run migrate_transaction_merchants.py
+-- afterwards to backfill existing rows
+
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS merchant VARCHAR;
+
+CREATE INDEX IF NOT EXISTS idx_transaction_user_merchant
+ON transactions(user_id, merchant);
+
+ALTER TABLE transactions_archive ADD COLUMN IF NOT EXISTS merchant VARCHAR;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_archive_user_merchant
+ON transactions_archive(user_id, merchant);
@@ -0,0 +1,47 @@
+-- Migration: Full-text search over transaction notes
+-- Description: One tsvector per transaction (its notes plus its splits' notes),
+-- kept in sync by triggers and searched by list_transactions' q parameter
+
+CREATE TABLE IF NOT EXISTS transaction_search (
+    transaction_id INTEGER PRIMARY KEY REFERENCES transactions(id) ON DELETE CASCADE,
+    document TSVECTOR NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_transaction_search_document ON transaction_search USING gin (document);
+
+CREATE OR REPLACE FUNCTION refresh_transaction_search(target_id INTEGER) RETURNS VOID AS $$
+    INSERT INTO transaction_search (transaction_id, document)
+    SELECT t.id, to_tsvector('simple', coalesce(t.notes, '') || ' ' || coalesce(
+        (SELECT string_agg(s.notes, ' ') FROM transaction_splits s WHERE s.transaction_id = t.id), ''))
+    FROM transactions t WHERE t.id = target_id
+    ON CONFLICT (transaction_id) DO UPDATE SET document = EXCLUDED.document;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION transaction_search_sync() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'transactions' THEN
+        PERFORM refresh_transaction_search(NEW.id);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM refresh_transaction_search(OLD.transaction_id);
+    ELSE
+        PERFORM refresh_transaction_search(NEW.transaction_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS transaction_search_sync ON transactions;
+
+CREATE TRIGGER transaction_search_sync AFTER INSERT OR UPDATE OF notes ON transactions
+FOR EACH ROW EXECUTE FUNCTION transaction_search_sync();
+
+DROP TRIGGER IF EXISTS transaction_search_split_sync ON transaction_splits;
+
+CREATE TRIGGER transaction_search_split_sync AFTER INSERT OR UPDATE OF notes OR DELETE ON transaction_splits
+FOR EACH ROW EXECUTE FUNCTION transaction_search_sync();
+
+INSERT INTO transaction_search (transaction_id, document)
+SELECT t.id, to_tsvector('simple', coalesce(t.notes, '') || ' ' || coalesce(
+    (SELECT string_agg(s.notes, ' ') FROM transaction_splits s WHERE s.transaction_id = t.id), ''))
+FROM transactions t
+ON CONFLICT (transaction_id) DO UPDATE SET document = EXCLUDED.document;
@@ -5,6 +5,8 @@ Run with: python test_api.py
 
 import requests
 import json
+import io
+import zipfile
 from datetime import date, timedelta
 
 BASE_URL = "http://localhost:8000"
@@ -92,14 +94,36 @@ def test_full_flow():
     assert response.status_code == 200
     print("   ✓ Payment recorded\n")
     
-    # 8. Get metrics
-    print("8. Fetching metrics...")
+    # 8. Re-download PDF (cache must be invalidated by the payment)
+    print("8. Re-downloading PDF after payment...")
+    pdf_path_before = requests.get(f"{BASE_URL}/api/invoices/{invoice_id}", headers=headers).json()["pdf_path"]
+    response = requests.get(f"{BASE_URL}/api/invoices/{invoice_id}/pdf", headers=headers)
+    assert response.status_code == 200
+    pdf_path_after = requests.get(f"{BASE_URL}/api/invoices/{invoice_id}", headers=headers).json()["pdf_path"]
+    assert pdf_path_after != pdf_path_before, "PDF was not re-rendered after payment"
+    print("   ✓ Stale PDF replaced\n")
+    
+    # 9. Get metrics
+    print("9. Fetching metrics...")
     response = requests.get(f"{BASE_URL}/api/metrics/summary", headers=headers)
     assert response.status_code == 200
     metrics = response.json()
     print(f"   ✓ Outstanding: ${metrics['outstanding_total_cents']/100:.2f}")
     print(f"   ✓ Overdue: ${metrics['overdue_total_cents']/100:.2f}\n")
     
+    # 10. Bulk PDF export
+    print("10. Exporting invoice PDFs as ZIP...")
+    response = requests.get(
+        f"{BASE_URL}/api/invoices/export/pdfs",
+        params={"start_date": str(today), "end_date": str(today)},
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert f"{invoice['invoice_number']}.pdf" in archive.namelist()
+    print(f"   ✓ ZIP contains {len(archive.namelist())} PDFs\n")
+    
     print("✅ All tests passed!")
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+"""
+Test that replacing a budget's categories merges instead of rewriting them
+Run with: python test_budget_merge.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+from fastapi import HTTPException
+from app.api.budgets import update_budget
+from app.models.budget import Budget, BudgetCategory
+from app.models.transaction import Transaction
+from app.schemas.budget import BudgetUpdate, BudgetCategoryMerge, BudgetSummary
+from test_utils import recorded, make_session, seed
+
+def test_budget_merge():
+    print("🧪 Testing merge-based category replacement\n")
+
+    engine, db = make_session()
+    user = seed(db, 4)
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    first, second, third, fourth = db.query(BudgetCategory).filter(
+        BudgetCategory.budget_id == budget.id
+    ).order_by(BudgetCategory.id).all()
+    db.refresh(user)
+
+    with recorded(engine) as statements:
+        result = update_budget(budget.id, BudgetUpdate(categories=[
+            BudgetCategoryMerge(id=first.id, name="Groceries", allocated_cents=5000, order=0),  # renamed by id
+            BudgetCategoryMerge(name="Category 1", allocated_cents=5000, order=1),               # unchanged, by name
+            BudgetCategoryMerge(name="Category 2", allocated_cents=7500, order=2),               # new amount, by name
+            BudgetCategoryMerge(name="Travel", allocated_cents=1000, order=3)                    # new
+        ]), db=db, current_user=user)
+
+    writes = [s for s in statements if s.startswith(("INSERT", "UPDATE", "DELETE"))]
+    category_writes = [w for w in writes if "budget_categories" in w.split("(")[0]]
+    # One UPDATE per changed row (rename, amount, soft delete) and one INSERT
+    assert len([w for w in category_writes if w.startswith("UPDATE")]) == 3, category_writes
+    assert len([w for w in category_writes if w.startswith("INSERT")]) == 1, category_writes
+    assert not [w for w in category_writes if w.startswith("DELETE")], category_writes
+    print(f"1. ✓ {len(category_writes)} category writes for 3 changed rows and 1 new one\n")
+
+    db.expire_all()
+    rows = {c.id: c for c in db.query(BudgetCategory).filter(BudgetCategory.budget_id == budget.id)}
+    assert rows[first.id].name == "Groceries"
+    assert rows[third.id].allocated_cents == 7500
+    assert rows[fourth.id].is_active == False
+    assert len(rows) == 5
+    linked = db.query(Transaction).filter(Transaction.category_id.in_([first.id, fourth.id])).count()
+    assert linked == 2, linked
+    print("2. ✓ Ids kept, removed category soft-deleted, transactions still linked\n")
+
+    summary = BudgetSummary(**result)
+    assert sorted(c.name for c in summary.budget.categories) == sorted(
+        c.name for c in rows.values() if c.is_active
+    )
+    assert summary.total_allocated_cents == 5000 + 5000 + 7500 + 1000
+    print("3. ✓ Response and totals exclude the removed category\n")
+
+    db.refresh(user)
+    update_budget(budget.id, BudgetUpdate(categories=[
+        BudgetCategoryMerge(name="Category 3", allocated_cents=100)
+    ]), db=db, current_user=user)
+    db.expire_all()
+    assert db.get(BudgetCategory, fourth.id).is_active == True
+    assert db.get(BudgetCategory, fourth.id).allocated_cents == 100
+    print("4. ✓ Re-adding a removed name reactivates its row\n")
+
+    try:
+        update_budget(budget.id, BudgetUpdate(categories=[
+            BudgetCategoryMerge(id=999999, name="Nope", allocated_cents=0)
+        ]), db=db, current_user=user)
+        assert False, "Unknown id accepted"
+    except HTTPException as e:
+        assert e.status_code == 400
+    print("5. ✓ Unknown category id rejected\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Categories are merged!")
+
+if __name__ == "__main__":
+    try:
+        test_budget_merge()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
@@ -0,0 +1,85 @@
+"""
+Test the multi-period budget range endpoint
+Run with: python test_budget_range.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+from fastapi import HTTPException
+from app.api.budgets import get_budget_range, rollover_budget
+from app.models.budget import Budget, BudgetCategory
+from app.schemas.budget import BudgetPeriodSummary
+from test_utils import recorded, make_session, seed
+
+def _range_counted(engine, db, user, start, end, include_categories=True):
+    # Serialize inside the window so lazy loads during serialization are counted too
+    with recorded(engine) as statements:
+        result = [BudgetPeriodSummary(**item).model_dump() for item in get_budget_range(
+            period_from=start, period_to=end, include_categories=include_categories, db=db, current_user=user
+        )]
+    return result, len(statements)
+
+def _period(budget):
+    return f"{budget.year:04d}-{budget.month:02d}"
+
+def test_budget_range():
+    print("🧪 Testing the budget range endpoint\n")
+
+    engine, db = make_session()
+    user = seed(db, 20)
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    db.refresh(user)
+
+    # A year of budgets rolled from the seeded month
+    latest = budget
+    for _ in range(11):
+        latest = rollover_budget(latest.id, carry_over=False, db=db, current_user=user)["budget"]
+        db.refresh(user)
+    db.expire_all()
+    db.refresh(user)
+
+    print("1. A year of budgets with categories...")
+    result, queries = _range_counted(engine, db, user, _period(budget), _period(latest))
+    assert len(result) == 12, len(result)
+    assert queries <= 3, queries
+    first = result[0]
+    assert first["spent_cents"] == sum(c["spent_cents"] for c in first["categories"])
+    assert first["total_allocated_cents"] == 20 * 5000
+    assert first["remaining_cents"] == first["income_cents"] - first["total_allocated_cents"]
+    assert all(r["spent_cents"] == 0 for r in result[1:])
+    print(f"   ✓ 12 budgets in {queries} queries\n")
+
+    print("2. Without categories...")
+    result, queries = _range_counted(engine, db, user, _period(budget), _period(latest), include_categories=False)
+    assert len(result) == 12 and all(r["categories"] is None for r in result)
+    assert queries <= 2, queries
+    print(f"   ✓ 12 budgets in {queries} queries\n")
+
+    print("3. Removed categories are left out...")
+    category = db.query(BudgetCategory).filter(BudgetCategory.budget_id == budget.id).first()
+    category.is_active = False
+    db.commit()
+    db.refresh(user)
+    result, _ = _range_counted(engine, db, user, _period(budget), _period(budget))
+    assert len(result) == 1 and len(result[0]["categories"]) == 19
+    assert result[0]["total_allocated_cents"] == 19 * 5000
+    print("   ✓ Inactive category excluded\n")
+
+    print("4. Bad ranges are rejected...")
+    for start, end in (("2024-13", "2025-01"), ("2025", "2025-02"), ("2025-03", "2025-01")):
+        try:
+            get_budget_range(period_from=start, period_to=end, include_categories=False, db=db, current_user=user)
+            assert False, f"{start}..{end} accepted"
+        except HTTPException as e:
+            assert e.status_code == 400
+    print("   ✓ Rejected\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Budget range works!")
+
+if __name__ == "__main__":
+    try:
+        test_budget_range()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
@@ -0,0 +1,125 @@
+"""
+Test rolling a budget into the next month
+Run with: python test_budget_rollover.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+from fastapi import HTTPException
+from app.api.budgets import rollover_budget
+from app.models.budget import Budget, BudgetCategory
+from app.models.paycheck import Paycheck, PaycheckAllocation
+from app.services.budget_rollover import next_period
+from test_utils import counted, make_session, seed
+
+def _rollover_counted(engine, db, budget, user, carry_over):
+    result, statements = counted(engine, lambda: rollover_budget(budget.id, carry_over=carry_over, db=db, current_user=user))
+    return result, len(statements)
+
+def _setup(db, size):
+    user = seed(db, size)
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    categories = db.query(BudgetCategory).filter(
+        BudgetCategory.budget_id == budget.id
+    ).order_by(BudgetCategory.id).all()
+    paycheck = db.query(Paycheck).filter(Paycheck.user_id == user.id).first()
+    for category in categories[:2]:
+        db.add(PaycheckAllocation(paycheck_id=paycheck.id, category_id=category.id, amount_cents=1500))
+    categories[-1].is_active = False
+    db.commit()
+    db.refresh(user)
+    return user, budget, categories
+
+def test_budget_rollover():
+    print("🧪 Testing budget rollover\n")
+
+    engine, db = make_session()
+    counts = []
+    for size in (5, 300):
+        user, budget, categories = _setup(db, size)
+        result, queries = _rollover_counted(engine, db, budget, user, carry_over=True)
+        counts.append(queries)
+        print(f"   ✓ {size} categories rolled over in {queries} queries")
+    assert counts[0] == counts[1], counts
+    print("   ✓ Query count does not grow with the number of categories\n")
+
+    new_budget = result["budget"]
+    assert (new_budget.month, new_budget.year) == next_period(budget.month, budget.year)
+    assert new_budget.income_cents == budget.income_cents
+
+    print("1. Active categories are copied, with unspent balances carried over...")
+    db.expire_all()
+    copies = db.query(BudgetCategory).filter(
+        BudgetCategory.budget_id == new_budget.id
+    ).order_by(BudgetCategory.id).all()
+    assert [c.name for c in copies] == [c.name for c in categories[:-1]]
+    # Category 0 takes part of every split and is overspent; the others have 5000 allocated and 200 spent
+    assert copies[0].allocated_cents == 5000, copies[0].allocated_cents
+    assert all(c.allocated_cents == 5000 + 4800 for c in copies[1:])
+    assert all(c.spent_cents == 0 and c.transaction_count == 0 and c.is_active for c in copies)
+    assert result["total_allocated_cents"] == sum(c.allocated_cents for c in copies)
+    print(f"   ✓ {len(copies)} categories copied\n")
+
+    print("2. Paycheck allocation templates follow their categories...")
+    templates = db.query(PaycheckAllocation).filter(
+        PaycheckAllocation.category_id.in_([c.id for c in copies]),
+        PaycheckAllocation.instance_id.is_(None)
+    ).order_by(PaycheckAllocation.category_id).all()
+    assert [t.category_id for t in templates] == [copies[0].id, copies[1].id]
+    assert all(t.amount_cents == 1500 for t in templates)
+    print("   ✓ 2 templates cloned\n")
+
+    print("3. Rolling over without carry-over keeps allocations...")
+    db.refresh(user)
+    plain = rollover_budget(new_budget.id, carry_over=False, db=db, current_user=user)["budget"]
+    db.expire_all()
+    amounts = [c.allocated_cents for c in db.query(BudgetCategory).filter(
+        BudgetCategory.budget_id == plain.id
+    ).order_by(BudgetCategory.id)]
+    assert amounts == [c.allocated_cents for c in copies], amounts
+    print("   ✓ Allocations unchanged\n")
+
+    print("4. An existing next period is refused...")
+    db.refresh(user)
+    try:
+        rollover_budget(budget.id, carry_over=False, db=db, current_user=user)
+        assert False, "Second rollover accepted"
+    except HTTPException as e:
+        assert e.status_code == 400
+    assert next_period(12, 2030) == (1, 2031)
+    print("   ✓ Refused\n")
+
+    print("5. Templates follow their own category when names and order repeat or order is NULL...")
+    user = seed(db, 3)
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    categories = db.query(BudgetCategory).filter(
+        BudgetCategory.budget_id == budget.id
+    ).order_by(BudgetCategory.id).all()
+    categories[1].name, categories[1].order = categories[0].name, categories[0].order
+    categories[2].order = None
+    paycheck = db.query(Paycheck).filter(Paycheck.user_id == user.id).first()
+    for amount, category in zip((100, 200, 300), categories):
+        db.add(PaycheckAllocation(paycheck_id=paycheck.id, category_id=category.id, amount_cents=amount))
+    db.commit()
+    db.refresh(user)
+    rolled = rollover_budget(budget.id, carry_over=False, db=db, current_user=user)["budget"]
+    db.expire_all()
+    copies = db.query(BudgetCategory).filter(
+        BudgetCategory.budget_id == rolled.id
+    ).order_by(BudgetCategory.id).all()
+    assert [(c.name, c.order) for c in copies] == [(c.name, c.order) for c in categories]
+    amounts = {t.category_id: t.amount_cents for t in db.query(PaycheckAllocation).filter(
+        PaycheckAllocation.category_id.in_([c.id for c in copies])
+    )}
+    assert amounts == {copies[0].id: 100, copies[1].id: 200, copies[2].id: 300}, amounts
+    print("   ✓ 3 templates on 3 distinct copies\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Budgets roll over!")
+
+if __name__ == "__main__":
+    try:
+        test_budget_rollover()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
@@ -0,0 +1,93 @@
+"""
+Test that bulk category updates and reorders cost the same number of queries
+however many categories they touch
+Run with: python test_category_bulk.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+from app.api.budgets import bulk_update_categories, reorder_categories
+from app.models.budget import Budget, BudgetCategory
+from app.schemas.budget import BudgetCategoryBulkUpdate, BudgetCategorySingleUpdate
+from test_utils import counted, make_session, seed
+
+def _categories(db, user):
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    categories = db.query(BudgetCategory).filter(
+        BudgetCategory.budget_id == budget.id
+    ).order_by(BudgetCategory.id).all()
+    return budget, categories
+
+def test_category_bulk():
+    print("🧪 Testing set-based bulk category updates\n")
+
+    engine, db = make_session()
+    bulk_counts = []
+    reorder_counts = []
+    users = []
+
+    for size in (5, 300):
+        user = seed(db, size)
+        users.append(user)
+        budget, categories = _categories(db, user)
+        db.refresh(user)
+
+        result, queries = counted(engine, lambda: bulk_update_categories(budget.id, BudgetCategoryBulkUpdate(updates=[
+            BudgetCategorySingleUpdate(category_id=category.id, allocated_cents=i, category_group="Bulk")
+            for i, category in enumerate(categories)
+        ]), db=db, current_user=user))
+        assert result["updated_count"] == size and result["success"], result
+        bulk_counts.append(len(queries))
+
+        db.refresh(user)
+        order = [{"id": category.id, "order": size - i} for i, category in enumerate(categories)]
+        result, queries = counted(engine, lambda: reorder_categories(budget.id, order, db=db, current_user=user))
+        assert result["updated_count"] == size, result
+        reorder_counts.append(len(queries))
+
+        db.expire_all()
+        _, categories = _categories(db, user)
+        assert [c.allocated_cents for c in categories] == list(range(size))
+        assert [c.order for c in categories] == [size - i for i in range(size)]
+        assert all(c.category_group == "Bulk" for c in categories)
+        print(f"   ✓ {size} categories: bulk {bulk_counts[-1]} queries, reorder {reorder_counts[-1]} queries")
+
+    assert bulk_counts[0] == bulk_counts[1], bulk_counts
+    assert reorder_counts[0] == reorder_counts[1], reorder_counts
+    print("   ✓ Query counts do not grow with the number of categories\n")
+
+    print("1. Unchanged fields are kept and duplicates merge...")
+    owner, other = users
+    budget, categories = _categories(db, owner)
+    result = bulk_update_categories(budget.id, BudgetCategoryBulkUpdate(updates=[
+        BudgetCategorySingleUpdate(category_id=categories[0].id, name="Renamed"),
+        BudgetCategorySingleUpdate(category_id=categories[0].id, description="Both applied")
+    ]), db=db, current_user=owner)
+    assert result["updated_count"] == 2, result
+    db.expire_all()
+    category = db.get(BudgetCategory, categories[0].id)
+    assert (category.name, category.description, category.allocated_cents) == ("Renamed", "Both applied", 0)
+    print("   ✓ Merged\n")
+
+    print("2. Categories from another budget are rejected...")
+    foreign = _categories(db, other)[1][0]
+    result = bulk_update_categories(budget.id, BudgetCategoryBulkUpdate(updates=[
+        BudgetCategorySingleUpdate(category_id=foreign.id, allocated_cents=1)
+    ]), db=db, current_user=owner)
+    assert result["updated_count"] == 0 and result["errors"] == [f"Category {foreign.id} not found"], result
+    result = reorder_categories(budget.id, [{"id": foreign.id, "order": 99}], db=db, current_user=owner)
+    assert result["updated_count"] == 0, result
+    db.expire_all()
+    assert db.get(BudgetCategory, foreign.id).allocated_cents != 1
+    assert db.get(BudgetCategory, foreign.id).order != 99
+    print("   ✓ Rejected\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Bulk category updates are set-based!")
+
+if __name__ == "__main__":
+    try:
+        test_category_bulk()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
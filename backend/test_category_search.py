@@ -0,0 +1,71 @@
+"""
+Test category name search: contains, prefix and fuzzy matching in one query
+Run with: python test_category_search.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+from app.api.budgets import get_budget_categories
+from app.models.budget import Budget, BudgetCategory
+from app.schemas.budget import BudgetCategoryPage
+from test_utils import recorded, make_session, seed
+
+NAMES = ["Groceries", "Gas", "Gym", "Rent", "Restaurants", "Electric", "100% Fun", "Grocery Delivery"]
+
+def _search(engine, db, user, budget, **params):
+    options = dict(limit=50, offset=0, search=None, match="contains", group=None, sort_by="name", sort_desc=False)
+    options.update(params)
+    with recorded(engine) as statements:
+        page = BudgetCategoryPage(**get_budget_categories(budget.id, db=db, current_user=user, **options))
+    return page, len(statements)
+
+def test_category_search():
+    print("🧪 Testing category search\n")
+
+    engine, db = make_session()
+    user = seed(db, 1)
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    for i, name in enumerate(NAMES):
+        db.add(BudgetCategory(budget_id=budget.id, name=name, allocated_cents=100, order=i + 1))
+    db.commit()
+    db.refresh(user)
+    db.refresh(budget)
+
+    print("1. Contains...")
+    page, queries = _search(engine, db, user, budget, search="roc")
+    assert [c.name for c in page.categories] == ["Groceries", "Grocery Delivery"], page
+    assert page.total == 2 and not page.has_more
+    # Ownership check plus one query for the page and its total
+    assert queries == 2, queries
+    page, _ = _search(engine, db, user, budget, search="0%")
+    assert [c.name for c in page.categories] == ["100% Fun"], page
+    print("   ✓ Substring match, wildcards escaped, 1 query for the page\n")
+
+    print("2. Prefix...")
+    page, _ = _search(engine, db, user, budget, search="re", match="prefix")
+    assert [c.name for c in page.categories] == ["Rent", "Restaurants"], page
+    page, _ = _search(engine, db, user, budget, search="g", match="prefix", limit=2)
+    assert [c.name for c in page.categories] == ["Gas", "Groceries"] and page.total == 4 and page.has_more, page
+    print("   ✓ Prefix match with paging\n")
+
+    print("3. Fuzzy...")
+    page, _ = _search(engine, db, user, budget, search="grocerys", match="fuzzy")
+    assert [c.name for c in page.categories] == ["Groceries", "Grocery Delivery"], page
+    page, _ = _search(engine, db, user, budget, search="restaurnts", match="fuzzy")
+    assert [c.name for c in page.categories] == ["Restaurants"], page
+    print("   ✓ Typos tolerated, best match first\n")
+
+    print("4. Past the last page...")
+    page, _ = _search(engine, db, user, budget, search="roc", offset=10)
+    assert page.categories == [] and page.total == 2, page
+    print("   ✓ Total still reported\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Category search works!")
+
+if __name__ == "__main__":
+    try:
+        test_category_search()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
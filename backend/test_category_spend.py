@@ -0,0 +1,87 @@
+"""
+Test the maintained budget_categories.spent_cents and transaction_count
+Run with: python test_category_spend.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+from fastapi import Response
+from datetime import date
+from app.api import transactions
+from app.models.budget import Budget, BudgetCategory
+from app.schemas.transaction import TransactionCreate, TransactionUpdate, TransactionSplitCreate
+from app.services.category_spend import verify_category_spend, rebuild_category_spend
+from test_utils import make_session, seed
+
+def _category(db, category_id):
+    db.expire_all()
+    return db.get(BudgetCategory, category_id)
+
+def _assert_consistent(db, step):
+    mismatches = verify_category_spend(db)
+    assert not mismatches, f"{step}: {mismatches}"
+    print(f"   ✓ {step}")
+
+def test_category_spend():
+    print("🧪 Testing maintained category spend\n")
+    
+    engine, db = make_session()
+    user = seed(db, 3)
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    categories = db.query(BudgetCategory).filter(BudgetCategory.budget_id == budget.id).order_by(BudgetCategory.id).all()
+    first, second, third = [c.id for c in categories]
+    
+    print("1. Seeded data...")
+    # Category 0: own 100 + own split 100 + 200 from each of the 3 splits
+    assert _category(db, first).spent_cents == 800
+    assert _category(db, first).transaction_count == 5
+    _assert_consistent(db, "rebuild matches transactions")
+    
+    print("\n2. Writes through the API...")
+    created = transactions.create_transaction(TransactionCreate(
+        budget_id=budget.id, category_id=second, amount_cents=1000, date=date.today()
+    ), Response(), db=db, current_user=user)
+    assert _category(db, second).spent_cents == 1200
+    _assert_consistent(db, "create")
+    
+    split = transactions.create_transaction(TransactionCreate(
+        budget_id=budget.id, amount_cents=700, date=date.today(), is_split=True,
+        splits=[TransactionSplitCreate(category_id=second, amount_cents=300),
+                TransactionSplitCreate(category_id=third, amount_cents=400)]
+    ), Response(), db=db, current_user=user)
+    _assert_consistent(db, "create split")
+    
+    transactions.update_transaction(created["id"], TransactionUpdate(
+        category_id=third, amount_cents=50
+    ), db=db, current_user=user)
+    assert _category(db, second).spent_cents == 500
+    _assert_consistent(db, "move to another category")
+    
+    transactions.delete_transaction(split["id"], db=db, current_user=user)
+    transactions.delete_transaction(created["id"], db=db, current_user=user)
+    _assert_consistent(db, "delete")
+    
+    print("\n3. Verifier and rebuild...")
+    db.query(BudgetCategory).filter(BudgetCategory.id == first).update({"spent_cents": 1})
+    db.commit()
+    mismatches = verify_category_spend(db)
+    assert [m["id"] for m in mismatches] == [first], mismatches
+    assert mismatches[0]["actual_spent_cents"] == 800
+    print("   ✓ Drift detected")
+    rebuild_category_spend(db, budget_id=budget.id)
+    _assert_consistent(db, "rebuild repairs drift")
+    
+    summary = transactions.get_budget_transaction_summary(budget.id, db=db, current_user=user)
+    by_id = {c["category_id"]: c for c in summary["categories"]}
+    assert by_id[first]["spent_cents"] == 800 and by_id[first]["transaction_count"] == 5
+    print("   ✓ Summary reads the maintained columns")
+    
+    db.close()
+    engine.dispose()
+    print("\n✅ Category spend stays consistent!")
+
+if __name__ == "__main__":
+    try:
+        test_category_spend()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
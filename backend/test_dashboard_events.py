@@ -0,0 +1,124 @@
+"""
+Test the dashboard server-sent event stream
+Run with: python test_dashboard_events.py
+"""
+
+import json
+import queue
+import threading
+import requests
+
+BASE_URL = "http://localhost:8000"
+
+def _read_events(response, events: queue.Queue):
+    """Parse the SSE stream into dicts until the connection closes"""
+    data = []
+    try:
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("data: "):
+                data.append(line[len("data: "):])
+            elif line == "" and data:
+                events.put(json.loads("\n".join(data)))
+                data = []
+    except Exception:
+        pass  # Stream closed by the test
+
+def _next_event(events: queue.Queue, event_type: str, section: str = None):
+    while True:
+        event = events.get(timeout=5)
+        if event["type"] == event_type and (section is None or event.get("section") == section):
+            return event
+
+def test_dashboard_events():
+    print("🧪 Testing Dashboard Event Stream\n")
+
+    # 1. Login
+    print("1. Logging in...")
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "email": "demo@example.com",
+        "password": "demo123"
+    })
+
+    if response.status_code != 200:
+        print(f"   ✗ Login failed: {response.text}")
+        return
+
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    print("   ✓ Login successful\n")
+
+    # 2. Open the stream with a ticket as a query parameter, like EventSource
+    print("2. Subscribing...")
+    response = requests.post(f"{BASE_URL}/api/metrics/dashboard/events/ticket", headers=headers)
+    assert response.status_code == 200, response.text
+    ticket = response.json()["ticket"]
+    stream = requests.get(f"{BASE_URL}/api/metrics/dashboard/events", params={"ticket": ticket}, stream=True, timeout=30)
+    assert stream.status_code == 200, stream.text
+    assert stream.headers["content-type"].startswith("text/event-stream")
+
+    events = queue.Queue()
+    threading.Thread(target=_read_events, args=(stream, events), daemon=True).start()
+
+    snapshot_event = _next_event(events, "snapshot")
+    snapshot = snapshot_event["data"]
+    print(f"   ✓ Snapshot received, net worth {snapshot['net_worth']['net_worth_cents']} cents\n")
+
+    # 3. Asset changes arrive as deltas
+    print("3. Creating an asset...")
+    response = requests.post(f"{BASE_URL}/api/net-worth/assets", headers=headers, json={
+        "name": "Event Test Savings",
+        "asset_type": "savings",
+        "current_value_cents": 123456
+    })
+    assert response.status_code == 200, response.text
+    asset_id = response.json()["id"]
+
+    event = _next_event(events, "delta", "net_worth")
+    assert event["changes"]["total_assets_cents"] == 123456, event
+    assert event["changes"]["asset_count"] == 1, event
+    assert event["changes"]["net_worth_cents"] == 123456, event
+    assert event["version"] > snapshot_event["version"], event
+    print(f"   ✓ Delta received: {event['changes']}\n")
+
+    # 4. Sinking fund changes arrive as the section's new values
+    print("4. Creating a sinking fund...")
+    response = requests.post(f"{BASE_URL}/api/sinking-funds", headers=headers, json={
+        "name": "Event Test Fund",
+        "target_cents": 50000
+    })
+    assert response.status_code == 201, response.text
+    fund_id = response.json()["id"]
+
+    event = _next_event(events, "section", "sinking_funds")
+    assert event["data"]["fund_count"] == snapshot["sinking_funds"]["fund_count"] + 1, event
+    print(f"   ✓ Section update received: {event['data']['fund_count']} funds\n")
+
+    # 5. Failed writes publish nothing
+    print("5. Checking that a rejected write is not pushed...")
+    response = requests.post(f"{BASE_URL}/api/sinking-funds/{fund_id}/contributions", headers=headers, json={
+        "amount_cents": -1
+    })
+    assert response.status_code == 400, response.text
+    requests.delete(f"{BASE_URL}/api/net-worth/assets/{asset_id}", headers=headers)
+    event = _next_event(events, "delta")
+    assert event["section"] == "net_worth", event
+    assert event["changes"]["total_assets_cents"] == -123456, event
+    print("   ✓ Next event is the asset deletion\n")
+
+    requests.delete(f"{BASE_URL}/api/sinking-funds/{fund_id}", headers=headers)
+    stream.close()
+
+    # 6. Unauthenticated streams are refused, and access tokens are not taken from the URL
+    response = requests.get(f"{BASE_URL}/api/metrics/dashboard/events", params={"ticket": "bogus"})
+    assert response.status_code == 401, response.text
+    response = requests.get(f"{BASE_URL}/api/metrics/dashboard/events", params={"ticket": token})
+    assert response.status_code == 401, response.text
+    print("6. ✓ Invalid ticket and access token in the URL rejected\n")
+
+    print("✅ Dashboard events delivered!")
+
+if __name__ == "__main__":
+    try:
+        test_dashboard_events()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
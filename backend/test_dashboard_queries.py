@@ -0,0 +1,113 @@
+"""
+Test that the dashboard endpoint issues a constant number of queries
+Run with: python test_dashboard_queries.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+from fastapi import HTTPException
+from app.api.metrics import get_dashboard_metrics
+from app.models.dashboard_state import DashboardState
+from app.services import dashboard_state
+from test_utils import counted, make_session, seed
+
+def _run_counted(engine, db, user, sections=None):
+    result, statements = counted(engine, lambda: get_dashboard_metrics(sections=sections, db=db, current_user=user))
+    return result, len(statements)
+
+def test_dashboard_query_count_is_constant():
+    print("🧪 Testing dashboard query count\n")
+
+    counts = {}
+    for size in (2, 50):
+        engine, db = make_session()
+        user = seed(db, size)
+        db.expire_all()
+
+        result, query_count = _run_counted(engine, db, user)
+        counts[size] = query_count
+
+        # Each category: 100 regular + 100 own split, plus 200 per split into category 0
+        assert result["budget"]["allocated_cents"] == size * 5000
+        assert result["budget"]["spent_cents"] == size * 400
+        assert result["transactions"]["count_this_month"] == size * 2
+        assert result["sinking_funds"]["fund_count"] == size
+        assert result["sinking_funds"]["total_saved_cents"] == size * 700
+        assert len(result["sinking_funds"]["funds"]) == min(size, 5)
+        assert result["net_worth"]["net_worth_cents"] == size * 1500
+        assert result["net_worth"]["asset_count"] == size
+        assert result["goals"]["total_goals"] == size
+        assert result["goals"]["active_goals"] == (size + 1) // 2
+        assert result["paychecks"]["upcoming_count"] == min(size, 3)
+        print(f"   ✓ {size} of everything: {query_count} queries")
+
+        db.close()
+        engine.dispose()
+
+    assert counts[2] == counts[50], f"Query count grew with data: {counts}"
+    print("\n✅ Query count is constant!")
+
+def test_dashboard_sections():
+    print("🧪 Testing selective dashboard sections\n")
+
+    engine, db = make_session()
+    user = seed(db, 5)
+    db.refresh(user)
+
+    result, query_count = _run_counted(engine, db, user, sections="goals, budget")
+    assert list(result) == ["goals", "budget"], list(result)
+    assert result["budget"]["allocated_cents"] == 5 * 5000
+    # One primary-key lookup plus one query per requested section
+    assert query_count == 3, query_count
+    assert db.get(DashboardState, user.id) is None
+    print(f"   ✓ 2 of 6 sections: {query_count} queries")
+
+    try:
+        get_dashboard_metrics(sections="budget,cashflow", db=db, current_user=user)
+        assert False, "unknown section accepted"
+    except HTTPException as e:
+        assert e.status_code == 400
+    print("   ✓ Unknown section rejected")
+
+    db.close()
+    engine.dispose()
+    print("\n✅ Only requested sections are computed!")
+
+def test_dashboard_releases_request_connection():
+    print("🧪 Testing connections held while sections are computed\n")
+
+    engine, db = make_session()
+    user = seed(db, 3)
+    db.refresh(user)
+    held = []
+    columns = dict(dashboard_state._SECTION_COLUMNS)
+
+    def recording(compute):
+        def compute_and_record(session, user_id, today):
+            held.append(db.in_transaction())
+            return compute(session, user_id, today)
+        return compute_and_record
+
+    dashboard_state._SECTION_COLUMNS.update({name: recording(compute) for name, compute in columns.items()})
+    try:
+        for sections in ("goals,budget", None):
+            held.clear()
+            get_dashboard_metrics(sections=sections, db=db, current_user=user)
+            assert held and not any(held), f"request session held its connection during {sections or 'rebuild'}"
+    finally:
+        dashboard_state._SECTION_COLUMNS.update(columns)
+    print("   ✓ The request's connection is back in the pool while the workers run")
+
+    db.close()
+    engine.dispose()
+    print("\n✅ Dashboard reads need at most one connection per worker!")
+
+if __name__ == "__main__":
+    try:
+        test_dashboard_query_count_is_constant()
+        print()
+        test_dashboard_sections()
+        print()
+        test_dashboard_releases_request_connection()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
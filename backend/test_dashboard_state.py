@@ -0,0 +1,155 @@
+"""
+Test that the materialized dashboard_state stays in step with the data
+Run with: python test_dashboard_state.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+After every write the stored row is compared with a full recompute.
+"""
+
+from datetime import date, timedelta
+from fastapi import Response
+from sqlalchemy.orm import sessionmaker
+from app.api.metrics import get_dashboard_metrics
+from app.api import transactions, net_worth, financial_goals, sinking_funds, paychecks, budgets
+from app.models.budget import Budget, BudgetCategory
+from app.models.sinking_fund import SinkingFund
+from app.models.dashboard_state import DashboardState
+from app.schemas.transaction import TransactionCreate, TransactionUpdate, TransactionSplitCreate
+from app.schemas.net_worth import AssetCreate, AssetUpdate
+from app.schemas.financial_goal import FinancialGoalCreate, FinancialGoalUpdate
+from app.schemas.sinking_fund import SinkingFundContributionCreate, SinkingFundUpdate
+from app.schemas.paycheck import PaycheckCreate
+from app.schemas.budget import BudgetCategoryBulkUpdate, BudgetCategorySingleUpdate
+from app.services import dashboard_state
+from app.services.dashboard_state import compute_sections, dashboard_response
+from test_utils import recorded, make_session, seed
+
+def _assert_in_step(db, user, step):
+    db.expire_all()
+    stored = dashboard_response(db.get(DashboardState, user.id))
+    fresh = dashboard_response(DashboardState(**compute_sections(db, user.id, date.today())))
+    assert stored == fresh, f"{step}: stored {stored} != recomputed {fresh}"
+    print(f"   ✓ {step}")
+
+def test_dashboard_state():
+    print("🧪 Testing materialized dashboard state\n")
+
+    engine, db = make_session()
+    user = seed(db, 3)
+    today = date.today()
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    categories = db.query(BudgetCategory).filter(BudgetCategory.budget_id == budget.id).all()
+
+    print("1. First read builds the row...")
+    first = get_dashboard_metrics(sections=None, db=db, current_user=user)
+    assert first["budget"]["spent_cents"] == 3 * 400
+    _assert_in_step(db, user, "row built")
+
+    print("\n2. Second read is a single primary-key lookup...")
+    with recorded(engine) as statements:
+        assert get_dashboard_metrics(sections=None, db=db, current_user=user) == first
+    assert len(statements) == 1, statements
+    print("   ✓ 1 query")
+
+    print("\n3. Transactions...")
+    created = transactions.create_transaction(TransactionCreate(
+        budget_id=budget.id, category_id=categories[1].id, amount_cents=1234, date=today
+    ), Response(), db=db, current_user=user)
+    _assert_in_step(db, user, "create")
+
+    split = transactions.create_transaction(TransactionCreate(
+        budget_id=budget.id, amount_cents=900, date=today, is_split=True,
+        splits=[TransactionSplitCreate(category_id=categories[0].id, amount_cents=400),
+                TransactionSplitCreate(category_id=categories[2].id, amount_cents=500)]
+    ), Response(), db=db, current_user=user)
+    _assert_in_step(db, user, "create split")
+
+    transactions.update_transaction(created["id"], TransactionUpdate(
+        amount_cents=2000, category_id=categories[2].id
+    ), db=db, current_user=user)
+    _assert_in_step(db, user, "update")
+
+    transactions.delete_transaction(split["id"], db=db, current_user=user)
+    transactions.delete_transaction(created["id"], db=db, current_user=user)
+    _assert_in_step(db, user, "delete")
+
+    print("\n4. Budgets...")
+    budgets.bulk_update_categories(budget.id, BudgetCategoryBulkUpdate(updates=[
+        BudgetCategorySingleUpdate(category_id=categories[0].id, allocated_cents=99999)
+    ]), db=db, current_user=user)
+    _assert_in_step(db, user, "allocation changed")
+
+    print("\n5. Net worth...")
+    asset = net_worth.create_asset(AssetCreate(
+        name="Brokerage", asset_type="investment", current_value_cents=500000
+    ), db=db, current_user=user)
+    _assert_in_step(db, user, "asset created")
+    net_worth.update_asset(asset.id, AssetUpdate(current_value_cents=450000), db=db, current_user=user)
+    _assert_in_step(db, user, "asset revalued")
+    net_worth.update_asset(asset.id, AssetUpdate(is_active=False), db=db, current_user=user)
+    _assert_in_step(db, user, "asset deactivated")
+    net_worth.delete_asset(asset.id, db=db, current_user=user)
+    _assert_in_step(db, user, "asset deleted")
+
+    print("\n6. Goals...")
+    goal = financial_goals.create_goal(FinancialGoalCreate(
+        name="Car", goal_type="savings", target_amount=100, target_date=today + timedelta(days=90), start_date=today
+    ), db=db, current_user=user)
+    _assert_in_step(db, user, "goal created")
+    financial_goals.update_goal(goal.id, FinancialGoalUpdate(current_amount=100), db=db, current_user=user)
+    _assert_in_step(db, user, "goal auto-completed")
+    financial_goals.delete_goal(goal.id, db=db, current_user=user)
+    _assert_in_step(db, user, "goal deleted")
+
+    print("\n7. Sinking funds and paychecks...")
+    fund = db.query(SinkingFund).filter(SinkingFund.user_id == user.id).first()
+    sinking_funds.add_contribution(fund.id, SinkingFundContributionCreate(amount_cents=2500), db=db, current_user=user)
+    _assert_in_step(db, user, "contribution added")
+    sinking_funds.update_sinking_fund(fund.id, SinkingFundUpdate(target_cents=1), db=db, current_user=user)
+    _assert_in_step(db, user, "fund target changed")
+    paychecks.create_paycheck(PaycheckCreate(
+        name="Bonus", net_amount_cents=100, frequency="monthly", pay_date=today
+    ), db=db, current_user=user)
+    _assert_in_step(db, user, "paycheck created")
+
+    print("\n8. Writes that commit during a rebuild...")
+    Session = sessionmaker(bind=engine)
+    compute = dashboard_state.compute_sections_concurrently
+    calls = []
+
+    def compute_then_write(*args, writes=1):
+        values = compute(*args)
+        calls.append(values)
+        if len(calls) <= writes:
+            # Another request commits a transaction after the sections were read
+            other = Session()
+            try:
+                transactions.create_transaction(TransactionCreate(
+                    budget_id=budget.id, category_id=categories[1].id, amount_cents=700, date=today
+                ), Response(), db=other, current_user=user)
+            finally:
+                other.close()
+        return values
+
+    try:
+        for writes, label in ((1, "rebuild retried after a concurrent write"),
+                              (dashboard_state.REBUILD_ATTEMPTS, "rebuild fell back to locking the row")):
+            calls.clear()
+            db.query(DashboardState).update({"as_of": today - timedelta(days=1)})
+            db.commit()
+            dashboard_state.compute_sections_concurrently = lambda *args: compute_then_write(*args, writes=writes)
+            get_dashboard_metrics(sections=None, db=db, current_user=user)
+            assert len(calls) == min(writes + 1, dashboard_state.REBUILD_ATTEMPTS), len(calls)
+            _assert_in_step(db, user, label)
+    finally:
+        dashboard_state.compute_sections_concurrently = compute
+
+    db.close()
+    engine.dispose()
+    print("\n✅ Dashboard state stays in step!")
+
+if __name__ == "__main__":
+    try:
+        test_dashboard_state()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
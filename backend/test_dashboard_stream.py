@@ -0,0 +1,92 @@
+"""
+Test the dashboard event stream's snapshot versioning and stream tickets
+Run with: python test_dashboard_stream.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+import asyncio
+import json
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+from app.api import metrics, net_worth
+from app.api.deps import get_current_user_for_stream
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.schemas.net_worth import AssetCreate
+from app.services.dashboard_state import get_dashboard_snapshot
+from test_utils import make_session, seed
+
+def _parse(chunk: str) -> dict:
+    return json.loads(chunk.split("data: ", 1)[1])
+
+def test_dashboard_stream():
+    print("🧪 Testing the dashboard event stream\n")
+
+    engine, db = make_session()
+    user = seed(db, 3)
+    Session = sessionmaker(bind=engine)
+
+    def add_asset(value_cents: int):
+        session = Session()
+        try:
+            net_worth.create_asset(AssetCreate(name=f"Asset {value_cents}", asset_type="savings",
+                                               current_value_cents=value_cents), db=session, current_user=user)
+        finally:
+            session.close()
+
+    def write_then_snapshot(db, user_id):
+        # A write commits after the subscription but before the snapshot is read
+        add_asset(111)
+        return get_dashboard_snapshot(db, user_id)
+
+    async def stream():
+        response = await metrics.stream_dashboard_events(db=Session(), current_user=user)
+        body = response.body_iterator
+        snapshot = _parse(await body.__anext__())
+        await asyncio.get_running_loop().run_in_executor(None, add_asset, 222)
+        delta = _parse(await asyncio.wait_for(body.__anext__(), timeout=5))
+        await body.aclose()
+        return snapshot, delta
+
+    print("1. Changes the snapshot already holds are not sent again...")
+    snapshot_for = metrics.get_dashboard_snapshot
+    metrics.get_dashboard_snapshot = write_then_snapshot
+    try:
+        snapshot, delta = asyncio.run(stream())
+    finally:
+        metrics.get_dashboard_snapshot = snapshot_for
+    assert snapshot["type"] == "snapshot"
+    assert snapshot["data"]["net_worth"]["total_assets_cents"] == 3 * 2000 + 111, snapshot
+    assert delta["type"] == "delta" and delta["changes"]["total_assets_cents"] == 222, delta
+    assert delta["version"] > snapshot["version"], (delta, snapshot)
+    print(f"   ✓ Snapshot at version {snapshot['version']} includes the first asset; only the second is pushed\n")
+
+    print("2. Streams open with a short-lived ticket...")
+    ticket = metrics.create_dashboard_events_ticket(current_user=user)
+    assert ticket.expires_in == settings.STREAM_TICKET_EXPIRE_SECONDS
+    assert get_current_user_for_stream(ticket=ticket.ticket, credentials=None, db=db).id == user.id
+
+    expires_in = settings.STREAM_TICKET_EXPIRE_SECONDS
+    settings.STREAM_TICKET_EXPIRE_SECONDS = -1
+    try:
+        expired = metrics.create_dashboard_events_ticket(current_user=user).ticket
+    finally:
+        settings.STREAM_TICKET_EXPIRE_SECONDS = expires_in
+    for rejected in (create_access_token({"sub": str(user.id)}), expired, None):
+        try:
+            get_current_user_for_stream(ticket=rejected, credentials=None, db=db)
+            assert False, "stream opened without a valid ticket"
+        except HTTPException as e:
+            assert e.status_code == 401
+    print("   ✓ Ticket accepted; access tokens, expired tickets and no ticket rejected\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Dashboard stream works!")
+
+if __name__ == "__main__":
+    try:
+        test_dashboard_stream()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
@@ -0,0 +1,109 @@
+"""
+Test the metrics summary against a recomputation in Python
+Run with: python test_metrics_summary.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from app.api.metrics import get_metrics_summary
+from app.api.payments import record_payment
+from app.models.customer import Customer
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.payment import Payment
+from app.schemas.payment import PaymentCreate
+from test_utils import make_session, seed_invoices
+
+def month_start(year: int, month: int) -> datetime:
+    return datetime(year + (month - 1) // 12, (month - 1) % 12 + 1, 1)
+
+def expected_summary(db, today: date) -> dict:
+    """The summary computed row by row from invoices and payments"""
+    invoices = db.query(Invoice).all()
+    open_invoices = [i for i in invoices if i.balance_due_cents > 0 and i.status != InvoiceStatus.PAID]
+    overdue = [i for i in open_invoices if i.due_date < today]
+
+    months = [month_start(today.year, today.month - back).strftime("%Y-%m") for back in range(5, -1, -1)]
+    revenue = dict.fromkeys(months, 0)
+    by_customer = defaultdict(int)
+    customer_of = {i.id: i.customer_id for i in invoices}
+    for payment in db.query(Payment).all():
+        key = payment.paid_at.strftime("%Y-%m")
+        if key in revenue:
+            revenue[key] += payment.amount_cents
+        by_customer[customer_of[payment.invoice_id]] += payment.amount_cents
+
+    names = {c.id: c.name for c in db.query(Customer).all()}
+    top = sorted(by_customer.items(), key=lambda item: -item[1])[:5]
+    return {
+        "outstanding_count": len(open_invoices),
+        "outstanding_total_cents": sum(i.balance_due_cents for i in open_invoices),
+        "overdue_count": len(overdue),
+        "overdue_total_cents": sum(i.balance_due_cents for i in overdue),
+        "monthly_revenue": [{"month": key, "revenue_cents": revenue[key]} for key in months],
+        "top_customers": [{"id": id, "name": names[id], "total_paid_cents": total} for id, total in top],
+    }
+
+def test_metrics_summary():
+    print("🧪 Testing the metrics summary\n")
+
+    engine, db = make_session()
+    today = date.today()
+    invoices = seed_invoices(db, 12, customers=7)
+    # Every third invoice is overdue, one is a draft with nothing due
+    for n, invoice in enumerate(invoices):
+        if n % 3 == 0:
+            invoice.due_date = today - timedelta(days=n + 1)
+    invoices[-1].balance_due_cents = 0
+    invoices[-1].status = InvoiceStatus.DRAFT
+    db.commit()
+
+    def pay(invoice, amount_cents, paid_at):
+        record_payment(invoice.id, PaymentCreate(amount_cents=amount_cents, paid_at=paid_at), db=db, current_user=None)
+
+    oldest = month_start(today.year, today.month - 5)
+    next_month = month_start(today.year, today.month + 1)
+    print("1. Payments on the edges of the six-month window...")
+    pay(invoices[0], 100, oldest)                                     # first instant counted
+    pay(invoices[1], 200, oldest - timedelta(microseconds=1))         # month before the window
+    pay(invoices[2], 300, next_month - timedelta(microseconds=1))     # last instant of this month
+    pay(invoices[3], 400, next_month)                                 # next month, outside the window
+    pay(invoices[4], 500, month_start(today.year, today.month - 2) - timedelta(seconds=1))
+    pay(invoices[5], invoices[5].total_cents, datetime.combine(today, datetime.min.time()))  # pays it off
+    pay(invoices[6], 50, oldest + timedelta(days=3))
+    pay(invoices[6], 25, oldest + timedelta(days=4))
+
+    summary = get_metrics_summary(db=db, current_user=None).model_dump()
+    expected = expected_summary(db, today)
+    assert summary == expected, f"{summary}\n!=\n{expected}"
+    revenue = {row["month"]: row["revenue_cents"] for row in summary["monthly_revenue"]}
+    assert revenue[oldest.strftime("%Y-%m")] == 175, revenue
+    assert revenue[today.strftime("%Y-%m")] == 300 + invoices[5].total_cents, revenue
+    assert sum(revenue.values()) == 175 + 500 + 300 + invoices[5].total_cents, revenue
+    print(f"   ✓ {len(summary['monthly_revenue'])} months match, boundary payments land in the right month\n")
+
+    print("2. Outstanding and overdue totals...")
+    assert summary["outstanding_count"] == 10, summary["outstanding_count"]
+    assert summary["overdue_count"] == 4, summary["overdue_count"]
+    assert len(summary["top_customers"]) == 5
+    print(f"   ✓ {summary['outstanding_count']} open, {summary['overdue_count']} overdue, top 5 customers match\n")
+
+    print("3. An empty database...")
+    db.query(Payment).delete()
+    db.query(Invoice).update({"balance_due_cents": 0, "status": InvoiceStatus.PAID})
+    db.commit()
+    summary = get_metrics_summary(db=db, current_user=None).model_dump()
+    assert summary["outstanding_count"] == summary["outstanding_total_cents"] == 0
+    assert summary["overdue_count"] == summary["overdue_total_cents"] == 0
+    print("   ✓ Zero totals, not NULL\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Metrics summary matches the recomputation!")
+
+if __name__ == "__main__":
+    try:
+        test_metrics_summary()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
@@ -0,0 +1,88 @@
+"""
+Test that invoice PDFs are rendered once per set of inputs
+Run with: python test_pdf_cache.py
+
+Runs in-process against a temporary SQLite database and a temporary local
+storage directory, no server needed.
+"""
+
+import os
+import tempfile
+import threading
+from sqlalchemy.orm import sessionmaker
+from app.models.invoice import Invoice
+from app.services import pdf, storage
+from app.services.pdf import collect_unreferenced_pdfs, generate_invoice_pdf
+from app.services.storage import LocalPDFStorage
+from test_utils import make_session, seed_invoices
+
+def test_pdf_cache():
+    print("🧪 Testing the invoice PDF cache\n")
+
+    engine, db = make_session()
+    invoice = seed_invoices(db, 1)[0]
+    root = tempfile.mkdtemp()
+    storage._storage = LocalPDFStorage(root)
+
+    renders = []
+    render = pdf._render_pdf
+    pdf._render_pdf = lambda html: renders.append(html) or render(html)
+    try:
+        print("1. Same inputs render once...")
+        key = generate_invoice_pdf(invoice.id, db)
+        assert key and os.path.exists(os.path.join(root, *key.split("/")))
+        assert generate_invoice_pdf(invoice.id, db) == key
+        assert len(renders) == 1, len(renders)
+
+        # Concurrent requests for the same invoice share the render
+        db.query(Invoice).filter(Invoice.id == invoice.id).update({"notes": "Thanks!"})
+        db.commit()
+        Session = sessionmaker(bind=engine)
+        keys = []
+
+        def download():
+            session = Session()
+            try:
+                keys.append(generate_invoice_pdf(invoice.id, session))
+            finally:
+                session.close()
+
+        threads = [threading.Thread(target=download) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(set(keys)) == 1 and keys[0] != key, keys
+        assert len(renders) == 2, len(renders)
+        assert pdf._render_locks == {}, "render locks outlive their users"
+        print("   ✓ 1 render for repeated and 4 concurrent requests\n")
+
+        print("2. Changed inputs render again...")
+        invoice.balance_due_cents = 0
+        db.commit()
+        latest = generate_invoice_pdf(invoice.id, db)
+        assert latest not in (key, keys[0]) and len(renders) == 3
+        print("   ✓ Payment gives a new key and a new render\n")
+
+        print("3. Superseded renders are deleted after the grace period...")
+        # Still there for downloads that were streaming them
+        assert storage._storage.exists(key) and storage._storage.exists(keys[0])
+        assert collect_unreferenced_pdfs(db) == 0
+        assert collect_unreferenced_pdfs(db, grace_seconds=-1) == 2
+        assert not storage._storage.exists(key) and not storage._storage.exists(keys[0])
+        assert storage._storage.exists(latest) and generate_invoice_pdf(invoice.id, db) == latest
+        assert len(renders) == 3
+        print("   ✓ Kept within the grace period, then collected; the current render stays\n")
+    finally:
+        pdf._render_pdf = render
+        storage._storage = None
+
+    db.close()
+    engine.dispose()
+    print("✅ Invoice PDF cache works!")
+
+if __name__ == "__main__":
+    try:
+        test_pdf_cache()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
@@ -0,0 +1,66 @@
+"""
+Test the streamed ZIP export of invoice PDFs
+Run with: python test_pdf_export.py
+
+Runs in-process against a temporary SQLite database and a temporary local
+storage directory, no server needed.
+"""
+
+import io
+import tempfile
+import zipfile
+from sqlalchemy.orm import sessionmaker
+from app.services import storage
+from app.services.pdf_export import entry_names, stream_invoice_pdfs_zip
+from app.services.storage import LocalPDFStorage
+from test_utils import make_session, seed_invoices
+
+def test_pdf_export():
+    print("🧪 Testing the invoice PDF ZIP export\n")
+
+    engine, db = make_session()
+    invoices = [(invoice.id, invoice.invoice_number) for invoice in seed_invoices(db, 4)]
+    storage._storage = LocalPDFStorage(tempfile.mkdtemp())
+    Session = sessionmaker(bind=engine)
+
+    def export(rows):
+        chunks = list(stream_invoice_pdfs_zip(rows, session_factory=Session))
+        return chunks, zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+    try:
+        print("1. Every invoice becomes one readable entry...")
+        chunks, archive = export(invoices)
+        assert sorted(archive.namelist()) == [f"{number}.pdf" for _, number in invoices], archive.namelist()
+        assert archive.testzip() is None
+        for name in archive.namelist():
+            assert archive.read(name).startswith(b"%PDF"), name
+        assert len(chunks) > len(invoices), "archive was not streamed entry by entry"
+        print(f"   ✓ {len(archive.namelist())} PDFs in {len(chunks)} chunks\n")
+
+        print("2. Entry names never collide...")
+        assert entry_names([(1, "INV-1"), (2, "inv-1"), (3, "A/B"), (4, "INV-2")]) == {
+            1: "INV-1-1.pdf", 2: "inv-1-2.pdf", 3: "A-B.pdf", 4: "INV-2.pdf"
+        }
+        (first, number), (second, _) = invoices[:2]
+        _, archive = export([(first, number), (second, number)])
+        assert sorted(archive.namelist()) == sorted([f"{number}-{first}.pdf", f"{number}-{second}.pdf"])
+        assert archive.read(f"{number}-{first}.pdf") != archive.read(f"{number}-{second}.pdf")
+        print("   ✓ Shared numbers get the invoice id; separators can't create folders\n")
+
+        print("3. Failed renders are listed, not fatal...")
+        _, archive = export([(first, number), (999999, "INV-GONE")])
+        assert sorted(archive.namelist()) == [f"{number}.pdf", "errors.txt"]
+        assert "INV-GONE.pdf: render failed" in archive.read("errors.txt").decode()
+        print("   ✓ errors.txt names the missing invoice\n")
+    finally:
+        storage._storage = None
+
+    db.close()
+    engine.dispose()
+    print("✅ Invoice PDF export works!")
+
+if __name__ == "__main__":
+    try:
+        test_pdf_export()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
@@ -0,0 +1,176 @@
+"""
+Test the PDF storage backends
+Run with: python test_pdf_storage.py
+
+Runs offline: the S3 backend talks to moto's in-process S3
+(pip install -r requirements-dev.txt); without moto that part is skipped.
+"""
+
+import os
+import hashlib
+import tempfile
+import time
+from sqlalchemy.orm import sessionmaker
+import migrate_pdf_storage_keys
+from app.services import storage as storage_module
+from app.services.storage import LocalPDFStorage, PDFStorage, S3PDFStorage, shard_key
+from test_utils import make_session, seed_invoices
+
+try:
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None  # S3 is optional, like boto3 in the app
+
+def _key(content: bytes) -> str:
+    return shard_key(hashlib.sha256(content).hexdigest())
+
+def test_local_storage():
+    print("🧪 Testing local sharded storage\n")
+
+    with tempfile.TemporaryDirectory() as root:
+        storage = LocalPDFStorage(root)
+        data = b"%PDF-1.4 local"
+        key = _key(data)
+
+        print("1. Saving and reading back...")
+        assert not storage.exists(key)
+        storage.save(key, data)
+        assert storage.exists(key)
+        assert b"".join(storage.iter_chunks(key)) == data
+        print("   ✓ Round trip OK\n")
+
+        print("2. Checking shard layout...")
+        relative = os.path.relpath(storage.local_path(key), root)
+        parts = relative.split(os.sep)
+        assert len(parts) == 3 and parts[0] == key[:2] and parts[1] == key[3:5]
+        print(f"   ✓ Stored at {relative}\n")
+
+        print("3. Evicting least recently used files...")
+        keys = []
+        for i in range(3):
+            blob = b"x" * 1000 + str(i).encode()
+            k = _key(blob)
+            storage.save(k, blob)
+            os.utime(storage.local_path(k), (time.time() - 100 + i, time.time() - 100 + i))
+            keys.append(k)
+        storage.touch(keys[0])
+        assert {k: size for k, size, _ in storage.iter_objects()} == {key: len(data), **{k: 1001 for k in keys}}
+        assert storage.enforce_limit(2100) == 1
+        assert storage.exists(keys[0]) and storage.exists(keys[2])
+        assert not storage.exists(keys[1])
+        # Files used within the grace period may be streaming, so they stay even over the limit
+        assert storage.enforce_limit(1, keep_after=time.time() - 50) == 1
+        assert not storage.exists(keys[2]) and storage.exists(keys[0]) and storage.exists(key)
+        print("   ✓ Oldest untouched files evicted, recently used ones kept\n")
+
+        print("4. Deleting...")
+        storage.delete(key)
+        assert not storage.exists(key)
+        storage.delete(key)  # deleting twice is a no-op
+        print("   ✓ Deleted\n")
+
+def test_s3_storage():
+    print("🧪 Testing S3-compatible storage\n")
+    if mock_aws is None:
+        print("   ⚠️  Skipped: moto isn't installed (pip install -r requirements-dev.txt)\n")
+        return
+
+    with mock_aws():
+        _check_s3_storage()
+
+def _check_s3_storage():
+    import requests
+
+    storage = S3PDFStorage(
+        bucket="invoice-pdfs-test",
+        prefix="pdfs",
+        region="us-east-1",
+        access_key_id="test",
+        secret_access_key="test"
+    )
+    storage.client.create_bucket(Bucket=storage.bucket)
+    storage.client.put_object(Bucket=storage.bucket, Key="other/readme.txt", Body=b"not ours")
+
+    data = b"%PDF-1.4 s3"
+    key = _key(data)
+
+    print("1. Saving and reading back...")
+    assert not storage.exists(key)
+    storage.save(key, data)
+    assert storage.exists(key)
+    assert b"".join(storage.iter_chunks(key)) == data
+    assert [(k, size) for k, size, _ in storage.iter_objects()] == [(key, len(data))]
+    print("   ✓ Round trip OK, listing limited to the prefix\n")
+
+    print("2. Fetching through a presigned URL...")
+    url = storage.presigned_url(key, "INV-TEST.pdf")
+    response = requests.get(url)
+    assert response.status_code == 200, response.text
+    assert response.content == data
+    assert 'filename="INV-TEST.pdf"' in response.headers["content-disposition"]
+    print("   ✓ Presigned download OK\n")
+
+    print("3. Deleting...")
+    storage.delete(key)
+    assert not storage.exists(key)
+    storage.delete(key)  # deleting twice is a no-op
+    assert storage.enforce_limit(1) == 0, "S3 relies on lifecycle rules"
+    print("   ✓ Deleted\n")
+
+def test_storage_interface():
+    print("🧪 Testing the storage interface\n")
+
+    class Incomplete(PDFStorage):
+        def exists(self, key):
+            return False
+
+    try:
+        Incomplete()
+        assert False, "a backend missing methods was instantiated"
+    except TypeError as e:
+        assert "iter_objects" in str(e) and "save" in str(e), e
+    print("   ✓ Backends must implement every abstract method\n")
+
+def test_legacy_keys():
+    print("🧪 Testing migration of pre-sharding PDF paths\n")
+
+    engine, db = make_session()
+    first, second, third = seed_invoices(db, 3)
+    legacy_dir = tempfile.mkdtemp()
+    content_hash = hashlib.sha256(b"legacy").hexdigest()
+    hashed = os.path.join(legacy_dir, f"{content_hash}.pdf")
+    per_invoice = os.path.join(legacy_dir, f"invoice_{second.id}.pdf")
+    for path in (hashed, per_invoice):
+        with open(path, "wb") as legacy_file:
+            legacy_file.write(b"%PDF-1.4 legacy")
+    first.pdf_path, second.pdf_path, third.pdf_path = hashed, per_invoice, shard_key("f" * 64)
+    db.commit()
+
+    storage_module._storage = LocalPDFStorage(tempfile.mkdtemp())
+    migrate_pdf_storage_keys.SessionLocal = sessionmaker(bind=engine)
+    try:
+        migrate_pdf_storage_keys.migrate()
+        db.expire_all()
+        assert first.pdf_path == shard_key(content_hash)
+        assert b"".join(storage_module._storage.iter_chunks(first.pdf_path)) == b"%PDF-1.4 legacy"
+        assert second.pdf_path is None and third.pdf_path == shard_key("f" * 64)
+        assert not os.path.exists(hashed) and not os.path.exists(per_invoice)
+        migrate_pdf_storage_keys.migrate()  # re-running changes nothing
+        db.expire_all()
+        assert first.pdf_path == shard_key(content_hash)
+    finally:
+        storage_module._storage = None
+    print("   ✓ Hashed files moved to shard keys, per-invoice files dropped, legacy files deleted\n")
+
+    db.close()
+    engine.dispose()
+
+if __name__ == "__main__":
+    try:
+        test_local_storage()
+        test_s3_storage()
+        test_storage_interface()
+        test_legacy_keys()
+        print("✅ All tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
@@ -0,0 +1,91 @@
+"""
+Test that the hot transaction queries use indexes rather than full table scans
+Run with: python test_query_plans.py
+
+Runs in-process against a temporary SQLite database, no server needed. Every
+SELECT issued by the reports, CSV exports and transaction endpoints is run
+through EXPLAIN QUERY PLAN; a plan that SCANs a table (with or without an
+index, i.e. reads all of it) fails the test.
+"""
+
+from datetime import date, timedelta
+from fastapi import Response
+from app.api.transactions import get_budget_transaction_summary, get_transaction, list_transactions
+from app.models.budget import Budget, BudgetCategory
+from app.models.transaction import Transaction
+from app.schemas.budget_report import ReportFilters, ReportRequest
+from app.services.budget_reports import BudgetReportService
+from app.services.csv_export import CSVExportService
+from app.services.dashboard_state import compute_sections
+from test_utils import captured_selects, full_scans, make_session, seed
+
+def test_query_plans():
+    print("🧪 Testing query plans of hot transaction queries\n")
+
+    engine, db = make_session()
+    user = seed(db, 20)
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    category = db.query(BudgetCategory).filter(BudgetCategory.budget_id == budget.id).first()
+    transaction = db.query(Transaction).filter(Transaction.user_id == user.id, Transaction.is_split == True).first()
+    db.commit()
+
+    today = date.today()
+    start, end = today - timedelta(days=90), today + timedelta(days=1)
+    report = lambda **filters: ReportRequest(report_type="spending", date_range_start=start, date_range_end=end,
+                                             filters=ReportFilters(**filters) if filters else None, group_by="month")
+
+    def listed(response=None, **params):
+        # Called directly, so every query parameter needs a real value
+        params = {"budget_id": None, "category_id": None, "start_date": None, "end_date": None,
+                  "limit": 50, "q": None, "cursor": None, **params}
+        return list_transactions(response or Response(), **params, db=db, current_user=user)
+
+    response = Response()
+    listed(response, limit=5)
+    cursor = response.headers["X-Next-Cursor"]
+    hot = {
+        "spending report": lambda: BudgetReportService.generate_spending_report(db, user.id, report()),
+        "spending report by budget": lambda: BudgetReportService.generate_spending_report(
+            db, user.id, report(budget_ids=[budget.id])),
+        "category report": lambda: BudgetReportService.generate_category_report(db, user.id, report()),
+        "trend report": lambda: BudgetReportService.generate_trend_report(db, user.id, report()),
+        "comparison report": lambda: BudgetReportService.generate_comparison_report(db, user.id, report()),
+        "dashboard summary": lambda: BudgetReportService.get_dashboard_summary(db, user.id),
+        "export transactions": lambda: CSVExportService.export_transactions(db, user.id),
+        "export by budget": lambda: CSVExportService.export_transactions(db, user.id, budget_id=budget.id),
+        "export by category": lambda: CSVExportService.export_transactions(
+            db, user.id, category_id=category.id, start_date=start, end_date=end),
+        "export splits": lambda: CSVExportService.export_transaction_splits(db, user.id, start_date=start),
+        "list transactions": lambda: listed(),
+        "list next page": lambda: listed(cursor=cursor),
+        "list by budget and dates": lambda: listed(budget_id=budget.id, start_date=start, end_date=end),
+        "list by category": lambda: listed(category_id=category.id),
+        "search": lambda: listed(q="txn"),
+        "search with filters": lambda: listed(q="txn 1", budget_id=budget.id, start_date=start, end_date=end),
+        "get transaction": lambda: get_transaction(transaction.id, db=db, current_user=user),
+        "budget summary": lambda: get_budget_transaction_summary(budget.id, db=db, current_user=user),
+        "dashboard sinking funds": lambda: compute_sections(db, user.id, today, ("sinking_funds",)),
+    }
+
+    failures = []
+    for name, call in hot.items():
+        db.refresh(user)
+        statements = captured_selects(engine, call)
+        assert statements, f"{name} issued no queries"
+        for statement, parameters in statements:
+            scans = full_scans(engine, statement, parameters)
+            if scans:
+                failures.append(f"{name}: {scans}\n      {' '.join(statement.split())}")
+        print(f"   {'✗' if failures and failures[-1].startswith(name) else '✓'} {name}: {len(statements)} queries")
+
+    assert not failures, "Full table scans:\n   " + "\n   ".join(failures)
+    print("\n✅ No hot query scans a whole table!")
+
+    db.close()
+    engine.dispose()
+
+if __name__ == "__main__":
+    try:
+        test_query_plans()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
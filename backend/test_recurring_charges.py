@@ -0,0 +1,157 @@
+"""
+Test recurring charge detection
+Run with: python test_recurring_charges.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+Requires numpy.
+"""
+
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from dateutil.relativedelta import relativedelta
+from fastapi import HTTPException
+from sqlalchemy import insert
+from app.api.transactions import list_recurring_charges
+from app.models.budget import Budget
+from app.models.recurring_charge import RecurringScan
+from app.models.transaction import Transaction
+from app.services.recurring_charges import merchant_key
+from test_utils import counted, full_scans, make_session, seed
+
+def test_recurring_charges():
+    print("🧪 Testing recurring charge detection\n")
+
+    engine, db = make_session()
+    user = seed(db, 2)
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    category_id = budget.categories[0].id
+    today = date.today()
+    rng = random.Random(11)
+    now = datetime.utcnow()
+
+    def row(day, amount_cents, notes):
+        return {"user_id": user.id, "budget_id": budget.id, "category_id": category_id, "amount_cents": amount_cents,
+                "date": day, "notes": notes, "merchant": merchant_key(notes), "is_split": False,
+                "created_at": now, "updated_at": now}
+
+    def monthly(notes, amount, months, until=today, jitter=2, spread=0.0):
+        return [row(until - relativedelta(months=m) + timedelta(days=rng.randint(-jitter, jitter)),
+                    int(amount * (1 + rng.uniform(-spread, spread))), notes(m) if callable(notes) else notes)
+                for m in range(months)]
+
+    rows = (
+        monthly("NETFLIX.COM", 1599, 14)
+        + monthly(lambda m: f"SPOTIFY P{4000 + m}", 999, 12)
+        + monthly("City Electric", 8500, 12, spread=0.15)
+        + monthly("Hulu", 799, 8, until=today - relativedelta(months=6), jitter=0)
+        + monthly("Amazon", 3000, 12, spread=0.9)
+        + [row(today - timedelta(weeks=w), 2500, "Gym membership") for w in range(30)]
+        + [row(today - relativedelta(months=3 * q), 42000, "Car insurance") for q in range(5)]
+        + [row(today - timedelta(days=rng.randint(0, 400)), rng.randint(500, 15000), f"Kroger #{rng.randint(1, 9)}")
+           for _ in range(200)]
+        + [row(today - timedelta(days=d), 1000, "#4411 0032") for d in (0, 30, 60)]
+    )
+    db.execute(insert(Transaction), rows)
+    db.commit()
+
+    def recurring():
+        db.refresh(user)
+        return {charge["merchant"]: charge for charge in list_recurring_charges(db=db, current_user=user)}
+
+    print("1. Subscriptions and bills are found, noise is not...")
+    found = recurring()
+    assert set(found) == {"netflix com", "spotify", "city electric", "hulu", "gym membership", "car insurance"}, set(found)
+    assert [found[m]["cadence"] for m in ("netflix com", "gym membership", "car insurance")] == ["monthly", "weekly", "quarterly"]
+    netflix = found["netflix com"]
+    assert netflix["occurrences"] == 14 and netflix["amount_cents"] == 1599 and netflix["amount_variation"] == 0
+    assert netflix["next_date"] == netflix["last_date"] + relativedelta(months=1)
+    assert found["spotify"]["occurrences"] == 12, "reference numbers don't split a merchant"
+    assert 0 < found["city electric"]["amount_variation"] <= 0.25
+    assert netflix["active"] and not found["hulu"]["active"], "a subscription that stopped is no longer active"
+    print(f"   ✓ {len(found)} recurring merchants; varying shop visits and amounts ignored\n")
+
+    print("2. Cached until transactions change...")
+    cached, statements = counted(engine, recurring)
+    assert cached == found and len(statements) <= 4, statements
+    print(f"   ✓ Served from the cache in {len(statements)} queries")
+
+    latest = max(netflix["last_date"], today) + relativedelta(months=1)
+    db.execute(insert(Transaction), [row(latest, 1599, "Netflix.com"), row(today, 1599, "Disney+")])
+    db.commit()
+    updated, statements = counted(engine, recurring)
+    assert updated["netflix com"]["occurrences"] == 15 and updated["netflix com"]["last_date"] == latest
+    assert updated["gym membership"] == found["gym membership"]
+    assert any("merchant IN (" in statement for statement in statements), "only new merchants reloaded"
+    assert updated["netflix com"]["first_date"] == netflix["first_date"], "a merchant's whole history is reloaded"
+    print("   ✓ New transactions re-analyze only their merchants\n")
+
+    print("3. Edits and deletes rescan...")
+    gym = db.query(Transaction).filter(Transaction.notes == "Gym membership").order_by(Transaction.date).all()
+    for transaction in gym[:-3]:
+        db.delete(transaction)
+    db.commit()
+    assert recurring()["gym membership"]["occurrences"] == 3
+    db.query(Transaction).filter(Transaction.notes == "Hulu").update(
+        {"notes": "Hulu Plus", "merchant": merchant_key("Hulu Plus"), "updated_at": datetime.utcnow()}
+    )
+    db.commit()
+    after_edit = recurring()
+    assert "hulu" not in after_edit and after_edit["hulu plus"]["occurrences"] == 8
+    print("   ✓ Deleted and renamed transactions are reflected\n")
+
+    print("4. Tens of thousands of transactions...")
+    db.execute(insert(Transaction), [
+        row(today - timedelta(days=rng.randint(0, 700)), rng.randint(100, 20000), f"merchant {rng.randint(0, 3000)} store")
+        for _ in range(40000)
+    ] + [
+        row(today - relativedelta(months=m), 1200 + i, f"Service {chr(97 + i % 26)}{chr(97 + i // 26)}")
+        for i in range(300) for m in range(12)
+    ])
+    db.commit()
+    started = time.perf_counter()
+    found = recurring()
+    elapsed = time.perf_counter() - started
+    assert len([m for m in found if m.startswith("service")]) == 300
+    assert not any(m.startswith("merchant") for m in found)
+    scan = db.get(RecurringScan, user.id)
+    print(f"   ✓ {scan.transaction_count} transactions analyzed in {elapsed * 1000:.0f} ms")
+    assert elapsed < 1.0, elapsed
+
+    db.execute(insert(Transaction), [row(today + timedelta(days=30), 1205, "Service fa")])
+    db.commit()
+    started = time.perf_counter()
+    found, statements = counted(engine, recurring, details=True)
+    elapsed = time.perf_counter() - started
+    assert found["service fa"]["occurrences"] == 13
+    loads = [(statement, parameters) for statement, parameters, _ in statements
+             if statement.startswith("SELECT") and "merchant IN (" in statement]
+    assert len(loads) == 1 and loads[0][1][-1] == "service fa", loads
+    scans = [scan for statement, parameters in loads for scan in full_scans(engine, statement, parameters)]
+    assert not scans, scans
+    print(f"   ✓ Incremental refresh after one new transaction in {elapsed * 1000:.0f} ms, one merchant's rows read by index\n")
+
+    print("5. Without numpy...")
+    db.execute(insert(Transaction), [row(today, 1, "Coffee")])
+    db.commit()
+    numpy = sys.modules.pop("numpy")
+    sys.modules["numpy"] = None
+    try:
+        recurring()
+        assert False, "detection ran without numpy"
+    except HTTPException as e:
+        assert e.status_code == 503 and "pip install numpy" in e.detail
+    finally:
+        sys.modules["numpy"] = numpy
+    print("   ✓ Answers 503 with an install hint\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Recurring charge detection works!")
+
+if __name__ == "__main__":
+    try:
+        test_recurring_charges()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
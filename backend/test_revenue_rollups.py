@@ -0,0 +1,82 @@
+"""
+Test that record_payment keeps the revenue rollups equal to the payments
+Run with: python test_revenue_rollups.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from app.api.metrics import get_metrics_summary
+from app.api.payments import record_payment
+from app.models.invoice import Invoice
+from app.models.payment import Payment
+from app.models.revenue_rollup import RevenueByMonth, RevenueByCustomer
+from app.schemas.payment import PaymentCreate
+from app.services.revenue_rollup import rebuild_revenue_rollups
+from test_utils import make_session, seed_invoices
+
+def rollups(db):
+    by_month = {row.month: (row.revenue_cents, row.payment_count) for row in db.query(RevenueByMonth)}
+    by_customer = {row.customer_id: (row.total_paid_cents, row.payment_count) for row in db.query(RevenueByCustomer)}
+    return by_month, by_customer
+
+def recomputed(db):
+    """Both rollups summed from the payments table"""
+    customer_of = dict(db.query(Invoice.id, Invoice.customer_id))
+    by_month = defaultdict(lambda: [0, 0])
+    by_customer = defaultdict(lambda: [0, 0])
+    for payment in db.query(Payment):
+        for totals in (by_month[payment.paid_at.strftime("%Y-%m")], by_customer[customer_of[payment.invoice_id]]):
+            totals[0] += payment.amount_cents
+            totals[1] += 1
+    return ({key: tuple(value) for key, value in by_month.items()},
+            {key: tuple(value) for key, value in by_customer.items()})
+
+def test_revenue_rollups():
+    print("🧪 Testing the revenue rollups\n")
+
+    engine, db = make_session()
+    today = date.today()
+    invoices = seed_invoices(db, 6, customers=3)
+    now = datetime.combine(today, datetime.min.time()) + timedelta(hours=12)
+
+    def pay(invoice, amount_cents, paid_at):
+        record_payment(invoice.id, PaymentCreate(amount_cents=amount_cents, paid_at=paid_at), db=db, current_user=None)
+
+    print("1. Every payment lands in both rollups...")
+    pay(invoices[0], 100, now)
+    pay(invoices[0], 150, now)
+    pay(invoices[1], 200, now)
+    pay(invoices[2], 300, now - timedelta(days=400))
+    pay(invoices[3], 400, now)
+    pay(invoices[4], invoices[4].total_cents, now)
+    by_month, by_customer = rollups(db)
+    assert (by_month, by_customer) == recomputed(db), f"{rollups(db)} != {recomputed(db)}"
+    assert by_month[today.strftime("%Y-%m")] == (850 + invoices[4].total_cents, 5), by_month
+    assert sum(count for _, count in by_customer.values()) == 6
+    print(f"   ✓ {len(by_month)} months and {len(by_customer)} customers equal the payments\n")
+
+    print("2. A rebuild gives the same rows...")
+    assert rebuild_revenue_rollups(db) == (len(by_month), len(by_customer))
+    assert rollups(db) == (by_month, by_customer)
+    print("   ✓ rebuild_revenue_rollups matches the incremental totals\n")
+
+    print("3. The summary zero-fills the months without payments...")
+    monthly = get_metrics_summary(db=db, current_user=None).monthly_revenue
+    assert len(monthly) == 6, monthly
+    assert monthly[-1].month == today.strftime("%Y-%m")
+    assert monthly[-1].revenue_cents == by_month[today.strftime("%Y-%m")][0]
+    assert [row.revenue_cents for row in monthly[:-1]] == [0] * 5, monthly
+    assert len({row.month for row in monthly}) == 6
+    print("   ✓ 6 months, the 5 earlier ones at 0; the payment from 400 days ago is outside\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Revenue rollups match the payments!")
+
+if __name__ == "__main__":
+    try:
+        test_revenue_rollups()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
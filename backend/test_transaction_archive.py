@@ -0,0 +1,161 @@
+"""
+Test cold-storage archival of old transactions
+Run with: python test_transaction_archive.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+from datetime import date, timedelta
+from fastapi import HTTPException, Response
+from app.api.transactions import get_transaction, list_transactions
+from app.models.budget import Budget, BudgetCategory
+from app.models.transaction import Transaction, TransactionSplit
+from app.models.transaction_archive import ArchivedCategoryMonth, ArchivedTransaction, ArchivedTransactionSplit
+from app.schemas.budget_report import ReportFilters, ReportRequest
+from app.services.budget_reports import BudgetReportService
+from app.services.category_spend import rebuild_category_spend, verify_category_spend
+from app.services.csv_export import CSVExportService
+from app.services.transaction_archive import archive_cutoff, archive_transactions
+from test_utils import captured_selects, full_scans, make_session, seed
+
+def _months_ago(today, months):
+    total = today.year * 12 + today.month - 1 - months
+    return date(total // 12, total % 12 + 1, 1)
+
+def test_transaction_archive():
+    print("🧪 Testing transaction archival\n")
+
+    engine, db = make_session()
+    user = seed(db, 3)
+    today = date.today()
+    old_month, recent_month = _months_ago(today, 24), _months_ago(today, 6)
+
+    def budget_for(first_day):
+        budget = Budget(user_id=user.id, month=first_day.month, year=first_day.year, income_cents=500000)
+        db.add(budget)
+        db.flush()
+        categories = [BudgetCategory(budget_id=budget.id, name=name, allocated_cents=20000, order=i)
+                      for i, name in enumerate(("Rent", "Food"))]
+        db.add_all(categories)
+        db.flush()
+        return budget, categories
+
+    old, (rent, food) = budget_for(old_month)
+    recent, (recent_rent, _) = budget_for(recent_month)
+    for day in range(3):
+        split = Transaction(user_id=user.id, budget_id=old.id, amount_cents=900, is_split=True,
+                            date=old_month + timedelta(days=day), notes="Old market run")
+        db.add(split)
+        db.flush()
+        db.add_all([TransactionSplit(transaction_id=split.id, category_id=rent.id, amount_cents=400, notes="Old soap"),
+                    TransactionSplit(transaction_id=split.id, category_id=food.id, amount_cents=500, notes="Old bread")])
+    for day in range(20):
+        db.add(Transaction(user_id=user.id, budget_id=old.id, category_id=(rent, food)[day % 2].id,
+                           amount_cents=1000 + day, date=old_month + timedelta(days=day), notes=f"Old bill {day}"))
+        db.add(Transaction(user_id=user.id, budget_id=recent.id, category_id=recent_rent.id,
+                           amount_cents=500, date=recent_month + timedelta(days=day), notes=f"Recent bill {day}"))
+    db.commit()
+    rebuild_category_spend(db)
+    archived_id = db.query(Transaction.id).filter(Transaction.budget_id == old.id).first()[0]
+
+    start, end = old_month, today + timedelta(days=1)
+    report = lambda **filters: ReportRequest(report_type="spending", date_range_start=start, date_range_end=end,
+                                             filters=ReportFilters(**filters) if filters else None, group_by="month")
+
+    def listed(**params):
+        params = {"budget_id": None, "category_id": None, "start_date": None, "end_date": None,
+                  "limit": 200, "q": None, "cursor": None, **params}
+        db.refresh(user)
+        return list_transactions(Response(), **params, db=db, current_user=user)
+
+    reads = {
+        "spending report": lambda: BudgetReportService.generate_spending_report(db, user.id, report()).model_dump(),
+        "spending report by category": lambda: BudgetReportService.generate_spending_report(
+            db, user.id, report(category_ids=[food.id])).model_dump(),
+        "category report": lambda: [r.model_dump() for r in BudgetReportService.generate_category_report(db, user.id, report())],
+        "comparison report": lambda: BudgetReportService.generate_comparison_report(db, user.id, report()).model_dump(),
+        "export transactions": lambda: CSVExportService.export_transactions(db, user.id, start_date=start),
+        "export splits": lambda: CSVExportService.export_transaction_splits(db, user.id, start_date=start),
+        "list from old month": lambda: listed(start_date=start),
+        "list old budget": lambda: listed(budget_id=old.id, start_date=start),
+        "list old category": lambda: listed(category_id=food.id, start_date=start, end_date=old_month + timedelta(days=31)),
+        "list everything": lambda: listed(),
+        "list old budget without dates": lambda: listed(budget_id=old.id),
+        "dashboard summary": lambda: BudgetReportService.get_dashboard_summary(db, user.id, months=36),
+    }
+    before = {name: read() for name, read in reads.items()}
+    assert len(before["list from old month"]) == 23 + 20 + 2 * 3
+    spent = {c.id: (c.spent_cents, c.transaction_count) for c in db.query(BudgetCategory)}
+
+    print("1. Archiving moves closed periods out of the hot tables...")
+    result = archive_transactions(db)
+    assert result["before"] == archive_cutoff() and result["users"] == 1, result
+    assert (result["transactions"], result["splits"]) == (23, 6), result
+    assert db.query(Transaction).filter(Transaction.budget_id == old.id).count() == 0
+    assert db.query(TransactionSplit).join(Transaction).filter(Transaction.budget_id == old.id).count() == 0
+    assert db.query(ArchivedTransaction).count() == 23 and db.query(ArchivedTransactionSplit).count() == 6
+    assert db.query(Transaction).filter(Transaction.budget_id == recent.id).count() == 20
+    months = {(m.category_id, m.month): (m.spent_cents, m.transaction_count) for m in db.query(ArchivedCategoryMonth)}
+    assert months[(rent.id, old_month.month)] == (sum(1000 + d for d in range(0, 20, 2)) + 1200, 13), months
+    print(f"   ✓ {result['transactions']} transactions and {result['splits']} splits archived, recent months untouched\n")
+
+    print("2. Category totals stay correct...")
+    db.expire_all()
+    assert {c.id: (c.spent_cents, c.transaction_count) for c in db.query(BudgetCategory)} == spent
+    assert verify_category_spend(db) == []
+    rebuild_category_spend(db)
+    assert {c.id: (c.spent_cents, c.transaction_count) for c in db.query(BudgetCategory)} == spent
+    print("   ✓ Verify finds no drift and a rebuild gives the same totals\n")
+
+    print("3. Reads over an archived range include the archive...")
+    for name, read in reads.items():
+        statements = captured_selects(engine, read)
+        assert read() == before[name], name
+        scans = [scan for statement, parameters in statements for scan in full_scans(engine, statement, parameters)]
+        assert not scans, f"{name}: {scans}"
+        print(f"   ✓ {name}: unchanged, {len(statements)} queries, no full scans")
+
+    assert len(before["list everything"]) == len(before["list from old month"])
+
+    def all_pages(limit):
+        ids, cursor = [], None
+        while True:
+            response = Response()
+            page = list_transactions(response, budget_id=None, category_id=None, start_date=None, end_date=None,
+                                     limit=limit, q=None, cursor=cursor, db=db, current_user=user)
+            ids.extend(row["id"] for row in page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return ids
+
+    assert all_pages(5) == [row["id"] for row in before["list everything"]], "paging skipped archived rows"
+    first_page = captured_selects(engine, lambda: listed(limit=5))
+    assert not any("all_transactions" in statement for statement, _ in first_page), \
+        "a page of rows newer than the archive read it anyway"
+    assert [row["id"] for row in listed(q="old")] == [], "archived notes are not searchable"
+    try:
+        get_transaction(archived_id, db=db, current_user=user)
+        assert False, "archived transaction returned by id"
+    except HTTPException as e:
+        assert e.status_code == 404
+    print("   ✓ Open-ended lists page into the archive; newer pages and searches stay on the hot tables\n")
+
+    print("4. Re-running is a no-op and new ids stay unique...")
+    again = archive_transactions(db)
+    assert (again["transactions"], again["splits"]) == (0, 0), again
+    assert verify_category_spend(db) == []
+    fresh = Transaction(user_id=user.id, budget_id=recent.id, category_id=recent_rent.id, amount_cents=1, date=today)
+    db.add(fresh)
+    db.commit()
+    assert db.get(ArchivedTransaction, fresh.id) is None
+    print("   ✓ Nothing left to move, totals unchanged\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Transaction archival works!")
+
+if __name__ == "__main__":
+    try:
+        test_transaction_archive()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
@@ -0,0 +1,168 @@
+"""
+Test mixed bulk create/update/delete of transactions
+Run with: python test_transaction_bulk.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+from datetime import date
+from app.api.transactions import bulk_transactions
+from app.models.budget import Budget, BudgetCategory
+from app.models.dashboard_state import DashboardState
+from app.models.transaction import Transaction, TransactionSplit
+from app.schemas.transaction import (
+    TransactionBulkOperation, TransactionBulkRequest, TransactionCreate, TransactionSplitCreate, TransactionUpdate
+)
+from app.services.category_spend import verify_category_spend
+from app.services.dashboard_state import compute_sections, dashboard_response, rebuild_dashboard_state
+from test_utils import counted, make_session, seed
+
+def _mixed_operations(budget, categories, transactions, size):
+    """size creates (half split), size recategorizations and size deletes"""
+    today = date.today()
+    operations = []
+    for i in range(size):
+        if i % 2:
+            data = TransactionCreate(budget_id=budget.id, amount_cents=300, date=today, is_split=True, splits=[
+                {"category_id": categories[i % len(categories)].id, "amount_cents": 100},
+                {"category_id": categories[0].id, "amount_cents": 200}
+            ])
+        else:
+            data = TransactionCreate(budget_id=budget.id, category_id=categories[i % len(categories)].id,
+                                     amount_cents=250, date=today, notes=f"bulk {i}")
+        operations.append(TransactionBulkOperation(op="create", transaction=data))
+    for i, transaction in enumerate(transactions[:size]):
+        operations.append(TransactionBulkOperation(op="update", id=transaction.id, changes=TransactionUpdate(
+            category_id=categories[-1 - i % len(categories)].id, notes="recategorized"
+        )))
+    for transaction in transactions[size:2 * size]:
+        operations.append(TransactionBulkOperation(op="delete", id=transaction.id))
+    return operations
+
+def test_transaction_bulk():
+    print("🧪 Testing bulk transaction operations\n")
+
+    engine, db = make_session()
+    counts = []
+    users = []
+
+    for size in (10, 500):
+        user = seed(db, size)
+        users.append(user)
+        rebuild_dashboard_state(db, user.id)
+        db.commit()
+        budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+        categories = db.query(BudgetCategory).filter(
+            BudgetCategory.budget_id == budget.id
+        ).order_by(BudgetCategory.id).all()
+        # Every other seeded transaction is a split; take the plain ones for updates
+        plain = db.query(Transaction).filter(
+            Transaction.user_id == user.id, Transaction.is_split == False
+        ).order_by(Transaction.id).all()
+        split = db.query(Transaction).filter(
+            Transaction.user_id == user.id, Transaction.is_split == True
+        ).order_by(Transaction.id).all()
+        before = db.query(Transaction).filter(Transaction.user_id == user.id).count()
+
+        request = TransactionBulkRequest(operations=_mixed_operations(budget, categories, plain + split, size // 2))
+        db.refresh(user)
+        result, statements = counted(engine, lambda: bulk_transactions(request, db=db, current_user=user))
+        queries = len(statements)
+        assert result["failed"] == 0 and result["succeeded"] == len(request.operations), result
+        counts.append(queries)
+
+        db.expire_all()
+        assert db.query(Transaction).filter(Transaction.user_id == user.id).count() == before
+        assert db.query(Transaction).filter(Transaction.notes == "recategorized",
+                                            Transaction.user_id == user.id).count() == size // 2
+        created = [item["id"] for item in result["results"] if item["op"] == "create"]
+        assert len(created) == size // 2 and all(created)
+        assert db.get(Transaction, created[1]).is_split
+        assert db.query(TransactionSplit).filter(TransactionSplit.transaction_id == created[1]).count() == 2
+        assert verify_category_spend(db) == []
+        print(f"   ✓ {len(request.operations)} operations in {queries} queries")
+
+    assert counts[0] == counts[1], counts
+    print("   ✓ Query count does not grow with the number of operations\n")
+
+    print("1. Category totals and the dashboard stay in step...")
+    today = date.today()
+    for user in users:
+        stored = dashboard_response(db.get(DashboardState, user.id))
+        fresh = dashboard_response(DashboardState(**compute_sections(db, user.id, today)))
+        assert stored == fresh, (stored, fresh)
+    print("   ✓ In step\n")
+
+    print("2. Invalid operations are reported, valid ones still applied...")
+    owner, other = users
+    budget = db.query(Budget).filter(Budget.user_id == owner.id).first()
+    other_budget = db.query(Budget).filter(Budget.user_id == other.id).first()
+    category = db.query(BudgetCategory).filter(BudgetCategory.budget_id == budget.id).first()
+    foreign_category = db.query(BudgetCategory).filter(BudgetCategory.budget_id == other_budget.id).first()
+    mine = db.query(Transaction).filter(Transaction.user_id == owner.id, Transaction.is_split == False).first()
+    theirs = db.query(Transaction).filter(Transaction.user_id == other.id).first()
+    split = db.query(Transaction).filter(Transaction.user_id == owner.id, Transaction.is_split == True).first()
+
+    operations = [
+        TransactionBulkOperation(op="create", transaction=TransactionCreate(
+            budget_id=budget.id, category_id=category.id, amount_cents=999, date=today, notes="kept")),
+        TransactionBulkOperation(op="create", transaction=TransactionCreate(
+            budget_id=other_budget.id, category_id=foreign_category.id, amount_cents=1, date=today)),
+        TransactionBulkOperation(op="create", transaction=TransactionCreate(
+            budget_id=budget.id, category_id=foreign_category.id, amount_cents=1, date=today)),
+        TransactionBulkOperation(op="create"),
+        TransactionBulkOperation(op="update", id=mine.id, changes=TransactionUpdate(amount_cents=4321)),
+        TransactionBulkOperation(op="delete", id=mine.id),
+        TransactionBulkOperation(op="update", id=mine.id, changes=TransactionUpdate(category_id=foreign_category.id)),
+        TransactionBulkOperation(op="delete", id=theirs.id),
+        TransactionBulkOperation(op="update", id=None, changes=TransactionUpdate(notes="x")),
+        TransactionBulkOperation(op="create", transaction=TransactionCreate(
+            budget_id=budget.id, amount_cents=300, date=today, is_split=True)),
+        # The schema rejects these two already; the endpoint must not rely on it
+        TransactionBulkOperation(op="create", transaction=TransactionCreate.model_construct(
+            budget_id=budget.id, category_id=None, amount_cents=300, date=today, notes=None, is_split=True, splits=[])),
+        TransactionBulkOperation(op="create", transaction=TransactionCreate.model_construct(
+            budget_id=budget.id, category_id=None, amount_cents=300, date=today, notes=None, is_split=True, splits=[
+                TransactionSplitCreate(category_id=category.id, amount_cents=100),
+                TransactionSplitCreate(category_id=category.id, amount_cents=150)
+            ])),
+        TransactionBulkOperation(op="update", id=split.id, changes=TransactionUpdate(amount_cents=split.amount_cents + 1)),
+        TransactionBulkOperation(op="update", id=split.id, changes=TransactionUpdate(category_id=category.id)),
+        TransactionBulkOperation(op="update", id=split.id, changes=TransactionUpdate(
+            amount_cents=split.amount_cents, notes="split kept")),
+    ]
+    db.refresh(owner)
+    result = bulk_transactions(TransactionBulkRequest(operations=operations), db=db, current_user=owner)
+    assert (result["succeeded"], result["failed"]) == (3, 12), result
+    errors = [item["error"] for item in result["results"]]
+    assert errors[0] is None and errors[4] is None, errors
+    assert errors[1] == "Budget not found", errors
+    assert errors[2] == "Category not found in this budget", errors
+    assert errors[3] == "transaction is required for create", errors
+    assert errors[5] == errors[6] == "Transaction already changed by an earlier operation", errors
+    assert errors[7] == errors[8] == "Transaction not found", errors
+    assert errors[9] == errors[10] == "splits must be provided when is_split is True", errors
+    assert errors[11] == "Sum of splits (250) must equal transaction amount (300)", errors
+    assert errors[12] == "amount_cents of a split transaction must equal the sum of its splits", errors
+    assert errors[13] == "Split transactions are categorized by their splits", errors
+    assert errors[14] is None, errors
+
+    db.expire_all()
+    assert db.get(Transaction, mine.id).amount_cents == 4321
+    assert db.get(Transaction, theirs.id) is not None
+    assert db.query(Transaction).filter(Transaction.notes == "kept").count() == 1
+    kept_split = db.get(Transaction, split.id)
+    assert kept_split.notes == "split kept" and kept_split.category_id is None
+    assert kept_split.amount_cents == sum(s.amount_cents for s in kept_split.splits)
+    assert verify_category_spend(db) == []
+    print("   ✓ 3 applied, 12 rejected with reasons\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Bulk transaction operations work!")
+
+if __name__ == "__main__":
+    try:
+        test_transaction_bulk()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
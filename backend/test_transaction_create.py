@@ -0,0 +1,100 @@
+"""
+Test split validation and insertion on transaction create
+Run with: python test_transaction_create.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+import time
+from datetime import date
+from fastapi import HTTPException, Response
+from app.api.transactions import create_transaction
+from app.models.budget import Budget, BudgetCategory
+from app.models.transaction import TransactionSplit
+from app.schemas.transaction import TransactionCreate, TransactionSplitCreate
+from app.services.category_spend import verify_category_spend
+from test_utils import counted, make_session, seed
+
+def test_transaction_create():
+    print("🧪 Testing split transaction create\n")
+
+    engine, db = make_session()
+    user = seed(db, 60)
+    budget_id = db.query(Budget.id).filter(Budget.user_id == user.id).scalar()
+    # Plain ids, so expiring the session doesn't make the test itself query per category
+    category_ids = [category_id for (category_id,) in db.query(BudgetCategory.id).filter(
+        BudgetCategory.budget_id == budget_id).order_by(BudgetCategory.id)]
+    day = date.today().replace(day=15)
+    other = seed(db, 1)
+    foreign_id = db.query(BudgetCategory.id).join(Budget).filter(Budget.user_id == other.id).scalar()
+
+    def create(count, amounts=None, split_categories=None, construct=False, notes="Costco"):
+        amounts = amounts or [100] * count
+        split_categories = split_categories or category_ids[:count]
+        splits = [TransactionSplitCreate(category_id=c, amount_cents=a) for c, a in zip(split_categories, amounts)]
+        fields = dict(budget_id=budget_id, amount_cents=100 * count, date=day, notes=notes, is_split=True, splits=splits)
+        # model_construct skips the schema's own checks, so only the endpoint's validation applies
+        data = TransactionCreate.model_construct(category_id=None, **fields) if construct else TransactionCreate(**fields)
+        db.refresh(user)
+        return create_transaction(data, Response(), on_duplicate="allow", db=db, current_user=user)
+
+    print("1. Splits are created and returned...")
+    created = create(3)
+    assert [split["amount_cents"] for split in created["splits"]] == [100, 100, 100]
+    assert [split["category_name"] for split in created["splits"]] == ["Category 0", "Category 1", "Category 2"]
+    assert db.query(TransactionSplit).filter(TransactionSplit.transaction_id == created["id"]).count() == 3
+    assert verify_category_spend(db) == []
+    print("   ✓ Split rows stored; category spend stays consistent\n")
+
+    print("2. Query count is the same for 2 or 50 splits...")
+    db.expire_all()
+    _, two = counted(engine, lambda: create(2, notes="two"), details=True)
+    db.expire_all()
+    fifty_result, fifty = counted(engine, lambda: create(50, notes="fifty"), details=True)
+    assert len(two) == len(fifty), (len(two), len(fifty))
+    assert len(fifty_result["splits"]) == 50
+    category_queries = [statement for statement, _, _ in fifty if "FROM budget_categories" in statement and " IN (" in statement]
+    assert len(category_queries) == 1, category_queries
+    split_inserts = [executemany for statement, _, executemany in fifty if statement.startswith("INSERT INTO transaction_splits")]
+    assert split_inserts == [True], split_inserts
+    timings = {}
+    for count in (2, 50):
+        started = time.perf_counter()
+        for i in range(10):
+            create(count, notes=f"timed {count} {i}")
+        timings[count] = (time.perf_counter() - started) / 10
+    assert verify_category_spend(db) == []
+    print(f"   ✓ {len(fifty)} queries either way, one IN lookup and one executemany "
+          f"({timings[2] * 1000:.1f} ms vs {timings[50] * 1000:.1f} ms)\n")
+
+    print("3. Invalid splits are refused before anything is written...")
+    before = db.query(TransactionSplit).count()
+    cases = [
+        ({"count": 3, "amounts": [100, 100, 50], "construct": True}, 400, "Sum of splits (250)"),
+        ({"count": 2, "split_categories": [category_ids[0], foreign_id]}, 404, f"Category {foreign_id} not found"),
+        ({"count": 2, "split_categories": [category_ids[0], 999999]}, 404, "Category 999999 not found"),
+    ]
+    for params, code, detail in cases:
+        try:
+            create(**params)
+            assert False, f"accepted {params}"
+        except HTTPException as e:
+            assert e.status_code == code and detail in e.detail, (e.status_code, e.detail)
+    db.rollback()
+    try:
+        create(0, construct=True)
+        assert False, "accepted a split transaction without splits"
+    except HTTPException as e:
+        assert e.status_code == 400 and "splits must be provided" in e.detail
+    assert db.query(TransactionSplit).count() == before
+    print("   ✓ Wrong sums, other users' categories and missing splits refused\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Split transaction create works!")
+
+if __name__ == "__main__":
+    try:
+        test_transaction_create()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
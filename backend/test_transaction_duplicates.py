@@ -0,0 +1,131 @@
+"""
+Test duplicate detection for transactions
+Run with: python test_transaction_duplicates.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+import io
+from datetime import date, timedelta
+from fastapi import HTTPException, Response
+from app.api.transactions import bulk_transactions, create_transaction, list_duplicate_transactions, update_transaction
+from app.models.budget import Budget, BudgetCategory
+from app.models.transaction import Transaction
+from app.schemas.transaction import TransactionBulkOperation, TransactionBulkRequest, TransactionCreate, TransactionUpdate
+from app.services.category_spend import verify_category_spend
+from app.services.transaction_duplicates import transaction_fingerprint
+from app.services.transaction_import import import_statement
+from test_utils import counted, make_session, seed
+
+def test_transaction_duplicates():
+    print("🧪 Testing duplicate detection\n")
+
+    engine, db = make_session()
+    user = seed(db, 3)
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    category = db.query(BudgetCategory).filter(BudgetCategory.budget_id == budget.id).first()
+    today = date.today()
+    # Stay inside the seeded budget's month whatever today is
+    day = today.replace(day=15)
+
+    print("1. Notes are normalized before hashing...")
+    assert transaction_fingerprint(4210, "WALMART #1234 Supercenter") == transaction_fingerprint(4210, "walmart supercenter 5678.")
+    assert transaction_fingerprint(4210, "Walmart") != transaction_fingerprint(4211, "Walmart")
+    assert transaction_fingerprint(4210, "Walmart") != transaction_fingerprint(4210, "Target")
+    print("   ✓ Case, punctuation and store numbers ignored; amount and words kept\n")
+
+    print("2. Creating a transaction reports or rejects duplicates...")
+    def create(notes, on_day=day, on_duplicate="allow"):
+        response = Response()
+        db.refresh(user)
+        created = create_transaction(TransactionCreate(
+            budget_id=budget.id, category_id=category.id, amount_cents=4210, date=on_day, notes=notes
+        ), response, on_duplicate=on_duplicate, db=db, current_user=user)
+        return created, response.headers.get("X-Duplicate-Of")
+
+    original, duplicate_of = create("Walmart Supercenter #12")
+    assert duplicate_of is None
+    _, duplicate_of = create("WALMART SUPERCENTER #99")
+    assert duplicate_of == str(original["id"]), duplicate_of
+    try:
+        create("Walmart Supercenter", on_duplicate="reject")
+        assert False, "exact duplicate accepted"
+    except HTTPException as e:
+        assert e.status_code == 409 and str(original["id"]) in e.detail
+    near, duplicate_of = create("Walmart Supercenter", on_day=day + timedelta(days=1), on_duplicate="reject")
+    assert duplicate_of == str(original["id"]), "near duplicate is reported, not rejected"
+    _, duplicate_of = create("Walmart Supercenter", on_day=day + timedelta(days=3))
+    assert duplicate_of is None
+    print("   ✓ Exact duplicate rejected on request, near duplicate reported, later date is new\n")
+
+    print("3. Re-importing a statement skips what is already recorded...")
+    lines = ["Date,Description,Amount"] + [
+        f"{day.isoformat()},Corner Cafe #{i},-{3 + i % 5}.25" for i in range(3000)
+    ]
+    statement = "\n".join(lines).encode()
+    first, statements = counted(engine, lambda: import_statement(db, user.id, io.BytesIO(statement), "csv", batch_size=1000))
+    assert first["imported"] == 3000 and first["duplicates"] == 0, "rows of one statement are not duplicates of each other"
+    lookups = [s for s in statements if "fingerprint IN" in s]
+    assert len(lookups) == 3, len(lookups)
+    print(f"   ✓ 3000 rows imported with {len(lookups)} duplicate lookups (one per batch)")
+
+    again = import_statement(db, user.id, io.BytesIO(statement), "csv", batch_size=1000)
+    assert (again["imported"], again["duplicates"], again["skipped"]) == (0, 3000, 3000), again
+    assert again["errors"][0].startswith("line 2: duplicate of transaction"), again["errors"][0]
+    forced = import_statement(db, user.id, io.BytesIO("\n".join(lines[:11]).encode()), "csv", skip_duplicates=False)
+    assert (forced["imported"], forced["duplicates"]) == (10, 10), forced
+    assert verify_category_spend(db) == []
+    print("   ✓ Second import skipped every row; skip_duplicates=false imports and reports them\n")
+
+    print("4. Bulk creates and updates keep fingerprints...")
+    db.refresh(user)
+    result = bulk_transactions(TransactionBulkRequest(skip_duplicates=True, operations=[
+        TransactionBulkOperation(op="create", transaction=TransactionCreate(
+            budget_id=budget.id, category_id=category.id, amount_cents=4210, date=day, notes="walmart supercenter")),
+        TransactionBulkOperation(op="create", transaction=TransactionCreate(
+            budget_id=budget.id, category_id=category.id, amount_cents=777, date=day, notes="Hardware store")),
+        TransactionBulkOperation(op="update", id=near["id"], changes=TransactionUpdate(notes="Gas station"))
+    ]), db=db, current_user=user)
+    assert [item["success"] for item in result["results"]] == [False, True, True], result
+    assert result["results"][0]["error"] == f"Duplicate of transaction {original['id']}"
+    db.expire_all()
+    assert db.get(Transaction, near["id"]).fingerprint == transaction_fingerprint(4210, "Gas station")
+
+    db.refresh(user)
+    update_transaction(original["id"], TransactionUpdate(amount_cents=5000), db=db, current_user=user)
+    assert db.get(Transaction, original["id"]).fingerprint == transaction_fingerprint(5000, "Walmart Supercenter")
+    print("   ✓ Duplicate create failed with a reason; updated rows re-fingerprinted\n")
+
+    print("5. Scanning history for clusters...")
+    db.add_all([
+        Transaction(user_id=user.id, budget_id=budget.id, category_id=category.id, amount_cents=1599, date=day - timedelta(days=7 * week),
+                    notes="Netflix", fingerprint=transaction_fingerprint(1599, "Netflix"))
+        for week in range(4)
+    ] + [
+        Transaction(user_id=user.id, budget_id=budget.id, category_id=category.id, amount_cents=999, date=day + timedelta(days=offset),
+                    notes="Spotify", fingerprint=transaction_fingerprint(999, "Spotify"))
+        for offset in (0, 1)
+    ])
+    db.commit()
+    db.refresh(user)
+    clusters, statements = counted(engine, lambda: list_duplicate_transactions(db=db, current_user=user))
+    assert len(statements) == 1, statements
+    by_notes = {cluster["notes"]: cluster for cluster in clusters}
+    assert "Netflix" not in by_notes, "a weekly charge is not a duplicate"
+    assert not any(cluster["notes"].lower().startswith("walmart") for cluster in clusters), "changed rows left the cluster"
+    spotify = by_notes["Spotify"]
+    assert not spotify["exact"] and len(spotify["transaction_ids"]) == 2, spotify
+    cafes = [cluster for cluster in clusters if cluster["notes"].startswith("Corner Cafe")]
+    assert len(cafes) == 5 and all(cluster["exact"] for cluster in cafes), len(cafes)
+    assert sum(len(cluster["transaction_ids"]) for cluster in cafes) == 3010
+    print(f"   ✓ {len(clusters)} clusters found in one query\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Duplicate detection works!")
+
+if __name__ == "__main__":
+    try:
+        test_transaction_duplicates()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
@@ -0,0 +1,128 @@
+"""
+Test streaming bank statement import
+Run with: python test_transaction_import.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+import io
+import time
+from datetime import date
+from app.models.budget import Budget, BudgetCategory
+from app.models.category_suggestion import CategoryPattern
+from app.models.dashboard_state import DashboardState
+from app.models.transaction import Transaction
+from app.services.category_spend import verify_category_spend
+from app.services.dashboard_state import compute_sections, dashboard_response, rebuild_dashboard_state
+from app.services.transaction_import import import_statement
+from test_utils import recorded, make_session, seed
+
+OFX = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>{ymd}120000[-5:EST]<TRNAMT>-42.10<FITID>1<NAME>WALMART SUPERCENTER</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>{ymd}<TRNAMT>1500.00<FITID>2<NAME>PAYROLL</STMTTRN>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>{ymd}
+<TRNAMT>-7.25
+<FITID>3
+<NAME>Corner Cafe
+<MEMO>latte
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+QIF = """!Type:Bank
+D{mdy}
+T-19.99
+PWalmart
+^
+D{mdy}
+T-5.00
+PParking
+MMeter
+^
+"""
+
+def test_transaction_import():
+    print("🧪 Testing statement import\n")
+
+    engine, db = make_session()
+    user = seed(db, 3)
+    today = date.today()
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    groceries = db.query(BudgetCategory).filter(BudgetCategory.budget_id == budget.id).order_by(BudgetCategory.id).first()
+    db.add(CategoryPattern(user_id=user.id, category_id=groceries.id, pattern_text="walmart supercenter",
+                           confidence_score=0.9, usage_count=4))
+    db.commit()
+    rebuild_dashboard_state(db, user.id)
+    db.commit()
+    before = db.query(Transaction).count()
+
+    print("1. A large CSV in batches...")
+    rows = 20000
+    lines = ["Date,Description,Amount"]
+    for i in range(rows):
+        lines.append(f"{today.isoformat()},WALMART SUPERCENTER #{i % 50},-{1 + i % 7}.50")
+    lines.append(f"{today.isoformat()},Refund,12.00")          # credit: not spending
+    lines.append("not a date,Broken,-1.00")                    # unparseable
+    lines.append("2001-01-05,No budget that month,-3.00")      # no budget
+    started = time.perf_counter()
+    with recorded(engine) as statements:
+        result = import_statement(db, user.id, io.BytesIO("\n".join(lines).encode()), "csv", batch_size=5000)
+    elapsed = time.perf_counter() - started
+    assert result["imported"] == rows and result["batches"] == 4, result
+    assert result["categorized"] == rows, result
+    assert result["skipped"] == 3 and len(result["errors"]) == 3, result
+    assert "not spending" in result["errors"][0] and "unrecognized date" in result["errors"][1], result
+    assert "no budget for 1/2001" in result["errors"][2], result
+    inserts = [s for s in statements if s.startswith("INSERT INTO transactions")]
+    assert len(inserts) == 4, len(inserts)
+    assert len(statements) < 30, len(statements)
+    print(f"   ✓ {rows} rows in {elapsed:.2f}s, {len(statements)} statements, 4 INSERTs\n")
+
+    print("2. Category totals and the dashboard stay in step...")
+    assert verify_category_spend(db) == []
+    db.expire_all()
+    stored = dashboard_response(db.get(DashboardState, user.id))
+    fresh = dashboard_response(DashboardState(**compute_sections(db, user.id, today)))
+    assert stored == fresh, (stored, fresh)
+    print("   ✓ In step\n")
+
+    print("3. OFX (SGML) and QIF...")
+    ymd = today.strftime("%Y%m%d")
+    result = import_statement(db, user.id, io.BytesIO(OFX.format(ymd=ymd).encode()), "ofx")
+    assert (result["imported"], result["categorized"], result["skipped"]) == (2, 1, 1), result
+    cafe = db.query(Transaction).filter(Transaction.notes == "Corner Cafe latte").one()
+    assert cafe.amount_cents == 725
+    fallback = db.get(BudgetCategory, cafe.category_id)
+    assert fallback.name == "Uncategorized" and fallback.budget_id == budget.id
+
+    mdy = today.strftime("%m/%d'%y")
+    result = import_statement(db, user.id, io.BytesIO(QIF.format(mdy=mdy).encode()), "qif")
+    assert (result["imported"], result["categorized"]) == (2, 1), result
+    assert db.query(BudgetCategory).filter(BudgetCategory.name == "Uncategorized").count() == 1
+    assert db.query(Transaction).filter(Transaction.notes == "Parking Meter").one().amount_cents == 500
+    assert verify_category_spend(db) == []
+    print("   ✓ Parsed, categorized, fallback category reused\n")
+
+    print("4. A CSV without an amount column is refused...")
+    try:
+        import_statement(db, user.id, io.BytesIO(b"Date,Description\n2024-01-01,x\n"), "csv")
+        assert False, "CSV without amounts accepted"
+    except ValueError:
+        db.rollback()
+    assert db.query(Transaction).count() == before + rows + 4
+    print("   ✓ Refused, nothing inserted\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Statement import works!")
+
+if __name__ == "__main__":
+    try:
+        test_transaction_import()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
@@ -0,0 +1,80 @@
+"""
+Test transaction listing: batched split loading and keyset pagination
+Run with: python test_transaction_pages.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+from datetime import date, datetime, timedelta
+from fastapi import HTTPException, Response
+from app.api.transactions import list_transactions
+from app.models.transaction import Transaction
+from test_utils import recorded, make_session, seed
+
+def _page(engine, db, user, limit, cursor=None):
+    response = Response()
+    with recorded(engine) as statements:
+        rows = list_transactions(response, budget_id=None, category_id=None, start_date=None, end_date=None,
+                                 limit=limit, q=None, cursor=cursor, db=db, current_user=user)
+    return rows, response.headers.get("X-Next-Cursor"), len(statements)
+
+def test_transaction_pages():
+    print("🧪 Testing transaction pagination\n")
+
+    engine, db = make_session()
+    user = seed(db, 30)
+    # Spread some over earlier days and give a few an identical created_at
+    stamp = datetime(2024, 1, 1, 12, 0, 0)
+    for i, transaction in enumerate(db.query(Transaction).filter(Transaction.user_id == user.id)):
+        transaction.date = date.today() - timedelta(days=i % 7)
+        if i % 5 == 0:
+            transaction.created_at = stamp
+    db.commit()
+    db.refresh(user)
+
+    expected = [t.id for t in db.query(Transaction).filter(Transaction.user_id == user.id).order_by(
+        Transaction.date.desc(), Transaction.created_at.desc(), Transaction.id.desc()
+    )]
+    assert len(expected) == 60
+
+    print("1. Paging through everything...")
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        rows, cursor, queries = _page(engine, db, user, 7, cursor)
+        pages += 1
+        # One query for the page, one for the splits of its split transactions
+        assert queries <= 2, queries
+        seen.extend(row["id"] for row in rows)
+        for row in rows:
+            assert row["is_split"] == (len(row["splits"]) == 2), row
+            assert all(split["category_name"] for split in row["splits"])
+        if cursor is None:
+            break
+    assert seen == expected, "pages skipped or repeated rows"
+    assert pages == 9, pages
+    print(f"   ✓ 60 transactions in {pages} pages, at most 2 queries each\n")
+
+    print("2. The last page has no cursor...")
+    rows, cursor, _ = _page(engine, db, user, 60)
+    assert len(rows) == 60 and cursor is None
+    print("   ✓ No X-Next-Cursor\n")
+
+    print("3. Garbage cursors are rejected...")
+    try:
+        _page(engine, db, user, 10, "not-a-cursor")
+        assert False, "Invalid cursor accepted"
+    except HTTPException as e:
+        assert e.status_code == 400
+    print("   ✓ 400\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Transaction pagination works!")
+
+if __name__ == "__main__":
+    try:
+        test_transaction_pages()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
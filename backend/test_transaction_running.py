@@ -0,0 +1,142 @@
+"""
+Test cumulative spend series computed with window functions
+Run with: python test_transaction_running.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import insert
+from app.api.transactions import get_running_totals
+from app.models.budget import Budget, BudgetCategory
+from app.models.transaction import Transaction, TransactionSplit
+from app.services.transaction_archive import archive_transactions
+from test_utils import counted, full_scans, make_session, seed
+
+def _expected(db, budget, category_ids=None):
+    """Cumulative spend per category per day, the slow way"""
+    spends = []
+    for transaction in db.query(Transaction).filter(Transaction.budget_id == budget.id):
+        if transaction.is_split:
+            spends += [(split.category_id, transaction.date, split.amount_cents) for split in transaction.splits]
+        else:
+            spends.append((transaction.category_id, transaction.date, transaction.amount_cents))
+    if category_ids is not None:
+        spends = [spend for spend in spends if spend[0] in category_ids]
+    dates = sorted({day for _, day, _ in spends})
+    running = {}
+    for category_id in {spend[0] for spend in spends}:
+        running[category_id] = [sum(cents for c, day, cents in spends if c == category_id and day <= on) for on in dates]
+    return dates, running
+
+def test_transaction_running():
+    print("🧪 Testing running spend series\n")
+
+    engine, db = make_session()
+    user = seed(db, 4)
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    categories = db.query(BudgetCategory).filter(BudgetCategory.budget_id == budget.id).order_by(BudgetCategory.id).all()
+    month_start = date(budget.year, budget.month, 1)
+
+    def running(**params):
+        params = {"category_id": None, "by": "category", **params}
+        db.refresh(user)
+        return get_running_totals(budget_id=params.pop("budget_id", budget.id), **params, db=db, current_user=user)
+
+    print("1. Per-category series match a slow recomputation...")
+    rng = random.Random(3)
+    now = datetime.utcnow()
+    db.execute(insert(Transaction), [
+        {"user_id": user.id, "budget_id": budget.id, "category_id": rng.choice(categories).id,
+         "amount_cents": rng.randint(100, 9000), "date": month_start + timedelta(days=rng.randint(0, 20)),
+         "is_split": False, "created_at": now, "updated_at": now}
+        for _ in range(300)
+    ])
+    split = Transaction(user_id=user.id, budget_id=budget.id, amount_cents=1000, is_split=True,
+                        date=month_start + timedelta(days=25))
+    db.add(split)
+    db.flush()
+    db.add_all([TransactionSplit(transaction_id=split.id, category_id=categories[2].id, amount_cents=600),
+                TransactionSplit(transaction_id=split.id, category_id=categories[3].id, amount_cents=400)])
+    db.commit()
+
+    result = running()
+    dates, expected = _expected(db, budget)
+    assert result["dates"] == dates, (result["dates"], dates)
+    assert [series["category_id"] for series in result["series"]] == [category.id for category in categories]
+    for series in result["series"]:
+        assert series["cumulative_cents"] == expected[series["category_id"]], series["category_name"]
+        assert series["allocated_cents"] == 5000
+    assert len(set(map(len, (s["cumulative_cents"] for s in result["series"])))) == 1
+    print(f"   ✓ {len(result['series'])} categories over {len(dates)} days, split amounts in their categories\n")
+
+    print("2. Whole budget and single category...")
+    total = running(by="total")
+    assert total["dates"] == dates and len(total["series"]) == 1
+    assert total["series"][0]["category_id"] is None and total["series"][0]["allocated_cents"] == 5000 * 4
+    assert total["series"][0]["cumulative_cents"] == [sum(values[i] for values in expected.values()) for i in range(len(dates))]
+    single = running(category_id=categories[3].id)
+    single_dates, single_expected = _expected(db, budget, {categories[3].id})
+    assert single["dates"] == single_dates and single["dates"][-1] == split.date
+    assert single["series"][0]["cumulative_cents"] == single_expected[categories[3].id]
+    single_total = running(by="total", category_id=categories[3].id)
+    assert single_total["dates"] == single_dates
+    assert single_total["series"][0]["allocated_cents"] == categories[3].allocated_cents
+    assert single_total["series"][0]["cumulative_cents"] == single_expected[categories[3].id], single_total
+    for params in ({"budget_id": 99999}, {"category_id": 99999}):
+        try:
+            running(**params)
+            assert False, f"accepted {params}"
+        except HTTPException as e:
+            assert e.status_code == 404
+    print("   ✓ Total series adds up the categories, or just the one asked for; unknown budget or category refused\n")
+
+    print("3. Work stays in the database...")
+    db.expire_all()
+    _, small = counted(engine, running, details=True)
+    db.execute(insert(Transaction), [
+        {"user_id": user.id, "budget_id": budget.id, "category_id": rng.choice(categories).id,
+         "amount_cents": rng.randint(100, 9000), "date": month_start + timedelta(days=rng.randint(0, 27)),
+         "is_split": False, "created_at": now, "updated_at": now}
+        for _ in range(20000)
+    ])
+    db.commit()
+    db.expire_all()
+    result, large = counted(engine, running, details=True)
+    assert len(small) == len(large), (len(small), len(large))
+    assert all(len(series["cumulative_cents"]) <= 28 for series in result["series"])
+    scans = [scan for statement, parameters, _ in large for scan in full_scans(engine, statement, parameters)]
+    assert not scans, scans
+    assert any("OVER" in statement for statement, _, _ in large)
+    print(f"   ✓ {len(large)} queries at any size, one row per category and day, no full scans\n")
+
+    print("4. Archived budgets still chart...")
+    old = Budget(user_id=user.id, month=1, year=month_start.year - 3, income_cents=0)
+    db.add(old)
+    db.flush()
+    rent = BudgetCategory(budget_id=old.id, name="Rent", allocated_cents=90000, order=0)
+    db.add(rent)
+    db.flush()
+    db.add_all([Transaction(user_id=user.id, budget_id=old.id, category_id=rent.id, amount_cents=300 * day,
+                            date=date(old.year, 1, day)) for day in (1, 5, 9)])
+    db.flush()
+    db.add(Transaction(user_id=user.id, budget_id=budget.id, category_id=categories[0].id, amount_cents=1, date=month_start))
+    db.commit()
+    before = running(budget_id=old.id)
+    archive_transactions(db)
+    assert db.query(Transaction).filter(Transaction.budget_id == old.id).count() == 0
+    after = running(budget_id=old.id)
+    assert after == before and after["series"][0]["cumulative_cents"] == [300, 1800, 4500], after
+    print("   ✓ Series of an archived month read from the archive\n")
+
+    db.close()
+    engine.dispose()
+    print("✅ Running spend series work!")
+
+if __name__ == "__main__":
+    try:
+        test_transaction_running()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
@@ -0,0 +1,140 @@
+"""
+Test full-text search over transaction notes
+Run with: python test_transaction_search.py
+
+Runs in-process against a temporary SQLite database, no server needed.
+"""
+
+import random
+import time
+from datetime import date, datetime, timedelta
+from fastapi import HTTPException, Response
+from sqlalchemy import insert
+from app.api.transactions import bulk_transactions, list_transactions
+from app.models.budget import Budget, BudgetCategory
+from app.models.transaction import Transaction, TransactionSplit
+from app.schemas.transaction import TransactionBulkOperation, TransactionBulkRequest, TransactionUpdate
+from test_utils import make_session, seed
+
+MERCHANTS = ["walmart", "target", "costco", "shell", "chevron", "amazon", "netflix", "spotify",
+             "starbucks", "kroger", "safeway", "uber", "lyft", "pharmacy", "dentist", "gym"]
+
+def test_transaction_search():
+    print("🧪 Testing transaction search\n")
+
+    engine, db = make_session()
+    user = seed(db, 3)
+    other = seed(db, 4)
+    budget = db.query(Budget).filter(Budget.user_id == user.id).first()
+    categories = db.query(BudgetCategory).filter(
+        BudgetCategory.budget_id == budget.id
+    ).order_by(BudgetCategory.id).all()
+    today = date.today()
+
+    def add(notes, category=categories[0], day=today):
+        transaction = Transaction(user_id=user.id, budget_id=budget.id, category_id=category.id,
+                                  amount_cents=100, date=day, notes=notes)
+        db.add(transaction)
+        db.flush()
+        return transaction
+
+    def search(q, **params):
+        params = {"budget_id": None, "category_id": None, "start_date": None, "end_date": None,
+                  "limit": 50, "cursor": None, **params}
+        response = Response()
+        db.refresh(user)
+        rows = list_transactions(response, q=q, **params, db=db, current_user=user)
+        return [row["id"] for row in rows], response.headers.get("X-Next-Cursor")
+
+    latte = add("Starbucks latte")
+    beans = add("Starbucks coffee beans for the office kitchen, bought in bulk", category=categories[1])
+    old = add("Starbucks gift card", day=today - timedelta(days=40))
+    add("Kroger groceries")
+    other_budget = db.query(Budget).filter(Budget.user_id == other.id).first()
+    db.add(Transaction(user_id=other.id, budget_id=other_budget.id, category_id=other_budget.categories[0].id,
+                       amount_cents=100, date=today, notes="Starbucks refill"))
+    db.commit()
+
+    print("1. Prefix matching, ranking and isolation...")
+    ids, _ = search("starb")
+    assert set(ids) == {latte.id, beans.id, old.id}, ids
+    assert ids.index(latte.id) < ids.index(beans.id), "shorter, denser match should rank first"
+    assert search("STARBUCKS Latte")[0] == [latte.id]
+    assert search("coffee kitch")[0] == [beans.id]
+    assert search("walmart")[0] == []
+    print("   ✓ Prefixes match, best matches first, other users' notes hidden\n")
+
+    print("2. Combines with the other filters...")
+    assert set(search("starbucks", category_id=categories[1].id)[0]) == {beans.id}
+    assert set(search("starbucks", start_date=today - timedelta(days=7))[0]) == {latte.id, beans.id}
+    assert set(search("starbucks", budget_id=budget.id, end_date=today - timedelta(days=7))[0]) == {old.id}
+    print("   ✓ Category, budget and dates narrow the matches\n")
+
+    print("3. Index follows writes...")
+    latte.notes = "Peet's espresso"
+    split = add(None, category=categories[0])
+    split.is_split, split.category_id = True, None
+    db.add(TransactionSplit(transaction_id=split.id, category_id=categories[2].id, amount_cents=100,
+                            notes="Dentist copay"))
+    db.delete(old)
+    db.commit()
+    assert search("starbucks")[0] == [beans.id]
+    assert search("espresso")[0] == [latte.id]
+    assert search("dentist")[0] == [split.id]
+
+    result = bulk_transactions(TransactionBulkRequest(operations=[
+        TransactionBulkOperation(op="update", id=beans.id, changes=TransactionUpdate(notes="Office snacks")),
+        TransactionBulkOperation(op="delete", id=split.id)
+    ]), db=db, current_user=user)
+    assert result["failed"] == 0, result
+    assert search("starbucks")[0] == [] and search("dentist")[0] == []
+    assert search("snack")[0] == [beans.id]
+    print("   ✓ Updates, splits, deletes and bulk writes are reflected\n")
+
+    print("4. Pages and bad input...")
+    rows = [{"user_id": user.id, "budget_id": budget.id, "category_id": categories[0].id, "amount_cents": 100,
+             "date": today, "notes": f"Parking meter {i}", "is_split": False,
+             "created_at": datetime.utcnow(), "updated_at": datetime.utcnow()} for i in range(7)]
+    db.execute(insert(Transaction), rows)
+    db.commit()
+    first, cursor = search("parking", limit=5)
+    second, last = search("parking", limit=5, cursor=cursor)
+    assert len(first) == 5 and len(second) == 2 and last is None, (first, second, last)
+    assert not set(first) & set(second)
+    for q, cursor in (("!!!", None), ("parking", "bm90IGEgY3Vyc29y")):
+        try:
+            search(q, cursor=cursor)
+            assert False, f"accepted q={q!r} cursor={cursor!r}"
+        except HTTPException as e:
+            assert e.status_code == 400
+    print("   ✓ Search pages continue, punctuation-only queries and bad cursors refused\n")
+
+    print("5. Speed on a larger history...")
+    size = 100000
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    for start in range(0, size, 20000):
+        db.execute(insert(Transaction), [
+            {"user_id": user.id, "budget_id": budget.id, "category_id": categories[0].id, "amount_cents": 100,
+             "date": today - timedelta(days=i % 365), "notes": f"{rng.choice(MERCHANTS)} {rng.choice(MERCHANTS)} #{i}",
+             "is_split": False, "created_at": now, "updated_at": now}
+            for i in range(start, start + 20000)
+        ])
+    db.commit()
+    print(f"   {size} transactions indexed in {time.perf_counter() - started:.1f}s")
+    for q in ("netflix spotify", "#4242", "walm"):
+        started = time.perf_counter()
+        ids, _ = search(q)
+        assert ids, q
+        print(f"   ✓ '{q}': {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    db.close()
+    engine.dispose()
+    print("\n✅ Transaction search works!")
+
+if __name__ == "__main__":
+    try:
+        test_transaction_search()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
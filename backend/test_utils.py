@@ -0,0 +1,133 @@
+"""
+Shared helpers for the in-process test scripts: a temporary SQLite database,
+a seeded user with data in every dashboard section, seeded invoices, and a
+recorder for the statements a call sends to the database.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import date, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models.user import User
+from app.models.customer import Customer
+from app.models.invoice import Invoice, InvoiceItem, InvoiceStatus
+from app.models.budget import Budget, BudgetCategory
+from app.models.transaction import Transaction, TransactionSplit
+from app.models.sinking_fund import SinkingFund, SinkingFundContribution
+from app.models.net_worth import Asset, Liability, AssetType, LiabilityType
+from app.models.financial_goal import FinancialGoal
+from app.models.paycheck import Paycheck, PaycheckFrequency
+from app.services.category_spend import rebuild_category_spend
+
+def make_session():
+    # A file rather than :memory:, so sections computed on other connections see the same data
+    path = os.path.join(tempfile.mkdtemp(), "dashboard.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine)()
+
+def seed(db, size: int) -> User:
+    """A user with `size` categories, transactions, funds, assets, goals and paychecks in this month's budget"""
+    today = date.today()
+    user = User(email=f"dashboard{size}@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+
+    budget = Budget(user_id=user.id, month=today.month, year=today.year, income_cents=size * 10000)
+    db.add(budget)
+    db.flush()
+
+    categories = []
+    for i in range(size):
+        category = BudgetCategory(budget_id=budget.id, name=f"Category {i}", allocated_cents=5000, order=i)
+        db.add(category)
+        categories.append(category)
+    db.flush()
+
+    for i, category in enumerate(categories):
+        db.add(Transaction(user_id=user.id, budget_id=budget.id, category_id=category.id,
+                           amount_cents=100, date=today, notes=f"txn {i}"))
+        split_txn = Transaction(user_id=user.id, budget_id=budget.id, category_id=None,
+                                amount_cents=300, date=today, is_split=True)
+        db.add(split_txn)
+        db.flush()
+        db.add(TransactionSplit(transaction_id=split_txn.id, category_id=category.id, amount_cents=100))
+        db.add(TransactionSplit(transaction_id=split_txn.id, category_id=categories[0].id, amount_cents=200))
+
+        fund = SinkingFund(user_id=user.id, name=f"Fund {i}", target_cents=10000, current_balance_cents=700)
+        db.add(fund)
+        db.flush()
+        db.add(SinkingFundContribution(fund_id=fund.id, amount_cents=300))
+        db.add(SinkingFundContribution(fund_id=fund.id, amount_cents=400))
+
+        db.add(Asset(user_id=user.id, name=f"Asset {i}", asset_type=AssetType.SAVINGS, current_value_cents=2000))
+        db.add(Liability(user_id=user.id, name=f"Loan {i}", liability_type=LiabilityType.OTHER, current_balance_cents=500))
+        db.add(FinancialGoal(user_id=user.id, name=f"Goal {i}", goal_type="savings",
+                             target_amount_cents=9000, current_amount_cents=1000,
+                             target_date=today + timedelta(days=365), start_date=today,
+                             status="active" if i % 2 == 0 else "completed"))
+        db.add(Paycheck(user_id=user.id, name=f"Job {i}", net_amount_cents=250000,
+                        frequency=PaycheckFrequency.MONTHLY, pay_date=today + timedelta(days=i + 1)))
+
+    db.commit()
+    rebuild_category_spend(db)
+    return user
+
+def seed_invoices(db, count: int, customers: int = 2) -> list:
+    """`count` sent invoices of 1000 * n cents with one item each, spread over `customers` customers"""
+    today = date.today()
+    owners = [Customer(name=f"Customer {i}", email=f"customer{i}@example.com") for i in range(customers)]
+    db.add_all(owners)
+    db.flush()
+
+    invoices = []
+    for n in range(1, count + 1):
+        invoice = Invoice(customer_id=owners[n % customers].id, invoice_number=f"INV-{n:04d}", issue_date=today,
+                          due_date=today + timedelta(days=30), status=InvoiceStatus.SENT, subtotal_cents=1000 * n,
+                          total_cents=1000 * n, balance_due_cents=1000 * n)
+        invoice.items.append(InvoiceItem(description=f"Work {n}", quantity=1, unit_price_cents=1000 * n,
+                                         line_total_cents=1000 * n))
+        invoices.append(invoice)
+    db.add_all(invoices)
+    db.commit()
+    return invoices
+
+@contextmanager
+def recorded(engine, details=False):
+    """Statements sent inside the block; with `details`, as (statement, parameters, executemany) tuples"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters, executemany) if details else statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+def counted(engine, call, details=False):
+    """call()'s result and the statements it sent, see recorded()"""
+    with recorded(engine, details) as statements:
+        result = call()
+    return result, statements
+
+def full_scans(engine, statement, parameters):
+    """Tables a SQLite statement reads in full, from EXPLAIN QUERY PLAN"""
+    connection = engine.raw_connection()
+    try:
+        plan = connection.cursor().execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    finally:
+        connection.close()
+    # Plan rows read "SCAN <table>" or "SCAN <table> USING [COVERING] INDEX ..." for full scans
+    details = [row[-1] for row in plan]
+    return [detail for detail in details if detail.startswith("SCAN ") and detail.split()[1] in Base.metadata.tables]
+
+def captured_selects(engine, call):
+    """(statement, parameters) of every SELECT call() sends"""
+    _, statements = counted(engine, call, details=True)
+    return [(statement, parameters) for statement, parameters, _ in statements
+            if statement.lstrip().upper().startswith("SELECT")]
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Delete rendered invoice PDFs that no invoice points at any more, then trim
+the local cache to PDF_CACHE_MAX_BYTES, least recently used first.
+A render is superseded when its invoice changes; it is kept for
+PDF_DELETE_GRACE_SECONDS so downloads already streaming it can finish.
+Renders never trim the cache themselves, so run this from a scheduler, e.g. hourly.
+
+    python trim_pdf_storage.py
+    python trim_pdf_storage.py --grace-seconds 0    # also collect just-superseded renders
+"""
+import argparse
+import sys
+from app.core.database import SessionLocal
+from app.models.financial_goal import FinancialGoal  # noqa: F401 - User.financial_goals needs it mapped
+from app.services.pdf import trim_pdf_storage
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Delete superseded invoice PDFs and trim the PDF cache")
+    parser.add_argument("--grace-seconds", type=int, help="defaults to PDF_DELETE_GRACE_SECONDS")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        result = trim_pdf_storage(db, grace_seconds=args.grace_seconds)
+        print(f"✓ Deleted {result['collected']} superseded PDFs")
+        print(f"✓ Evicted {result['evicted']} least recently used PDFs over the size limit")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())